@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# -*- coding: ascii -*-
+"""analysis_frame.py - intermediate results of one frame that are shared by the algorithms"""
+
+import numpy as np
+
+
+class AnalysisFrame(object):
+    """Intermediate results of the analysis of one frame: normalized signal and, for every SpectralPlan, the complex
+       band spectrum, its magnitude and its phase. Everything is computed on first use and then returned to every
+       algorithm, so several algorithms of a SignalProcessor can run on the same frame without doubling the effort.
+
+       A new frame has to be created whenever a value has been appended to the signal.
+    """
+
+    def __init__(self, signal_processor, input_raw_signal, fps):
+        """Store signal, nothing is computed yet
+
+           signal_processor: SignalProcessor that provides normalization, spectral plans and spectrum backend
+           input_raw_signal: Signal before normalization (numpy array or RingBuffer)
+           fps: FPS of video stream
+        """
+
+        self.signal_processor = signal_processor
+        self.raw_signal = input_raw_signal
+        self.fps = fps
+
+        # Cached results
+        self.normalized_signal = None
+        self.band_spectra = {}
+        self.magnitudes = {}
+        self.phases = {}
+
+    def get_normalized_signal(self):
+        """Returns the normalized signal"""
+        if self.normalized_signal is None:
+            self.normalized_signal = self.signal_processor.normalize(self.raw_signal)
+        return self.normalized_signal
+
+    def get_size(self):
+        """Returns the number of values in the signal"""
+        return np.size(self.get_normalized_signal())
+
+    def get_band_spectrum(self, plan):
+        """Returns the complex band spectrum of the normalized signal"""
+
+        try:
+            return self.band_spectra[plan]
+        except KeyError:
+            band_spectrum = self.signal_processor.compute_band_spectrum(plan, self.raw_signal,
+                                                                        self.get_normalized_signal())
+            self.band_spectra[plan] = band_spectrum
+            return band_spectrum
+
+    def get_magnitude(self, plan):
+        """Returns the magnitude of the band spectrum"""
+
+        try:
+            return self.magnitudes[plan]
+        except KeyError:
+            magnitude = self.magnitudes[plan] = abs(self.get_band_spectrum(plan))
+            return magnitude
+
+    def get_phase(self, plan):
+        """Returns the phase of the band spectrum"""
+
+        try:
+            return self.phases[plan]
+        except KeyError:
+            phase = self.phases[plan] = np.angle(self.get_band_spectrum(plan))
+            return phase
@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+# -*- coding: ascii -*-
+"""camera_enumeration.py - search for OpenCV-compatible cameras in the background, with results cached on hard disk"""
+
+import cv2
+import json
+import logging
+import os
+import threading
+import time
+
+from clock import monotonic
+
+# Default location of the cache
+DEFAULT_CACHE_FILE = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'data', 'cameras.json')
+
+
+def probe_camera(index):
+    """Returns True if a frame can be read from the camera with the given index"""
+
+    capture = cv2.VideoCapture(index)
+
+    try:
+        ret, frame = capture.read()
+        return bool(ret) and frame is not None
+    except cv2.error:
+        return False
+    finally:
+        capture.release()
+
+
+class CameraEnumerator(object):
+    """Determines the indices of available cameras without blocking the caller.
+
+       The cameras are counted as before (idea from http://stackoverflow.com/a/30384945): indices are probed one after
+       another until a camera can not be read. Apparently there is still no clean OpenCV-based solution
+       (https://github.com/opencv/opencv/issues/4269), and probing takes seconds on some machines. Therefore, the result
+       is stored in a cache file. If the cache is recent, it is used without probing. Otherwise, the cached cameras are
+       returned until probing in a background thread has finished. If a camera of the cache can not be opened, the
+       cache should be invalidated, so that the cameras are probed again at the next start.
+    """
+
+    def __init__(self, cache_file=DEFAULT_CACHE_FILE, number_of_indices=2, max_age=24 * 3600):
+        """Create enumerator, nothing is done until start() is called
+
+           cache_file: JSON file for the results, None: Do not use a cache
+           number_of_indices: Maximum number of cameras
+           max_age: Age (in seconds) until the cache is probed again
+        """
+
+        self.cache_file = cache_file
+        self.number_of_indices = number_of_indices
+        self.max_age = max_age
+
+        # Indices of available cameras, known so far
+        self.cameras = []
+
+        # Event is activated when the list of cameras is final, and duration of probing (in seconds)
+        self.event_finished = threading.Event()
+        self.duration = None
+        self.thread = None
+
+    def start(self):
+        """Use cached cameras and start probing in the background if the cache is missing or too old"""
+
+        cache = self.__read_cache()
+
+        if cache is not None:
+            self.cameras = cache['cameras']
+
+            if 0 <= time.time() - cache['time'] < self.max_age:
+                logging.info("Found " + str(len(self.cameras)) + " OpenCV-compatible cameras in cache")
+                self.event_finished.set()
+                return
+
+        # Probing can take long, the thread must not delay the end of the program
+        self.thread = threading.Thread(target=self.__probe_cameras)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def __probe_cameras(self):
+        """Probe cameras, then store result in cache"""
+
+        start_time = monotonic()
+
+        cameras = []
+        for index in range(self.number_of_indices):
+            if not probe_camera(index):
+                break
+            cameras.append(index)
+
+        self.cameras = cameras
+        self.duration = monotonic() - start_time
+        logging.info("Found " + str(len(cameras)) + " OpenCV-compatible cameras in %.0f ms" % (self.duration * 1000))
+
+        self.__write_cache()
+        self.event_finished.set()
+
+    def __read_cache(self):
+        """Returns content of cache, None if there is no valid cache"""
+
+        if self.cache_file is None or not os.path.isfile(self.cache_file):
+            return None
+
+        try:
+            with open(self.cache_file) as f:
+                cache = json.load(f)
+            if cache['number_of_indices'] != self.number_of_indices:
+                return None
+            return {'cameras': [int(index) for index in cache['cameras']], 'time': float(cache['time'])}
+
+        except (IOError, ValueError, KeyError, TypeError):
+            logging.warn("Cache of cameras can not be read")
+            return None
+
+    def __write_cache(self):
+        """Store cameras in cache"""
+
+        if self.cache_file is None:
+            return
+
+        try:
+            with open(self.cache_file, 'w') as f:
+                json.dump({'cameras': self.cameras, 'time': time.time(), 'number_of_indices': self.number_of_indices}, f)
+        except IOError:
+            logging.warn("Cache of cameras can not be written")
+
+    def invalidate(self):
+        """Remove cache, e.g. because a camera of the cache is not available anymore"""
+        if self.cache_file is not None and os.path.isfile(self.cache_file):
+            os.remove(self.cache_file)
+            logging.info("Cache of cameras was removed")
+
+    def get_cameras(self):
+        """Returns indices of cameras known so far"""
+        return list(self.cameras)
+
+    def is_finished(self):
+        """Returns True if the list of cameras is final"""
+        return self.event_finished.is_set()
+
+    def wait(self, timeout=None):
+        """Wait until the list of cameras is final, returns False after timeout"""
+        return self.event_finished.wait(timeout)
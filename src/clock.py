@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# -*- coding: ascii -*-
+"""clock.py - time source of all components: real time or a virtual clock for replay as fast as possible
+
+   All components read the time with clock.now() (in seconds) instead of the wall clock. By default, a monotonic real
+   time clock is used. When the virtual clock is used, the time only advances when VideoThread provides a new frame
+   (by 1 / FPS), so that replay of a recording does not have to wait and gives the same results as real-time replay.
+   The clock has to be chosen before the threads are created.
+"""
+
+import ctypes
+import ctypes.util
+import sys
+import threading
+import time
+
+# Identifier of the monotonic clock for clock_gettime() on every platform that has it (macOS since 10.12)
+CLOCK_MONOTONIC = {'linux': 1, 'darwin': 6}
+
+
+class Timespec(ctypes.Structure):
+    """struct timespec of clock_gettime()"""
+    _fields_ = [('tv_sec', ctypes.c_long), ('tv_nsec', ctypes.c_long)]
+
+
+def __load_clock_gettime(clock_id):
+    """Returns clock_gettime() of the C library, None if it is not available or cannot read the clock"""
+    try:
+        library = ctypes.CDLL(ctypes.util.find_library('rt') or ctypes.util.find_library('c'), use_errno=True)
+        clock_gettime = library.clock_gettime
+        clock_gettime.argtypes = [ctypes.c_int, ctypes.POINTER(Timespec)]
+
+        # Check that the clock can be read
+        if clock_gettime(clock_id, ctypes.byref(Timespec())) != 0:
+            return None
+        return clock_gettime
+
+    except (OSError, AttributeError, TypeError):
+        return None
+
+
+def load_monotonic_clock(platform=sys.platform):
+    """Returns a function without arguments that returns the time of a high-resolution monotonic clock of the platform
+       (in seconds): time.clock() (QueryPerformanceCounter) on Windows, clock_gettime() on Linux and macOS. On other
+       platforms or if clock_gettime() is not available, time.time() is returned.
+    """
+
+    if platform == 'win32':
+        return time.clock
+
+    clock_id = CLOCK_MONOTONIC.get('linux' if platform.startswith('linux') else platform)
+    clock_gettime = __load_clock_gettime(clock_id) if clock_id is not None else None
+    if clock_gettime is None:
+        return time.time
+
+    def read_clock_gettime():
+        timespec = Timespec()
+        clock_gettime(clock_id, ctypes.byref(timespec))
+        return timespec.tv_sec + timespec.tv_nsec * 1e-9
+
+    return read_clock_gettime
+
+
+__monotonic_clock = load_monotonic_clock()
+
+
+def monotonic():
+    """Returns the time of a monotonic clock (in seconds), i.e. it does not jump if the system time is changed. If the
+       monotonic clock is not available, time.time() is used.
+    """
+    return __monotonic_clock()
+
+
+class RealTimeClock(object):
+    """Clock that follows real time"""
+
+    is_virtual = False
+
+    def now(self):
+        """Returns current time (in seconds)"""
+        return monotonic()
+
+    def sleep(self, seconds):
+        """Wait for the given time"""
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def advance(self, seconds):
+        """Real time advances by itself, nothing to do"""
+        pass
+
+
+class VirtualClock(object):
+    """Clock that only advances when advance() is called, e.g. once per frame of a recording"""
+
+    is_virtual = True
+
+    def __init__(self, start_time=0.0):
+        self.time = float(start_time)
+        self.lock = threading.Lock()
+
+    def now(self):
+        """Returns current virtual time (in seconds)"""
+        return self.time
+
+    def sleep(self, seconds):
+        """Virtual time does not pass by waiting, returns immediately"""
+        pass
+
+    def advance(self, seconds):
+        """Advance the virtual time"""
+        with self.lock:
+            self.time += seconds
+
+
+# Clock used by all components
+__clock = RealTimeClock()
+
+
+def get_clock():
+    """Returns the clock that is currently used"""
+    return __clock
+
+
+def use_real_time_clock():
+    """Use real time, e.g. for cameras (default)"""
+    global __clock
+    __clock = RealTimeClock()
+
+
+def use_virtual_clock(start_time=0.0):
+    """Use a virtual clock, i.e. frames from hard disk are processed as fast as possible"""
+    global __clock
+    __clock = VirtualClock(start_time)
+
+
+def is_virtual():
+    """Returns True if the virtual clock is used"""
+    return __clock.is_virtual
+
+
+def now():
+    """Returns current time of the clock (in seconds)"""
+    return __clock.now()
+
+
+def sleep(seconds):
+    """Wait for the given time of the clock"""
+    __clock.sleep(seconds)
+
+
+def advance(seconds):
+    """Advance the clock, only has an effect for the virtual clock"""
+    __clock.advance(seconds)
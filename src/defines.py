@@ -22,12 +22,21 @@ IDX_FRAMES = 4
 IDX_FACE = 5
 IDX_FPS = 6
 IDX_COLORCHANNEL = 7
+IDX_CAPTURE_WIDTH = 8
+IDX_CAPTURE_HEIGHT = 9
+IDX_CROP = 10
+IDX_PULSE_MAP_GRID = 11
+IDX_MULTI_SUBJECT = 12
 
 # Indices of algorithm parameters
 IDX_ZERO_PADDING = 0
 IDX_WIN_SIZE = 1
 IDX_RUN_MAX = 2
 IDX_MIN_TIME = 3
+IDX_PEAK_INTERPOLATION = 4
+IDX_SIGMA = 5
+IDX_SPECTRUM_BACKEND = 6
+IDX_SPECTRUM_RESOLUTION = 7
 
 # Standard values of program settings
 VAL_WEBCAM = 1
@@ -38,14 +47,30 @@ VAL_FRAMES = 0
 VAL_FACE = 0
 VAL_FPS = 25
 VAL_COLORCHANNEL = 1
+VAL_CAPTURE_WIDTH = 0
+VAL_CAPTURE_HEIGHT = 0
+VAL_CROP = 0
+VAL_PULSE_MAP_GRID = 0
+VAL_MULTI_SUBJECT = 0
 
 # Standard values of algorithm parameters
 VAL_ZERO_PADDING = 1
 VAL_WIN_SIZE = 9
 VAL_RUN_MAX = 3
 VAL_MIN_TIME = 0.5
+VAL_PEAK_INTERPOLATION = 0
+VAL_SIGMA = 0
+VAL_SPECTRUM_BACKEND = 0
+VAL_SPECTRUM_RESOLUTION = 0
 
 # Labels of algorithms in GUI
 LABEL_ALGORITHM_1 = "Estimate HR (BMT 2015)"
 LABEL_ALGORITHM_2 = "Filter signal (ISMRM 2016)"
 LABEL_ALGORITHM_3 = "Trigger MRI (ISMRM 2015)"
+LABEL_ALGORITHM_4 = "Estimate HR and trigger MRI"
+
+# Labels of peak interpolation methods in GUI (same order as spectrum.PEAK_INTERPOLATION_METHODS)
+LABEL_PEAK_INTERPOLATION = ["None", "Parabolic", "Quadratic (log)", "Jacobsen"]
+
+# Labels of spectrum backends in GUI (same order as spectrum.SPECTRUM_BACKENDS)
+LABEL_SPECTRUM_BACKEND = ["FFT", "Sliding DFT"]
@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+# -*- coding: ascii -*-
+"""face_tracking.py - face detection on a downscaled frame every few frames, with template matching in between"""
+
+import cv2
+import numpy as np
+
+# Flag of detectMultiScale(), its name depends on the version of OpenCV
+try:
+    CASCADE_SCALE_IMAGE = cv2.CASCADE_SCALE_IMAGE
+except AttributeError:
+    CASCADE_SCALE_IMAGE = cv2.cv.CV_HAAR_SCALE_IMAGE
+
+
+class FaceTracker(object):
+    """Faces of a video stream, found by a Haar cascade and tracked between detections.
+
+       The cascade only runs every ''detection_interval'' frames, on a grayscale frame that is downscaled to
+       ''detection_width'' pixels. In the other frames, every face is searched by template matching in a window around
+       its last position in the downscaled frame. The template is the face at the time of its detection, so errors do
+       not accumulate. If the normalized correlation of a face drops below ''min_confidence'' (e.g. the face turned or
+       left the frame), the cascade runs again immediately.
+    """
+
+    def __init__(self, cascade, detection_interval=10, detection_width=320, min_confidence=0.6, search_margin=0.5,
+                 min_size=(30, 30)):
+        """cascade: Object with detectMultiScale(), e.g. a cv2.CascadeClassifier
+           detection_interval: Number of frames between two detections, 1: Detection in every frame
+           detection_width: Width of the downscaled frame (in pixels), smaller frames are not scaled
+           min_confidence: Minimum correlation (-1..1) of a tracked face
+           search_margin: Size of the search window around the last position, relative to the size of the face
+           min_size: Minimum size of a face in the original frame (in pixels)
+        """
+
+        if detection_interval < 1:
+            raise ValueError("Interval of face detection has to be at least 1")
+
+        self.cascade = cascade
+        self.detection_interval = int(detection_interval)
+        self.detection_width = detection_width
+        self.min_confidence = min_confidence
+        self.search_margin = search_margin
+        self.min_size = min_size
+
+        # Scale of the downscaled frame
+        self.scale = 1.0
+
+        # Statistics
+        self.number_of_frames = 0
+        self.number_of_detections = 0
+        self.number_of_lost_faces = 0
+
+        self.clear()
+
+    def clear(self):
+        """Forget all faces, the next frame is a detection"""
+
+        # Boxes (x, y, w, h) in the downscaled frame, templates and correlation of the faces
+        self.boxes = []
+        self.templates = []
+        self.confidences = []
+
+        # Number of frames since the last detection, None: No detection so far
+        self.framesSinceDetection = None
+
+    def update(self, frame):
+        """Find the faces in a new frame (RGB or grayscale), returns their boxes as list of (x, y, w, h)"""
+
+        self.number_of_frames += 1
+
+        gray = self.__downscale(frame)
+
+        detect = self.framesSinceDetection is None or self.framesSinceDetection + 1 >= self.detection_interval
+        if not detect and not self.__track(gray):
+            self.number_of_lost_faces += 1
+            detect = True
+
+        if detect:
+            self.__detect(gray)
+        else:
+            self.framesSinceDetection += 1
+
+        return self.get_faces()
+
+    def __downscale(self, frame):
+        """Returns the grayscale frame downscaled to the width of the detection"""
+
+        if frame.ndim == 3:
+            frame = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
+
+        self.scale = min(1.0, float(self.detection_width) / np.size(frame, 1))
+        if self.scale < 1.0:
+            frame = cv2.resize(frame, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+
+        return frame
+
+    def __detect(self, gray):
+        """Run the cascade and store the found faces with their templates"""
+
+        self.number_of_detections += 1
+        self.framesSinceDetection = 0
+
+        min_size = tuple(max(1, int(round(size * self.scale))) for size in self.min_size)
+        faces = self.cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=min_size,
+                                              flags=CASCADE_SCALE_IMAGE)
+
+        self.boxes = [tuple(int(value) for value in face) for face in faces]
+        self.templates = [gray[y:y + h, x:x + w].copy() for (x, y, w, h) in self.boxes]
+        self.confidences = [1.0] * len(self.boxes)
+
+    def __track(self, gray):
+        """Search the faces near their last positions, returns False if a face has been lost"""
+
+        height, width = gray.shape
+
+        for index, (x, y, w, h) in enumerate(self.boxes):
+
+            # Search window around the last position, limited to the frame
+            margin_x = int(np.ceil(self.search_margin * w))
+            margin_y = int(np.ceil(self.search_margin * h))
+            x_min, x_max = max(0, x - margin_x), min(width, x + w + margin_x)
+            y_min, y_max = max(0, y - margin_y), min(height, y + h + margin_y)
+
+            # Face is (partly) outside the frame
+            if x_max - x_min < w or y_max - y_min < h:
+                return False
+
+            result = cv2.matchTemplate(gray[y_min:y_max, x_min:x_max], self.templates[index], cv2.TM_CCOEFF_NORMED)
+            _, confidence, _, max_loc = cv2.minMaxLoc(result)
+
+            if not confidence >= self.min_confidence:
+                return False
+
+            self.boxes[index] = (x_min + max_loc[0], y_min + max_loc[1], w, h)
+            self.confidences[index] = confidence
+
+        return True
+
+    def get_faces(self):
+        """Returns the boxes (x, y, w, h) of the faces in the original frame"""
+        return [tuple(int(round(value / self.scale)) for value in box) for box in self.boxes]
+
+    def get_confidences(self):
+        """Returns the correlation of every face with its template, 1 directly after a detection"""
+        return list(self.confidences)
+
+    def get_statistics(self):
+        """Returns number of frames, detections and faces that have been lost while tracking"""
+        return {'frames': self.number_of_frames,
+                'detections': self.number_of_detections,
+                'lost_faces': self.number_of_lost_faces}
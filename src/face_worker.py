@@ -0,0 +1,202 @@
+#!/usr/bin/env python
+# -*- coding: ascii -*-
+"""face_worker.py - face detection in a separate process, frames are passed through shared memory"""
+
+import ctypes
+import logging
+import multiprocessing
+import os
+import Queue
+
+import cv2
+import numpy as np
+
+from face_tracking import FaceTracker
+
+# Default cascade of the repository
+CASCADE_FILE = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'data', 'haarcascade_frontalface_default.xml')
+
+# Slots are enlarged by this factor if a frame does not fit, so that growing frames do not restart the worker every time
+SLOT_HEADROOM = 1.5
+
+
+class FaceDetectionWorker(object):
+    """Runs a FaceTracker in a worker process, so that face detection uses another core and neither blocks the Tk
+       mainloop nor holds the GIL of the processes' threads.
+
+       Frames are written as grayscale images into a ring of slots in shared memory. Every slot has the number of the
+       submission (-1 while it is written) and the sequence number of its frame. The worker always takes the newest
+       frame and skips the older ones, the slot it reads is never overwritten. Boxes of the faces are published with the
+       sequence number of their frame. submit() and get_faces() never wait for the worker.
+
+       The process is started by the first frame. The slots have the size given by set_slot_size() (e.g. the full frame
+       of the camera, so that frames cropped to the ROI always fit) or the size of the first frame if it is larger. A
+       frame that does not fit restarts the worker with slots that are larger by SLOT_HEADROOM.
+    """
+
+    def __init__(self, number_of_slots=3, cascade_file=CASCADE_FILE, **tracker_options):
+        """number_of_slots: Number of frames in shared memory, at least 2
+           tracker_options: Options of the FaceTracker in the worker (e.g. detection_interval)
+        """
+
+        if number_of_slots < 2:
+            raise ValueError("Shared memory needs at least 2 slots")
+
+        self.numberOfSlots = number_of_slots
+        self.cascadeFile = cascade_file
+        self.trackerOptions = tracker_options
+
+        self.process = None
+        self.slotSize = 0
+        self.requestedSlotSize = 0
+
+        # Latest boxes and sequence number of their frame
+        self.faces = []
+        self.sequenceNumber = None
+
+        # Statistics
+        self.numberOfSubmittedFrames = 0
+        self.numberOfResults = 0
+
+    def start(self, slot_size):
+        """Start worker process with slots of slot_size pixels"""
+
+        self.stop()
+
+        self.slotSize = int(slot_size)
+        self.frames = multiprocessing.RawArray(ctypes.c_uint8, self.numberOfSlots * self.slotSize)
+        self.frameArray = np.frombuffer(self.frames, dtype=np.uint8).reshape(self.numberOfSlots, self.slotSize)
+
+        # Number of submission, sequence number, height and width of the frame of every slot, newest slot and slot
+        # used by the worker
+        self.slotSubmissions = multiprocessing.RawArray(ctypes.c_longlong, [-1] * self.numberOfSlots)
+        self.slotSequenceNumbers = multiprocessing.RawArray(ctypes.c_longlong, self.numberOfSlots)
+        self.slotShapes = multiprocessing.RawArray(ctypes.c_int, 2 * self.numberOfSlots)
+        self.newestSlot = multiprocessing.RawValue(ctypes.c_int, -1)
+        self.workerSlot = multiprocessing.RawValue(ctypes.c_int, -1)
+        self.nextSlot = 0
+
+        self.lock = multiprocessing.Lock()
+        self.eventFrameAvailable = multiprocessing.Event()
+        self.eventStop = multiprocessing.Event()
+        self.results = multiprocessing.Queue()
+
+        self.process = multiprocessing.Process(target=run_worker, args=(
+            self.frames, self.numberOfSlots, self.slotSubmissions, self.slotSequenceNumbers, self.slotShapes,
+            self.newestSlot, self.workerSlot, self.lock, self.eventFrameAvailable, self.eventStop, self.results,
+            self.cascadeFile, self.trackerOptions))
+        self.process.daemon = True
+        self.process.start()
+
+        logging.info("Started face detection worker process with %d slots of %d pixels" %
+                     (self.numberOfSlots, self.slotSize))
+
+    def stop(self):
+        """Stop worker process and forget the faces"""
+
+        if self.process is not None:
+            self.eventStop.set()
+            self.eventFrameAvailable.set()
+            self.process.join(2)
+            if self.process.is_alive():
+                self.process.terminate()
+            self.results.close()
+            self.process = None
+            logging.info("Stopped face detection worker process")
+
+        self.faces = []
+        self.sequenceNumber = None
+
+    def set_slot_size(self, slot_size):
+        """Size of the slots (in pixels) when the worker is started, e.g. width x height of the camera frames"""
+        self.requestedSlotSize = int(slot_size)
+
+    def is_running(self):
+        """Returns True if the worker process is alive"""
+        return self.process is not None and self.process.is_alive()
+
+    def submit(self, frame, sequence_number):
+        """Pass a frame (RGB or grayscale) to the worker, frames that the worker has not taken yet are skipped"""
+
+        height, width = frame.shape[:2]
+        if self.process is None:
+            self.start(max(height * width, self.requestedSlotSize))
+        elif height * width > self.slotSize:
+            logging.warn("Frame of %d x %d pixels does not fit into shared memory, restarting face detection worker" %
+                         (height, width))
+            self.start(int(height * width * SLOT_HEADROOM))
+
+        # Choose a slot that is not read by the worker and mark it as being written
+        with self.lock:
+            slot = self.nextSlot
+            if slot == self.workerSlot.value:
+                slot = (slot + 1) % self.numberOfSlots
+            self.nextSlot = (slot + 1) % self.numberOfSlots
+            self.slotSubmissions[slot] = -1
+
+        # Write grayscale frame directly into shared memory
+        destination = self.frameArray[slot, :height * width].reshape(height, width)
+        if frame.ndim == 3:
+            cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY, dst=destination)
+        else:
+            destination[:] = frame
+
+        with self.lock:
+            self.slotShapes[2 * slot] = height
+            self.slotShapes[2 * slot + 1] = width
+            self.slotSequenceNumbers[slot] = sequence_number
+            self.slotSubmissions[slot] = self.numberOfSubmittedFrames
+            self.newestSlot.value = slot
+
+        self.numberOfSubmittedFrames += 1
+        self.eventFrameAvailable.set()
+
+    def get_faces(self):
+        """Returns the latest boxes (x, y, w, h) and the sequence number of their frame (None: no result so far)"""
+
+        if self.process is not None:
+            try:
+                while True:
+                    self.sequenceNumber, self.faces = self.results.get_nowait()
+                    self.numberOfResults += 1
+            except Queue.Empty:
+                pass
+
+        return self.faces, self.sequenceNumber
+
+    def get_statistics(self):
+        """Returns number of submitted frames and of results, frames in between have been skipped by the worker"""
+        return {'submitted_frames': self.numberOfSubmittedFrames,
+                'results': self.numberOfResults}
+
+
+def run_worker(frames, number_of_slots, slot_submissions, slot_sequence_numbers, slot_shapes, newest_slot, worker_slot,
+               lock, event_frame_available, event_stop, results, cascade_file, tracker_options):
+    """Main function of the worker process: Find faces in the newest frame until the stop event is set"""
+
+    frame_array = np.frombuffer(frames, dtype=np.uint8).reshape(number_of_slots, -1)
+    face_tracker = FaceTracker(cv2.CascadeClassifier(cascade_file), **tracker_options)
+    last_submission = -1
+
+    while not event_stop.is_set():
+
+        if not event_frame_available.wait(0.5):
+            continue
+        event_frame_available.clear()
+
+        # Take newest frame, the slot is not overwritten while it is used
+        with lock:
+            slot = newest_slot.value
+            if slot < 0 or slot_submissions[slot] <= last_submission:
+                continue
+            last_submission = slot_submissions[slot]
+            sequence_number = slot_sequence_numbers[slot]
+            height, width = slot_shapes[2 * slot], slot_shapes[2 * slot + 1]
+            worker_slot.value = slot
+
+        faces = face_tracker.update(frame_array[slot, :height * width].reshape(height, width))
+
+        with lock:
+            worker_slot.value = -1
+
+        results.put((sequence_number, faces))
@@ -0,0 +1,231 @@
+#!/usr/bin/env python
+# -*- coding: ascii -*-
+"""frame_archive.py - archive of raw frames that is read with np.memmap, e.g. for repeatable benchmarks
+
+   Layout of an archive file (little endian):
+   - Header (HEADER_DTYPE, padded to HEADER_SIZE bytes)
+   - Frames: number_of_frames x height x width x channels values (uint8), beginning at a multiple of PAGE_SIZE
+   - Timestamps: number_of_frames values (float64, in ms), beginning at index_offset
+
+   The timestamps are stored after the frames, so that frames can be written one after another without knowing the
+   number of frames in advance.
+"""
+
+import cv2
+import numpy as np
+import os
+import re
+
+# File extension and identification of archives
+ARCHIVE_EXTENSION = '.vbcg'
+ARCHIVE_MAGIC = 'VBCGARC1'
+ARCHIVE_VERSION = 1
+
+HEADER_DTYPE = np.dtype([('magic', 'S8'),
+                         ('version', '<u4'),
+                         ('height', '<u4'),
+                         ('width', '<u4'),
+                         ('channels', '<u4'),
+                         ('number_of_frames', '<u8'),
+                         ('fps', '<f8'),
+                         ('frames_offset', '<u8'),
+                         ('index_offset', '<u8')])
+HEADER_SIZE = 64
+PAGE_SIZE = 4096
+
+
+class FrameArchiveWriter(object):
+    """Writes frames and their timestamps to a new archive"""
+
+    def __init__(self, file_name, fps):
+        """Create archive file, the dimensions of the frames are taken from the first frame
+
+           file_name: Path of the archive
+           fps: Nominal FPS of the recording
+        """
+
+        self.file_name = file_name
+        self.fps = float(fps)
+        self.file = open(file_name, 'wb')
+        self.shape = None
+        self.timestamps = []
+
+    def append(self, frame, timestamp=None):
+        """Append frame (uint8 with 1 or 3 channels). If no timestamp (in ms) is given, it is computed from the number
+           of frames and the FPS.
+        """
+
+        frame = np.ascontiguousarray(frame, dtype=np.uint8)
+        if frame.ndim == 2:
+            frame = frame[:, :, np.newaxis]
+
+        # First frame: Frames begin at a page boundary
+        if self.shape is None:
+            self.shape = frame.shape
+            self.file.seek(PAGE_SIZE)
+        elif frame.shape != self.shape:
+            raise ValueError("All frames of an archive must have the same dimensions")
+
+        if timestamp is None:
+            timestamp = len(self.timestamps) * 1000.0 / self.fps
+
+        self.file.write(frame.tobytes())
+        self.timestamps.append(timestamp)
+
+    def close(self):
+        """Write timestamps and header, then close file"""
+
+        if self.shape is None:
+            self.shape = (0, 0, 0)
+            self.file.seek(PAGE_SIZE)
+
+        index_offset = self.file.tell()
+        self.file.write(np.asarray(self.timestamps, dtype='<f8').tobytes())
+
+        header = np.zeros(1, dtype=HEADER_DTYPE)
+        header['magic'] = ARCHIVE_MAGIC
+        header['version'] = ARCHIVE_VERSION
+        header['height'], header['width'], header['channels'] = self.shape
+        header['number_of_frames'] = len(self.timestamps)
+        header['fps'] = self.fps
+        header['frames_offset'] = PAGE_SIZE
+        header['index_offset'] = index_offset
+
+        self.file.seek(0)
+        self.file.write(header.tobytes())
+        self.file.close()
+
+
+class FrameArchive(object):
+    """Read-only access to an archive. The frames are views of a memory map of the file, i.e. they are not copied
+       and only the pages that are accessed are read (the page cache of the operating system does the prefetching).
+    """
+
+    def __init__(self, file_name):
+        """Map archive file into memory, raises IOError if the file is not an archive"""
+
+        self.file_name = file_name
+
+        header = np.fromfile(file_name, dtype=HEADER_DTYPE, count=1)
+        if np.size(header) != 1 or header['magic'][0] != ARCHIVE_MAGIC:
+            raise IOError(str(file_name) + " is not a frame archive")
+        if header['version'][0] != ARCHIVE_VERSION:
+            raise IOError("Version " + str(header['version'][0]) + " of frame archive is not supported")
+
+        self.number_of_frames = int(header['number_of_frames'][0])
+        self.shape = (int(header['height'][0]), int(header['width'][0]), int(header['channels'][0]))
+        self.fps = float(header['fps'][0])
+
+        if self.number_of_frames > 0:
+            self.frames = np.memmap(file_name, dtype=np.uint8, mode='r', offset=int(header['frames_offset'][0]),
+                                    shape=(self.number_of_frames,) + self.shape)
+            self.timestamps = np.memmap(file_name, dtype='<f8', mode='r', offset=int(header['index_offset'][0]),
+                                        shape=(self.number_of_frames,))
+        else:
+            self.frames = np.zeros((0,) + self.shape, dtype=np.uint8)
+            self.timestamps = np.zeros(0)
+
+    def __len__(self):
+        return self.number_of_frames
+
+    def __getitem__(self, index):
+        """Returns frame with given index, 2D if the frames have one channel only"""
+        frame = self.frames[index]
+        return frame[:, :, 0] if self.shape[2] == 1 else frame
+
+    def get_timestamp(self, index):
+        """Returns timestamp of frame with given index (in ms)"""
+        return float(self.timestamps[index])
+
+    def close(self):
+        """Remove memory maps, views of frames that are still used keep the file mapped"""
+        self.frames = self.timestamps = None
+
+
+def sort_numbered_files(files):
+    """Sort file names by the first number they contain, e.g. frame2.jpg before frame10.jpg. Files without number are
+       ignored.
+    """
+
+    numbered_files = []
+    for file_name in files:
+        m = re.search(r"\d+", file_name)
+        if m is not None:
+            numbered_files.append((int(m.group()), file_name))
+
+    return [file_name for _, file_name in sorted(numbered_files)]
+
+
+def convert_image_folder(directory, file_name, fps=25.0, timestamps_from_files=False, pad_frames=False):
+    """Write the numbered images of a folder to an archive, returns the number of frames
+
+       directory: Folder containing the images, e.g. frame0.png frame1.png frame2.png ...
+       file_name: Path of the archive
+       fps: Nominal FPS, used for timestamps and replay
+       timestamps_from_files: Use modification times of the files as timestamps instead of the FPS. If they are not
+                              strictly increasing (e.g. file systems that store seconds only), the timestamps are
+                              computed from the FPS.
+       pad_frames: Pad smaller frames with black pixels at the bottom and on the right to the size of the largest
+                   frame, otherwise all images must have the same size
+    """
+
+    files = sort_numbered_files([f for f in os.listdir(directory) if os.path.isfile(os.path.join(directory, f))])
+    paths = [os.path.join(directory, f) for f in files]
+
+    # Size of the largest frame
+    if pad_frames:
+        shapes = [frame.shape[:2] for frame in (cv2.imread(path) for path in paths) if frame is not None]
+        max_height = max([height for height, _ in shapes] + [0])
+        max_width = max([width for _, width in shapes] + [0])
+
+    # Modification times are only used if they order the frames
+    if timestamps_from_files:
+        modification_times = [os.path.getmtime(path) for path in paths]
+        if np.any(np.diff(modification_times) <= 0):
+            timestamps_from_files = False
+
+    writer = FrameArchiveWriter(file_name, fps)
+    first_modification_time = None
+
+    try:
+        for num, path in enumerate(paths):
+
+            frame = cv2.imread(path)
+            if frame is None:
+                continue
+
+            if pad_frames:
+                frame = cv2.copyMakeBorder(frame, 0, max_height - np.size(frame, 0), 0, max_width - np.size(frame, 1),
+                                           cv2.BORDER_CONSTANT, value=0)
+
+            timestamp = None
+            if timestamps_from_files:
+                if first_modification_time is None:
+                    first_modification_time = modification_times[num]
+                timestamp = (modification_times[num] - first_modification_time) * 1000.0
+
+            writer.append(frame, timestamp)
+
+    finally:
+        writer.close()
+
+    return len(writer.timestamps)
+
+
+def convert_recording(directory, file_name):
+    """Write a recording of WindowVideo (folder with frame2.jpg, frame3.jpg, ...) to an archive, returns the number of
+       frames. The frames were written when they were displayed, so their modification times are used as timestamps
+       and the FPS is estimated from them.
+
+       Frames that have been cropped to the ROI ("Crop to ROI") are smaller than the others. Their position in the full
+       frame is not recorded, so they are padded at the bottom and on the right to the size of the largest frame.
+    """
+
+    files = sort_numbered_files(os.listdir(directory))
+    modification_times = [os.path.getmtime(os.path.join(directory, f)) for f in files]
+
+    fps = 25.0
+    if len(files) > 1 and modification_times[-1] > modification_times[0]:
+        fps = (len(files) - 1) / (modification_times[-1] - modification_times[0])
+
+    return convert_image_folder(directory, file_name, fps, timestamps_from_files=True, pad_frames=True)
@@ -0,0 +1,310 @@
+#!/usr/bin/env python
+# -*- coding: ascii -*-
+"""frame_loader.py - reading frames from hard disk: ahead of time from a folder, from a video file or an archive"""
+
+import collections
+import cv2
+import os
+import time
+
+from frame_archive import FrameArchive
+from multiprocessing.pool import ThreadPool
+from ring_buffer import CircularHistory
+
+
+def read_frame(file_name):
+    """Read and decode a frame, returns frame and time needed for decoding (in seconds)"""
+    start_time = time.time()
+    frame = cv2.imread(file_name)
+    return frame, time.time() - start_time
+
+
+class PrefetchingFrameLoader(object):
+    """Reads the frames of a folder on a small pool of threads, so that reading and decoding of upcoming frames
+       overlaps with the processing of the current one (cv2.imread() releases the GIL).
+
+       At most ''queue_size'' frames are read ahead. The frames are returned in the order of the file list, a file that
+       can not be read results in None, as with cv2.imread().
+    """
+
+    def __init__(self, directory, files, number_of_threads=2, queue_size=8):
+        """Store file list and start reading the first frames
+
+           directory: Folder containing the files
+           files: List of file names in the order they should be returned
+           number_of_threads: Number of threads that read frames
+           queue_size: Maximum number of frames that are read ahead
+        """
+
+        self.directory = directory
+        self.files = files
+        self.queue_size = max(1, int(queue_size))
+
+        # Pool of threads and results of submitted files in order of file list
+        self.pool = ThreadPool(max(1, int(number_of_threads)))
+        self.pending = collections.deque()
+
+        # Index of next file that is submitted to the pool
+        self.next_file = 0
+
+        # Statistics: Decoding time of the last frames and time the caller had to wait for them
+        self.decode_times = CircularHistory(100)
+        self.wait_times = CircularHistory(100)
+        self.number_of_frames = 0
+        self.number_of_stalls = 0
+
+        self.__fill_queue()
+
+    def __fill_queue(self):
+        """Submit files until the queue is full or all files have been submitted"""
+        while len(self.pending) < self.queue_size and self.next_file < len(self.files):
+            file_name = os.path.join(self.directory, self.files[self.next_file])
+            self.pending.append(self.pool.apply_async(read_frame, (file_name,)))
+            self.next_file += 1
+
+    def get_frame(self):
+        """Returns the next frame, raises IndexError if all frames have been returned"""
+
+        if not self.pending:
+            raise IndexError("All frames have been read")
+
+        # Frame was not ready, i.e. the caller had to wait
+        result = self.pending.popleft()
+        if not result.ready():
+            self.number_of_stalls += 1
+
+        start_time = time.time()
+        frame, decode_time = result.get()
+        self.wait_times.append(time.time() - start_time)
+        self.decode_times.append(decode_time)
+        self.number_of_frames += 1
+
+        # Submit next file
+        self.__fill_queue()
+
+        return frame
+
+    def get_timestamp(self):
+        """Files have no timestamps, returns None"""
+        return None
+
+    def get_queue_depth(self):
+        """Returns the number of frames that have already been read and wait for the caller"""
+        return sum(1 for result in self.pending if result.ready())
+
+    def get_statistics(self):
+        """Returns number of returned frames, current queue depth, mean and maximum decoding time and mean waiting time
+           of the last 100 frames (in seconds) and the number of frames that were not ready when they were requested.
+        """
+
+        decode_times = self.decode_times.get_values()
+
+        return {'frames': self.number_of_frames,
+                'queue_depth': self.get_queue_depth(),
+                'decode_time_mean': self.decode_times.get_mean(),
+                'decode_time_max': float(decode_times.max()) if decode_times.size else 0.0,
+                'wait_time_mean': self.wait_times.get_mean(),
+                'stalls': self.number_of_stalls}
+
+    def close(self):
+        """Stop all threads, frames that were read ahead are dropped"""
+        self.pending.clear()
+        self.pool.terminate()
+        self.pool.join()
+
+
+class VideoFileLoader(object):
+    """Reads the frames of a video file (e.g. AVI or MP4) with cv2.VideoCapture. The frames are decoded sequentially
+       when they are requested, which avoids listing and opening thousands of small files.
+
+       The interface is the same as for PrefetchingFrameLoader. In addition, the loader can jump to any frame and
+       provides the timestamps of the container.
+    """
+
+    def __init__(self, file_name):
+        """Open video file, raises IOError if the file can not be opened
+
+           file_name: Path of the video file
+        """
+
+        self.file_name = file_name
+        self.capture = cv2.VideoCapture(file_name)
+
+        if not self.capture.isOpened():
+            raise IOError("Video file " + str(file_name) + " can not be opened")
+
+        # Properties of the container, the number of frames is an estimate for some formats
+        self.fps = self.capture.get(cv2.CAP_PROP_FPS)
+        self.frame_count = int(self.capture.get(cv2.CAP_PROP_FRAME_COUNT))
+
+        # Index of the next frame and timestamp of the last returned frame (in ms)
+        self.position = 0
+        self.timestamp = None
+
+        # Statistics: Decoding time of the last frames
+        self.decode_times = CircularHistory(100)
+        self.number_of_frames = 0
+
+    def get_frame(self):
+        """Returns the next frame, raises IndexError if all frames have been returned"""
+
+        start_time = time.time()
+        ret, frame = self.capture.read()
+        self.decode_times.append(time.time() - start_time)
+
+        if not ret:
+            raise IndexError("All frames have been read")
+
+        self.timestamp = self.__get_timestamp(self.position)
+        self.position += 1
+        self.number_of_frames += 1
+
+        return frame
+
+    def __get_timestamp(self, index):
+        """Returns timestamp of the last decoded frame from the container. Some backends do not provide it, then it is
+           computed from the index and the FPS of the container.
+        """
+
+        timestamp = self.capture.get(cv2.CAP_PROP_POS_MSEC)
+
+        if timestamp <= 0 < index and self.fps > 0:
+            timestamp = index * 1000.0 / self.fps
+
+        return timestamp
+
+    def seek(self, frame_index):
+        """Jump to a frame, i.e. the next call of get_frame() returns the frame with the given index (starting at 0).
+           Raises IndexError if the video file does not contain the frame.
+
+           Seeking with CAP_PROP_POS_FRAMES jumps to a key frame for some codecs. If the position reported afterwards
+           differs, the video is decoded from the beginning up to the frame instead.
+        """
+
+        frame_index = int(frame_index)
+
+        if frame_index < 0 or frame_index >= self.frame_count > 0:
+            raise IndexError("Frame " + str(frame_index) + " is not in video file")
+
+        if not self.capture.set(cv2.CAP_PROP_POS_FRAMES, frame_index) or \
+                int(round(self.capture.get(cv2.CAP_PROP_POS_FRAMES))) != frame_index:
+
+            # Reopen file and decode (without conversion of the frames) until the frame has been reached
+            self.capture.release()
+            self.capture = cv2.VideoCapture(self.file_name)
+            for num in range(0, frame_index):
+                if not self.capture.grab():
+                    raise IndexError("Frame " + str(frame_index) + " is not in video file")
+
+        self.position = frame_index
+        self.timestamp = None
+
+    def get_position(self):
+        """Returns the index of the next frame"""
+        return self.position
+
+    def get_timestamp(self):
+        """Returns the timestamp of the last returned frame in the container (in ms), None if no frame was returned"""
+        return self.timestamp
+
+    def get_queue_depth(self):
+        """Frames are not read ahead, returns 0"""
+        return 0
+
+    def get_statistics(self):
+        """Returns the same statistics as PrefetchingFrameLoader.get_statistics(). As frames are decoded when they are
+           requested, the caller waits for every frame during its decoding time.
+        """
+
+        decode_times = self.decode_times.get_values()
+
+        return {'frames': self.number_of_frames,
+                'queue_depth': 0,
+                'decode_time_mean': self.decode_times.get_mean(),
+                'decode_time_max': float(decode_times.max()) if decode_times.size else 0.0,
+                'wait_time_mean': self.decode_times.get_mean(),
+                'stalls': self.number_of_frames}
+
+    def close(self):
+        """Release video file"""
+        self.capture.release()
+
+
+class FrameArchiveLoader(object):
+    """Reads the frames of a FrameArchive. Every frame is a read-only view of the memory map, i.e. replay is not limited
+       by decoding. The interface is the same as for VideoFileLoader.
+    """
+
+    def __init__(self, file_name):
+        """Open archive, raises IOError if the file is not an archive"""
+
+        self.file_name = file_name
+        self.archive = FrameArchive(file_name)
+
+        self.fps = self.archive.fps
+        self.frame_count = len(self.archive)
+
+        # Index of the next frame and timestamp of the last returned frame (in ms)
+        self.position = 0
+        self.timestamp = None
+
+        # Statistics: Time needed to access the last frames
+        self.decode_times = CircularHistory(100)
+        self.number_of_frames = 0
+
+    def get_frame(self):
+        """Returns the next frame, raises IndexError if all frames have been returned"""
+
+        if self.position >= self.frame_count:
+            raise IndexError("All frames have been read")
+
+        start_time = time.time()
+        frame = self.archive[self.position]
+        self.decode_times.append(time.time() - start_time)
+
+        self.timestamp = self.archive.get_timestamp(self.position)
+        self.position += 1
+        self.number_of_frames += 1
+
+        return frame
+
+    def seek(self, frame_index):
+        """Jump to a frame, raises IndexError if the archive does not contain the frame"""
+
+        frame_index = int(frame_index)
+
+        if frame_index < 0 or frame_index >= self.frame_count:
+            raise IndexError("Frame " + str(frame_index) + " is not in archive")
+
+        self.position = frame_index
+        self.timestamp = None
+
+    def get_position(self):
+        """Returns the index of the next frame"""
+        return self.position
+
+    def get_timestamp(self):
+        """Returns the timestamp of the last returned frame (in ms), None if no frame was returned"""
+        return self.timestamp
+
+    def get_queue_depth(self):
+        """Frames are not read ahead, returns 0"""
+        return 0
+
+    def get_statistics(self):
+        """Returns the same statistics as PrefetchingFrameLoader.get_statistics(), the decoding time is the time needed
+           to create the view of a frame.
+        """
+
+        decode_times = self.decode_times.get_values()
+
+        return {'frames': self.number_of_frames,
+                'queue_depth': 0,
+                'decode_time_mean': self.decode_times.get_mean(),
+                'decode_time_max': float(decode_times.max()) if decode_times.size else 0.0,
+                'wait_time_mean': self.decode_times.get_mean(),
+                'stalls': 0}
+
+    def close(self):
+        """Close archive"""
+        self.archive.close()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: ascii -*-
+"""frame_pool.py - fixed number of reusable frame buffers, so that capturing and converting frames does not allocate
+   new arrays for every frame
+"""
+
+import numpy as np
+import threading
+
+
+class FramePool(object):
+    """Buffers of one shape with reference counts. A buffer is returned to the pool when its last reference has been
+       released and is then reused by acquire().
+
+       The buffers are allocated when they are needed for the first time. If all buffers are in use, acquire() returns
+       a new array that is not part of the pool (the pool is exhausted). Releasing such an array has no effect. If the
+       shape changes (e.g. the ROI of cropped frames), the free buffers are dropped and buffers of the new shape are
+       allocated, buffers that are still in use are dropped when they are released.
+    """
+
+    def __init__(self, size, dtype=np.uint8):
+        """size: Maximum number of buffers"""
+
+        self.size = size
+        self.dtype = dtype
+        self.shape = None
+
+        # Buffers of current shape and those that are not in use
+        self.buffers = []
+        self.free_buffers = []
+
+        # References of buffers in use: id of buffer -> [buffer, number of references]
+        self.references = {}
+
+        self.lock = threading.Lock()
+
+        # Statistics
+        self.number_of_acquisitions = 0
+        self.number_of_allocations = 0
+        self.number_of_exhaustions = 0
+
+    def acquire(self, shape):
+        """Returns a writable buffer of the given shape with one reference"""
+
+        shape = tuple(shape)
+
+        with self.lock:
+
+            self.number_of_acquisitions += 1
+
+            if shape != self.shape:
+                self.shape = shape
+                self.buffers = []
+                self.free_buffers = []
+
+            if self.free_buffers:
+                buffer = self.free_buffers.pop()
+            elif len(self.buffers) < self.size:
+                buffer = np.empty(shape, dtype=self.dtype)
+                self.buffers.append(buffer)
+                self.number_of_allocations += 1
+            else:
+                # All buffers are in use
+                self.number_of_exhaustions += 1
+                return np.empty(shape, dtype=self.dtype)
+
+            buffer.flags.writeable = True
+            self.references[id(buffer)] = [buffer, 1]
+
+            return buffer
+
+    def add_reference(self, buffer):
+        """Another user of the buffer, it is only returned after it has been released by all users"""
+        with self.lock:
+            if id(buffer) in self.references:
+                self.references[id(buffer)][1] += 1
+
+    def release(self, buffer):
+        """Release one reference, the buffer can be reused when no references are left"""
+
+        if buffer is None:
+            return
+
+        with self.lock:
+
+            reference = self.references.get(id(buffer))
+            if reference is None or reference[0] is not buffer:
+                return
+
+            reference[1] -= 1
+            if reference[1] > 0:
+                return
+
+            del self.references[id(buffer)]
+            if any(pool_buffer is buffer for pool_buffer in self.buffers):
+                self.free_buffers.append(buffer)
+
+    def is_in_use(self, buffer):
+        """Returns True if the buffer belongs to the pool and has not been released by all users"""
+        with self.lock:
+            reference = self.references.get(id(buffer))
+            return reference is not None and reference[0] is buffer
+
+    def get_statistics(self):
+        """Returns number of buffers, buffers in use, acquisitions, allocations and acquisitions that could not be
+           served by the pool (exhaustions)
+        """
+        with self.lock:
+            return {'buffers': len(self.buffers),
+                    'in_use': len(self.references),
+                    'acquisitions': self.number_of_acquisitions,
+                    'allocations': self.number_of_allocations,
+                    'exhaustions': self.number_of_exhaustions}
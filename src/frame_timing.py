@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding: ascii -*-
+"""frame_timing.py - capture times of frames: statistics and resampling of the signal onto a uniform time grid"""
+
+import numpy as np
+
+from ring_buffer import CircularHistory
+
+# Timing of the signal in the processing thread:
+# 'nominal': Values are assumed to be 1 / FPS apart (as before capture times were available)
+# 'resample': Values are resampled onto a uniform grid with 1 / FPS spacing (UniformResampler)
+# 'measured': Values are used as they are, the algorithms get the measured frame rate instead of the FPS setting
+TIMING_METHODS = ('nominal', 'resample', 'measured')
+
+
+class UniformResampler(object):
+    """Converts values with irregular capture times into values on a uniform grid of times by linear interpolation.
+
+       The grid starts at the time of the first value. Every new value yields the values of all grid times since the
+       previous value: none if the frame came early, one for regular frames and several if frames have been dropped.
+       If the capture times are exactly on the grid, the values are returned unchanged. If the capture time jumps back
+       (e.g. the video file has been rewound), the grid starts again at the new value.
+    """
+
+    def __init__(self, fps, max_gap=1.0):
+        """Create resampler
+
+           fps: Rate of the uniform grid
+           max_gap: If two values are more than max_gap seconds apart (e.g. replay has been paused), the gap is not
+                    interpolated and the grid starts again at the new value
+        """
+
+        if fps <= 0:
+            raise ValueError("FPS must be positive")
+
+        self.period = 1.0 / fps
+        self.max_gap = max_gap
+        self.clear()
+
+    def clear(self):
+        """Forget all values"""
+        self.last_time = self.last_value = None
+        self.grid_start = None
+        self.grid_index = 0
+
+    def push(self, timestamp, value):
+        """Add value captured at timestamp (in seconds), returns list of values at the grid times up to the timestamp"""
+
+        # Restart after long gap or jump back in time
+        if self.last_time is not None and (timestamp - self.last_time > self.max_gap or timestamp < self.last_time):
+            self.clear()
+
+        # First value: The grid starts here
+        if self.last_time is None:
+            self.last_time, self.last_value = timestamp, value
+            self.grid_start, self.grid_index = timestamp, 1
+            return [value]
+
+        # Values with the same capture time as the last one are ignored
+        if timestamp == self.last_time:
+            return []
+
+        values = []
+        duration = timestamp - self.last_time
+
+        # Grid times are computed from the start of the grid, so rounding errors do not accumulate. A small tolerance
+        # avoids that a value captured exactly on the grid is delayed by rounding errors.
+        grid_time = self.grid_start + self.grid_index * self.period
+        while grid_time <= timestamp + 1e-6 * self.period:
+            weight = min(1.0, (grid_time - self.last_time) / duration)
+            values.append(self.last_value + weight * (value - self.last_value))
+            self.grid_index += 1
+            grid_time = self.grid_start + self.grid_index * self.period
+
+        self.last_time, self.last_value = timestamp, value
+
+        return values
+
+
+class FrameTimingStatistics(object):
+    """Running statistics of the capture times and sequence numbers of the last frames: effective frame rate, jitter
+       (standard deviation of the time between frames) and number of frames that were dropped, i.e. captured but not
+       processed.
+    """
+
+    def __init__(self, size=100):
+        """size: Number of intervals between frames used for frame rate and jitter"""
+
+        self.intervals = CircularHistory(size)
+        self.last_time = self.last_sequence_number = None
+        self.number_of_frames = 0
+        self.dropped_frames = 0
+
+    def update(self, timestamp, sequence_number):
+        """Add capture time (in seconds) and sequence number of a processed frame"""
+
+        if self.last_time is not None:
+            self.intervals.append(timestamp - self.last_time)
+            self.dropped_frames += max(0, sequence_number - self.last_sequence_number - 1)
+
+        self.last_time, self.last_sequence_number = timestamp, sequence_number
+        self.number_of_frames += 1
+
+    def get_effective_fps(self):
+        """Returns the measured frame rate, 0 if it is not known yet"""
+        mean_interval = self.intervals.get_mean()
+        return 1.0 / mean_interval if mean_interval > 0 else 0.0
+
+    def get_jitter(self):
+        """Returns the standard deviation of the time between frames (in seconds)"""
+        return float(np.sqrt(max(0.0, self.intervals.get_variance())))
+
+    def get_statistics(self):
+        """Returns number of frames, effective frame rate, jitter (in seconds) and number of dropped frames"""
+        return {'frames': self.number_of_frames,
+                'effective_fps': self.get_effective_fps(),
+                'jitter': self.get_jitter(),
+                'dropped_frames': self.dropped_frames}
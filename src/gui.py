@@ -8,11 +8,9 @@ from gui_toolbarButtons import ToolbarButtons
 from gui_windowVideo import WindowVideo
 from gui_windowSignal import WindowSignal
 from defines import __version__
-from sys import platform
 
-import cv2
-import numpy as np
 import Tkinter as Tk
+import clock
 import logging
 import settings
 
@@ -28,8 +26,11 @@ class GUI(object):
         # Set title in navigation bar
         self.root.wm_title("vbcg " + str(__version__))
 
-    def start(self, video_thread):
-        """Create GUI"""
+    def start(self, video_thread, startup_time=None):
+        """Create GUI
+
+           startup_time: Start of program (clock.monotonic()), the duration of the startup is logged
+        """
 
         # Store camera thread
         self.cameraThread = video_thread
@@ -39,15 +40,10 @@ class GUI(object):
         self.main_window = MainWindow(self, self.cameraThread, self.root)
         logging.info('Main window was created')
 
-        # If we are under windows, we need an OpenCV window so that waitKey() works...
-        if platform == "win32":
-            img = np.zeros((150, 600, 3), np.uint8)
-            cv2.putText(img, 'Please do not close this window', (10, 50),
-                        cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
-            cv2.putText(img, '     (minimizing is okay!)     ', (10, 100),
-                        cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
-            cv2.namedWindow("win")
-            cv2.imshow("win", img)
+        # Log duration of startup as soon as the GUI is shown
+        if startup_time is not None:
+            self.root.after_idle(lambda: logging.info("Startup took %.0f ms" %
+                                                      ((clock.monotonic() - startup_time) * 1000)))
 
         # Start Tkinter thread
         if settings.determine_if_under_testing() is False:
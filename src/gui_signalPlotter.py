@@ -37,7 +37,10 @@ class GuiSignalPlotter(threading.Thread):
 
         # Initialize variables
         self.startTime = self.cameraActive = self.currSettings = self.dict = self.spectrumAxis = \
-            self.spectrumMax = self.valuesOutput = self.valuesOutput2 = None
+            self.spectrumMax = self.valuesOutput = self.valuesOutput2 = self.triggerStatistics = None
+
+        # Pulse map: SNR of the blocks of the ROI and their combined HR, drawn in an extra axes next to the subplots
+        self.pulseMapSNR = self.pulseMapHR = self.pulseMapAxes = None
 
         # Get current settings instance
         self.settingsInstance = settings
@@ -51,6 +54,25 @@ class GuiSignalPlotter(threading.Thread):
         """Activate event to end thread"""
         self.eventProgramEnd.set()
 
+    def __plot_pulse_map(self):
+        """Draw SNR of the blocks of the pulse map and the combined HR, if the pulse map is enabled"""
+
+        if self.pulseMapSNR is None:
+            return
+
+        # Create axes on the right of the subplots
+        if self.pulseMapAxes is None:
+            self.figureInstance.subplots_adjust(right=0.75)
+            self.pulseMapAxes = self.figureInstance.add_axes([0.79, 0.55, 0.19, 0.33])
+
+        # Blocks without power at the HR have an SNR of -inf and are not drawn
+        self.pulseMapAxes.clear()
+        self.pulseMapAxes.imshow(np.where(np.isfinite(self.pulseMapSNR), self.pulseMapSNR, np.nan),
+                                 cmap='jet', interpolation='nearest')
+        self.pulseMapAxes.set_title("SNR, HR: %d" % self.pulseMapHR, fontsize=9)
+        self.pulseMapAxes.set_xticks([])
+        self.pulseMapAxes.set_yticks([])
+
     def run(self):
         """The main functionality of the thread: The signal is obtained and plotted as fast as possible (no waiting)"""
 
@@ -71,6 +93,11 @@ class GuiSignalPlotter(threading.Thread):
 
                 self.dict = self.frameQueue.get()
 
+                # Drop older results, so that the queue does not grow if frames are processed faster than plotted
+                # (e.g. during free-running replay)
+                while self.frameQueue.empty() is False:
+                    self.frameQueue.get()
+
                 # Get data from dictionary
                 if self.currSettings[IDX_ALGORITHM] == 0:
 
@@ -89,7 +116,7 @@ class GuiSignalPlotter(threading.Thread):
                     self.valuesOutput = self.dict['valuesOutput']
                     self.valuesOutput2 = self.dict['valuesOutput2']
 
-                elif self.currSettings[IDX_ALGORITHM] == 2:
+                elif self.currSettings[IDX_ALGORITHM] >= 2:
 
                     try:
                         self.valuesOutput = self.dict['valuesOutput']
@@ -97,11 +124,16 @@ class GuiSignalPlotter(threading.Thread):
                         self.spectrumAxis = self.dict['spectrumAxis']
                         self.spectrumMax = self.dict['spectrumMax']
                         self.triggerTimes = self.dict['triggerTimes']
+                        self.triggerStatistics = self.dict['triggerStatistics']
                     except KeyError:
                         # just to be safe if the algorithm has been changed since initialization of self.curr_settings
                         self.valuesOutput = self.dict['valuesOutput']
                         self.valuesOutput2 = self.dict['valuesOutput2']
 
+                # Results of pulse map, only available if it is enabled
+                self.pulseMapSNR = self.dict.get('pulseMapSNR')
+                self.pulseMapHR = self.dict.get('pulseMapHR')
+
                 try:
 
                     # If camera available and the user enabled the option, plot signal
@@ -157,13 +189,40 @@ class GuiSignalPlotter(threading.Thread):
                             # Plot bar plot if it is available
                             if np.count_nonzero(self.triggerTimes) >= 1:
                                 self.subplotInstanceBottom.bar(np.arange(self.triggerTimes.size), self.triggerTimes)
-                                self.subplotInstanceBottom.legend(["Trigger durations"], fontsize=9)
+                                self.subplotInstanceBottom.legend(["Trigger durations (mean: %.2f s)" %
+                                                                   self.triggerStatistics['trigger_duration_mean']],
+                                                                  fontsize=9)
+                                self.subplotInstanceBottom.set_xlabel('Trigger Index')
+
+                        elif self.currSettings[IDX_ALGORITHM] == 3:
+
+                            # Plot spectrum of HR estimation if it is available
+                            if np.count_nonzero(self.valuesOutput2) >= 1:
+                                self.subplotInstanceTop.plot(self.spectrumAxis, self.valuesOutput2)
+                                self.subplotInstanceTop.plot(self.spectrumAxis[self.spectrumMax],
+                                                             self.valuesOutput2[self.spectrumMax], 'r*')
+
+                            self.subplotInstanceTop.legend(["One-sided Amplitude spectrum",
+                                                            "Maximum value"], fontsize=9)
+                            self.subplotInstanceTop.set_xlabel('Hz')
+
+                            # Plot bar plot of trigger estimation if it is available
+                            if np.count_nonzero(self.triggerTimes) >= 1:
+                                self.subplotInstanceBottom.bar(np.arange(self.triggerTimes.size), self.triggerTimes)
+                                self.subplotInstanceBottom.legend(["Trigger durations (mean: %.2f s)" %
+                                                                   self.triggerStatistics['trigger_duration_mean']],
+                                                                  fontsize=9)
                                 self.subplotInstanceBottom.set_xlabel('Trigger Index')
 
+                        # Plot pulse map next to the curves
+                        self.__plot_pulse_map()
+
                     else:
                         # Needed for windows implementation, otherwise the whole GUI stays blank
                         self.subplotInstanceTop.clear()
                         self.subplotInstanceBottom.clear()
+                        if self.pulseMapAxes is not None:
+                            self.pulseMapAxes.clear()
 
                 except RuntimeError:
                     # ''Quit'' button has been pressed by a user, resulting in RuntimeError during program shutdown
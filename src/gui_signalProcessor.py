@@ -4,13 +4,19 @@
 
 from defines import *
 from signal_processing import SignalProcessor
+from ring_buffer import RingBuffer
+from frame_timing import FrameTimingStatistics, UniformResampler
+from pulse_map import PulseMap, compute_block_means
+from multi_subject import MultiSubjectProcessor
+from scheduler import DeadlineScheduler
 
 import logging
 import threading
+import time
 import numpy as np
 import cv2
 import settings
-import datetime
+import spectrum
 
 
 class GuiSignalProcessor(threading.Thread):
@@ -38,10 +44,10 @@ class GuiSignalProcessor(threading.Thread):
         self.frameQueue = frame_queue
 
         # Initialize variables
-        self.startTime = self.cameraActive = self.currSettings = self.dict = self.spectrumAxis = \
+        self.cameraActive = self.currSettings = self.dict = self.spectrumAxis = \
             self.spectrumMax = self.valuesOutput = self.valuesOutput2 = self.realFramesAvailable =\
             self.currentFrame = self.colorChannel = self.mean_value = self.HR = self.HRstring =\
-            self.spectrum = self.show_trigger_symbol = self.valuesFiltered = None
+            self.spectrum = self.show_trigger_symbol = None
 
         # Create signal processing object
         self.signalProcessingInstance = SignalProcessor()
@@ -57,8 +63,33 @@ class GuiSignalProcessor(threading.Thread):
         # Temporary variable
         self.firstRun = True
 
+        # Timing of the signal (see frame_timing.TIMING_METHODS), capture time and sequence number of current frame,
+        # resampling onto a uniform grid (created with the FPS of the settings when the first frame arrives), and
+        # statistics of capture times
+        self.timing = 'resample'
+        self.captureTime = self.sequenceNumber = self.lastSequenceNumber = None
+        self.signalFPS = self.FPS
+        self.resampler = None
+        self.frameTiming = FrameTimingStatistics()
+
+        # Pulse map: Size of the grid over the ROI as (rows, columns), e.g. (4, 4), None: disabled (see pulse_map.py).
+        # It is taken from the settings when the first frame arrives. The mean values of the blocks are resampled like
+        # the mean value of the ROI.
+        self.pulseMapGrid = None
+        self.pulseMap = self.pulseMapResult = self.blockResampler = None
+
+        # Multi-subject mode: Every face found by the face detection of the video display has its own signal and HR
+        # (see multi_subject.py). It is taken from the settings when the first frame arrives.
+        self.multiSubject = False
+        self.multiSubjectProcessor = None
+
+        # Paces the loop to the FPS with absolute deadlines, created with the FPS of the settings when the first frame
+        # arrives
+        self.scheduler = None
+
         # Initialize variables that will contain results later
-        self.valuesRaw = np.zeros((self.lengthSignal, 1))            # Raw signal from video
+        self.valuesRaw = RingBuffer(self.lengthSignal)               # Raw signal from video
+        self.valuesFiltered = RingBuffer(self.lengthSignal)          # For filter algorithm only: Filtered signal
         self.valuesOutput = np.zeros((self.lengthSignal, 1))         # Filtered signal for top plot
         self.valuesOutput2 = np.zeros((self.lengthSignal, 1))        # Filtered signal for bottom plot
         self.spectrumAxis = np.zeros((self.lengthSignal, 1))         # For HR algorithm only: Axis of spectrum
@@ -77,16 +108,179 @@ class GuiSignalProcessor(threading.Thread):
         self.signalProcessingInstance.clear()
         self.eventProgramEnd.set()
 
-    def __wait_to_adjust_fps(self, start_time, end_time):
-        # Compute difference to desired FPS
-        self.diffTime = (end_time - start_time).total_seconds()
-        self.waitTime = 1.0 / self.FPS - self.diffTime
-
-        # Wait the remaining to reach desired FPS
-        if int(self.waitTime * 1000) > 0:
-            cv2.waitKey(int(self.waitTime * 1000))
-        elif int(self.waitTime * 1000) == 0:
-            cv2.waitKey(33)  # cv2.waitKey(0) results in error
+    def __wait_to_adjust_fps(self):
+        """Wait until the next frame is due (absolute deadlines, see scheduler.py). Before the first frame, the thread
+           checks for frames at the standard FPS.
+        """
+        if self.scheduler is None:
+            time.sleep(1.0 / VAL_FPS)
+        else:
+            self.scheduler.wait()
+
+    def __append_value(self, value, capture_time, sequence_number):
+        """Append mean value of a frame to the signal according to self.timing, returns False if no value has been
+        appended (a frame that came early, when resampling).
+        """
+
+        # Update statistics of capture times and show them from time to time
+        self.frameTiming.update(capture_time, sequence_number)
+        if self.frameTiming.number_of_frames % max(1, int(self.FPS)) == 0:
+            self.statusbarInstance.update_info_text("Processing frames (%.1f fps, jitter %.1f ms, %d dropped)" % (
+                self.frameTiming.get_effective_fps(), self.frameTiming.get_jitter() * 1000,
+                self.frameTiming.dropped_frames))
+
+        if self.timing == 'resample':
+            values = self.resampler.push(capture_time, value)
+            for resampled_value in values:
+                self.valuesRaw.append(resampled_value)
+            return len(values) > 0
+
+        # Measured frame rate, rounded so that the precomputed arrays of the spectral analysis can be reused
+        if self.timing == 'measured' and self.frameTiming.get_effective_fps() > 0:
+            self.signalFPS = np.round(self.frameTiming.get_effective_fps(), 1)
+
+        self.valuesRaw.append(value)
+        return True
+
+    def __append_block_means(self, capture_time):
+        """Append mean values of the blocks of the ROI to the pulse map, if it is enabled"""
+
+        if self.pulseMap is None:
+            return
+
+        try:
+            means = compute_block_means(self.currentFrame, self.pulseMap.rows, self.pulseMap.columns,
+                                        self.colorChannel)
+        except ValueError:
+            # ROI is smaller than the grid
+            return
+
+        if self.timing == 'resample':
+            for resampled_means in self.blockResampler.push(capture_time, means):
+                self.pulseMap.append_means(resampled_means)
+        else:
+            self.pulseMap.append_means(means)
+
+    def __append_subject_values(self, capture_time, sequence_number):
+        """Append mean values of the faces to the signals of their subjects, if multi-subject mode is enabled"""
+
+        if self.multiSubjectProcessor is None:
+            return
+
+        # Faces are given in coordinates of the full frame, the frame may have been cropped
+        _, frame, _, frame_sequence_number = self.cameraInstance.get_timestamped_frame()
+        if frame_sequence_number != sequence_number:
+            return
+
+        self.multiSubjectProcessor.update(frame, self.video_display.get_faces(), capture_time, self.colorChannel,
+                                          self.cameraInstance.get_crop_offset())
+
+    def get_pulse_map(self):
+        """Returns the latest analysis of the pulse map (see PulseMap.compute()), None if it is disabled"""
+        return self.pulseMapResult
+
+    def get_frame_timing_statistics(self):
+        """Returns effective frame rate, jitter and dropped frames of the processed frames (see FrameTimingStatistics)"""
+        return self.frameTiming.get_statistics()
+
+    def __run_algorithms(self, fps):
+        """Run the algorithm chosen by the user on the signal and put the results into the queue of the plotter"""
+
+        if self.currSettings[IDX_ALGORITHM] == 0:
+
+            # Compute algorithm
+            self.HR, self.spectrum, self.spectrumAxis, self.spectrumMax = \
+                self.signalProcessingInstance.compute_heart_rate(self.valuesRaw, fps)
+
+            # Store heart rate value
+            self.HRstring = str(self.HR)
+            self.video_display.set_heart_rate_text(self.HRstring[0:self.HRstring.find('.')])
+
+            # Normalize signals for display (the normalized raw signal is shared with the algorithm)
+            self.valuesOutput = self.signalProcessingInstance.normalize(self.valuesRaw)
+            self.valuesOutput2 = self.signalProcessingInstance.normalize(self.spectrum)
+
+        elif self.currSettings[IDX_ALGORITHM] == 1:
+
+            # Compute algorithm, the filtered value is appended to self.valuesFiltered
+            self.show_trigger_symbol, _ = \
+                self.signalProcessingInstance.filter_waveform(self.valuesRaw, self.valuesFiltered,
+                                                              self.currParameter[IDX_WIN_SIZE],
+                                                              self.currParameter[IDX_RUN_MAX],
+                                                              self.currParameter[IDX_MIN_TIME],
+                                                              self.currParameter[IDX_SIGMA])
+
+            # Show symbol
+            if self.show_trigger_symbol is True:
+                self.video_display.display_heart_trigger()
+
+            # Normalize signals for display. The plotting thread gets a copy of the filtered signal,
+            # because the ring buffer is overwritten with the next frame.
+            self.valuesOutput = self.signalProcessingInstance.normalize(self.valuesRaw)
+            self.valuesOutput2 = np.copy(self.valuesFiltered.get())
+
+        elif self.currSettings[IDX_ALGORITHM] == 2:
+
+            # Compute algorithm
+            self.HR, self.spectrum, self.spectrumAxis, self.spectrumMax, self.triggerTimes =\
+                self.signalProcessingInstance.estimate_trigger(self.valuesRaw, fps, 50)
+
+            # Store heart rate value
+            self.HRstring = str(self.HR)
+            self.video_display.set_heart_rate_text(self.HRstring[0:self.HRstring.find('.')])
+
+            # Normalize signals for display (the normalized raw signal is shared with the algorithm)
+            self.valuesOutput = self.signalProcessingInstance.normalize(self.valuesRaw)
+            self.valuesOutput2 = self.signalProcessingInstance.normalize(self.spectrum)
+
+        elif self.currSettings[IDX_ALGORITHM] == 3:
+
+            # Both algorithms use the same normalized signal and, without zero padding, the same spectrum
+            frame = self.signalProcessingInstance.create_analysis_frame(self.valuesRaw, fps)
+
+            # Compute algorithms
+            self.HR, self.spectrum, self.spectrumAxis, self.spectrumMax = \
+                self.signalProcessingInstance.compute_heart_rate(self.valuesRaw, fps, frame)
+            _, _, _, _, self.triggerTimes = \
+                self.signalProcessingInstance.estimate_trigger(self.valuesRaw, fps, 50, frame)
+
+            # Store heart rate value
+            self.HRstring = str(self.HR)
+            self.video_display.set_heart_rate_text(self.HRstring[0:self.HRstring.find('.')])
+
+            # Normalize signals for display
+            self.valuesOutput = frame.get_normalized_signal()
+            self.valuesOutput2 = self.signalProcessingInstance.normalize(self.spectrum)
+
+        # Store data in dictionary
+        if self.currSettings[IDX_ALGORITHM] == 0:
+            self.dict = {'valuesOutput': self.valuesOutput, 'valuesOutput2': self.valuesOutput2,
+                         'spectrumAxis': self.spectrumAxis, 'spectrumMax': self.spectrumMax}
+        elif self.currSettings[IDX_ALGORITHM] == 1:
+            self.dict = {'valuesOutput': self.valuesOutput, 'valuesOutput2': self.valuesOutput2}
+        elif self.currSettings[IDX_ALGORITHM] >= 2:
+            self.dict = {'valuesOutput': self.valuesOutput, 'valuesOutput2': self.valuesOutput2,
+                         'spectrumAxis': self.spectrumAxis, 'spectrumMax': self.spectrumMax,
+                         'triggerTimes': self.triggerTimes,
+                         'triggerStatistics': self.signalProcessingInstance.get_trigger_statistics()}
+
+        # Map of pulse amplitude and SNR of the blocks of the ROI, with their combined HR
+        if self.pulseMap is not None:
+            self.pulseMapResult = self.pulseMap.compute(self.signalProcessingInstance, fps)
+            if self.pulseMapResult is not None:
+                self.dict.update({'pulseMapHR': self.pulseMapResult['heart_rate'],
+                                  'pulseMapSNR': self.pulseMapResult['snr'],
+                                  'pulseMapAmplitude': self.pulseMapResult['amplitude']})
+
+        # Heart rates of all subjects, tagged with their identities
+        if self.multiSubjectProcessor is not None:
+            self.dict['subjects'] = self.multiSubjectProcessor.compute(self.currParameter[IDX_ZERO_PADDING],
+                                                                       self.signalProcessingInstance.peak_interpolation,
+                                                                       self.signalProcessingInstance.spectrum_resolution)
+            self.video_display.set_subject_results(self.dict['subjects'])
+
+        # Put dictionary in queue
+        self.frameQueue.put(self.dict)
 
     def run(self):
         """The main functionality of the thread: The signal is obtained and plotted"""
@@ -94,17 +288,29 @@ class GuiSignalProcessor(threading.Thread):
         # run() method of cameraThread waits for shutdown event
         while self.eventProgramEnd.is_set() is False:
 
-            # Get time
-            self.startTime = datetime.datetime.now()
+            # Free-running replay: Every frame is processed once, as soon as it is available
+            free_running = self.cameraInstance.is_free_running()
+            if free_running and not self.cameraInstance.wait_for_frame(1):
+                continue
 
-            # Get frame
-            self.realFramesAvailable, self.currentFrame = self.cameraInstance.get_frame()
+            # Get ROI of frame (a view, not a copy) with time of capture
+            self.realFramesAvailable, self.currentFrame, self.captureTime, self.sequenceNumber = \
+                self.cameraInstance.get_timestamped_roi()
 
-            # If real frames are available, start main activity
-            if self.realFramesAvailable is True:
+            # If real frames are available, start main activity (every frame is processed only once)
+            if self.realFramesAvailable is True and self.sequenceNumber != self.lastSequenceNumber:
+
+                self.lastSequenceNumber = self.sequenceNumber
 
                 # Get current settings
                 self.currSettings, self.currParameter = self.settingsInstance.get_parameters()
+                self.signalProcessingInstance.peak_interpolation = \
+                    spectrum.PEAK_INTERPOLATION_METHODS[int(self.currParameter[IDX_PEAK_INTERPOLATION])]
+                self.signalProcessingInstance.spectrum_backend = \
+                    spectrum.SPECTRUM_BACKENDS[int(self.currParameter[IDX_SPECTRUM_BACKEND])]
+                self.signalProcessingInstance.spectrum_resolution = \
+                    self.currParameter[IDX_SPECTRUM_RESOLUTION] if self.currParameter[IDX_SPECTRUM_RESOLUTION] > 0 \
+                    else None
 
                 if self.firstRun is True:
 
@@ -112,88 +318,44 @@ class GuiSignalProcessor(threading.Thread):
                     self.statusbarInstance.update_info_text("Processing frames")
 
                     # Update FPS
-                    self.FPS = self.currSettings[IDX_FPS]
+                    self.FPS = self.signalFPS = self.currSettings[IDX_FPS]
+                    self.resampler = UniformResampler(self.FPS)
+                    self.scheduler = DeadlineScheduler(self.FPS)
                     self.colorChannel = int(self.currSettings[IDX_COLORCHANNEL])
 
+                    # Create pulse map if it is enabled
+                    if self.currSettings[IDX_PULSE_MAP_GRID] > 0:
+                        self.pulseMapGrid = (int(self.currSettings[IDX_PULSE_MAP_GRID]),) * 2
+                    if self.pulseMapGrid is not None:
+                        self.pulseMap = PulseMap(self.pulseMapGrid[0], self.pulseMapGrid[1], self.lengthSignal)
+                        self.blockResampler = UniformResampler(self.FPS)
+
+                    # Create chains of subjects if multi-subject mode is enabled
+                    self.multiSubject = self.multiSubject or bool(self.currSettings[IDX_MULTI_SUBJECT])
+                    if self.multiSubject:
+                        self.multiSubjectProcessor = MultiSubjectProcessor(self.FPS, self.lengthSignal)
+
                     self.firstRun = False
 
-                # Compute mean value
+                # Compute mean value of ROI
                 self.mean_value = cv2.mean(self.currentFrame)[self.colorChannel]
 
-                # Store mean value
-                self.valuesRaw = np.append(self.valuesRaw, self.mean_value)
+                # Compute mean values of the blocks of the ROI for the pulse map
+                self.__append_block_means(self.captureTime)
+
+                # Compute mean values of the faces for multi-subject mode
+                self.__append_subject_values(self.captureTime, self.sequenceNumber)
 
-                # Begin with computations when enough data points are accumulated
-                if np.size(self.valuesRaw) >= self.lengthSignal:
+                # Store mean value (resampled or with its capture time, see frame_timing.py)
+                if self.__append_value(self.mean_value, self.captureTime, self.sequenceNumber):
 
                     # Perform algorithms depending on user selection
-                    if self.currSettings[IDX_ALGORITHM] == 0:
-
-                        # Compute algorithm
-                        self.HR, self.spectrum, self.spectrumAxis, self.spectrumMax = \
-                            self.signalProcessingInstance.compute_heart_rate(self.valuesRaw, self.FPS)
-
-                        # Store heart rate value
-                        self.HRstring = str(self.HR)
-                        self.video_display.set_heart_rate_text(self.HRstring[0:self.HRstring.find('.')])
-
-                        # Normalize signals for display
-                        self.valuesOutput = self.signalProcessingInstance.normalize(self.valuesRaw)
-                        self.valuesOutput2 = self.signalProcessingInstance.normalize(self.spectrum)
-
-                    elif self.currSettings[IDX_ALGORITHM] == 1:
-
-                        # Compute algorithm
-                        self.show_trigger_symbol, self.valuesFiltered = \
-                            self.signalProcessingInstance.filter_waveform(self.valuesRaw, self.valuesOutput2,
-                                                                          self.currParameter[IDX_WIN_SIZE],
-                                                                          self.currParameter[IDX_RUN_MAX],
-                                                                          self.currParameter[IDX_MIN_TIME])
-
-                        # Show symbol
-                        if self.show_trigger_symbol is True:
-                            self.video_display.display_heart_trigger()
-
-                        # Normalize signals for display
-                        self.valuesOutput = self.signalProcessingInstance.normalize(self.valuesRaw)
-                        self.valuesOutput2 = self.valuesFiltered
-
-                    elif self.currSettings[IDX_ALGORITHM] == 2:
-
-                        # Compute algorithm
-                        self.HR, self.spectrum, self.spectrumAxis, self.spectrumMax, self.triggerTimes =\
-                            self.signalProcessingInstance.estimate_trigger(self.valuesRaw, self.FPS, 50)
-
-                        # Store heart rate value
-                        self.HRstring = str(self.HR)
-                        self.video_display.set_heart_rate_text(self.HRstring[0:self.HRstring.find('.')])
-
-                        # Normalize signals for display
-                        self.valuesOutput = self.signalProcessingInstance.normalize(self.valuesRaw)
-                        self.valuesOutput2 = self.signalProcessingInstance.normalize(self.spectrum)
-
-                    # Delete data points to maintain self.lengthSignal values
-                    mask = np.ones(len(self.valuesRaw), dtype=bool)
-                    mask[0:np.size(self.valuesRaw) - self.lengthSignal] = False
-                    self.valuesRaw = self.valuesRaw[mask]
-                    self.valuesOutput = self.valuesOutput[mask]
-                    if self.currSettings[IDX_ALGORITHM] == 1:
-                        self.valuesOutput2 = self.valuesOutput2[mask]
-
-                # Store data in dictionary
-                if self.currSettings[IDX_ALGORITHM] == 0:
-                    self.dict = {'valuesOutput': self.valuesOutput, 'valuesOutput2': self.valuesOutput2,
-                                 'spectrumAxis': self.spectrumAxis, 'spectrumMax': self.spectrumMax}
-                elif self.currSettings[IDX_ALGORITHM] == 1:
-                    self.dict = {'valuesOutput': self.valuesOutput, 'valuesOutput2': self.valuesOutput2}
-                elif self.currSettings[IDX_ALGORITHM] == 2:
-                    self.dict = {'valuesOutput': self.valuesOutput, 'valuesOutput2': self.valuesOutput2,
-                                 'spectrumAxis': self.spectrumAxis, 'spectrumMax': self.spectrumMax,
-                                 'triggerTimes': self.triggerTimes}
-                # Put dictionary in queue
-                self.frameQueue.put(self.dict)
-
-            # Wait and start from beginning of thread
-            self.__wait_to_adjust_fps(self.startTime, datetime.datetime.now())
+                    self.__run_algorithms(self.signalFPS)
+
+            # Wait and start from beginning of thread, or get next frame immediately during free-running replay
+            if free_running:
+                self.cameraInstance.release_frame()
+            else:
+                self.__wait_to_adjust_fps()
 
         logging.info("Reached end of signal processing thread")
@@ -13,7 +13,9 @@ import tkMessageBox
 
 from os import listdir
 from os.path import isfile, join
-from tkFileDialog import askdirectory
+from tkFileDialog import askdirectory, askopenfilename
+from frame_archive import ARCHIVE_EXTENSION
+from frame_loader import VideoFileLoader, FrameArchiveLoader
 from defines import *
 
 
@@ -37,6 +39,7 @@ class ToolbarButtons(Tk.Frame):
         # Disable buttons that change settings
         self.check_button_1.config(state=Tk.DISABLED)
         self.check_button_2.config(state=Tk.DISABLED)
+        self.check_button_3.config(state=Tk.DISABLED)
         self.button_start.config(state=Tk.DISABLED)
         self.dropDownListCamera.config(state=Tk.DISABLED)
         self.dropDownListAlgorithm.config(state=Tk.DISABLED)
@@ -108,7 +111,7 @@ class ToolbarButtons(Tk.Frame):
         self.toolbar_roi = roi_toolbar
 
         # Initialize buttons
-        self.check_button_1 = self.check_button_2 = self.check_button_2 = self.check_button_4 = \
+        self.check_button_1 = self.check_button_2 = self.check_button_3 = self.check_button_4 = \
             self.listCamerasStr = self.dropDownListCamera = self.listAlgorithmStr = self.dropDownListAlgorithm = None
 
         # Get current settings
@@ -144,6 +147,9 @@ class ToolbarButtons(Tk.Frame):
         # If no camera is available, disable button
         if self.numberOfCameras == 0:
             self.dropDownListCamera.config(state=Tk.DISABLED)
+        # Cameras are still searched in the background: Update list when search has finished
+        if not self.cameraInstance.is_camera_enumeration_finished():
+            self.button_frame.after(200, self.__update_camera_list)
 
         # Add FPS label
         self.label_x1 = Tk.Label(self.button_frame, text="FPS:")
@@ -164,11 +170,19 @@ class ToolbarButtons(Tk.Frame):
             list_of_algorithms.append(LABEL_ALGORITHM_1)
             list_of_algorithms.append(LABEL_ALGORITHM_2)
             list_of_algorithms.append(LABEL_ALGORITHM_3)
+            list_of_algorithms.append(LABEL_ALGORITHM_4)
         elif self.curr_settings[IDX_ALGORITHM] == 1:
             list_of_algorithms.append(LABEL_ALGORITHM_2)
             list_of_algorithms.append(LABEL_ALGORITHM_3)
+            list_of_algorithms.append(LABEL_ALGORITHM_4)
             list_of_algorithms.append(LABEL_ALGORITHM_1)
         elif self.curr_settings[IDX_ALGORITHM] == 2:
+            list_of_algorithms.append(LABEL_ALGORITHM_3)
+            list_of_algorithms.append(LABEL_ALGORITHM_4)
+            list_of_algorithms.append(LABEL_ALGORITHM_2)
+            list_of_algorithms.append(LABEL_ALGORITHM_1)
+        elif self.curr_settings[IDX_ALGORITHM] == 3:
+            list_of_algorithms.append(LABEL_ALGORITHM_4)
             list_of_algorithms.append(LABEL_ALGORITHM_3)
             list_of_algorithms.append(LABEL_ALGORITHM_2)
             list_of_algorithms.append(LABEL_ALGORITHM_1)
@@ -195,6 +209,13 @@ class ToolbarButtons(Tk.Frame):
         if self.curr_settings[IDX_FRAMES]:
             self.check_button_2.toggle()
 
+        # Add checkbox: Crop frames to ROI directly after capture
+        self.check_button_3 = Tk.Checkbutton(master=self.button_frame, text="Crop to ROI",
+                                             command=lambda: settings.flip_setting(IDX_CROP))
+        self.check_button_3.pack(side=Tk.LEFT)
+        if self.curr_settings[IDX_CROP]:
+            self.check_button_3.toggle()
+
         # Add start button
         self.button_start = Tk.Button(master=self.button_frame, text='Start', command=self.__start)
         self.button_start.pack(side=Tk.RIGHT)
@@ -202,6 +223,31 @@ class ToolbarButtons(Tk.Frame):
     def clear(self):
         self.button_frame.destroy()
 
+    def __update_camera_list(self):
+        """Fill list of cameras with the result of the search for cameras, check again later if it has not finished"""
+
+        if not self.cameraInstance.is_camera_enumeration_finished():
+            self.button_frame.after(200, self.__update_camera_list)
+            return
+
+        self.numberOfCameras = self.cameraInstance.get_number_of_cameras()
+        list_of_cameras = [str(cam_idx) for cam_idx in range(self.numberOfCameras)]
+        logging.info("List of cameras was updated")
+
+        # Replace entries of list
+        menu = self.dropDownListCamera['menu']
+        menu.delete(0, Tk.END)
+        for camera in list_of_cameras:
+            menu.add_command(label=camera, command=Tk._setit(self.listCamerasStr, camera))
+        self.listCamerasStr.set(list_of_cameras[0] if list_of_cameras else '')
+
+        # Enable list only if cameras are available and the user has neither started nor chosen frames from hard disk
+        if self.numberOfCameras > 0 and self.button_start.cget('state') != Tk.DISABLED and \
+                self.button_files.cget('state') != Tk.DISABLED:
+            self.dropDownListCamera.config(state=Tk.NORMAL)
+        else:
+            self.dropDownListCamera.config(state=Tk.DISABLED)
+
     def __change_algorithm(self):
         if self.dropDownListAlgorithm.cget("text") == LABEL_ALGORITHM_1:
             settings.change_settings(IDX_ALGORITHM, 0)
@@ -209,9 +255,18 @@ class ToolbarButtons(Tk.Frame):
             settings.change_settings(IDX_ALGORITHM, 1)
         elif self.dropDownListAlgorithm.cget("text") == LABEL_ALGORITHM_3:
             settings.change_settings(IDX_ALGORITHM, 2)
+        elif self.dropDownListAlgorithm.cget("text") == LABEL_ALGORITHM_4:
+            settings.change_settings(IDX_ALGORITHM, 3)
 
     def __open_files(self):
         self.root.option_add('*Dialog.msg.font', 'Helvetica 10')
+
+        # Ask if the user wants to load a video file or a folder of images
+        if tkMessageBox.askyesno("Load files", "Do you want to load a video file (e.g. AVI or MP4) or a frame archive?\n"
+                                               "Choose ''No'' to load a folder of images instead."):
+            self.__open_video_file()
+            return
+
         tkMessageBox.showinfo("Information", "Please choose a folder containing files with increasing number"
                                              ", e.g. frame0.png frame1.png frame2.png ...")
 
@@ -258,11 +313,7 @@ class ToolbarButtons(Tk.Frame):
                 self.cameraInstance.store_frames_from_disk(self.dirName, self.filesInDirSortedWithFilenameAndExtension)
 
                 # Update GUI
-                self.dropDownListCamera.config(state=Tk.DISABLED)
-                self.textbox_fps.config(state=Tk.DISABLED)
-                self.textbox_fps.config(bg='lightgray')
-                self.button_files.config(bg='green')
-                self.button_files.config(state=Tk.DISABLED)
+                self.__disable_camera_settings()
 
                 # Show messagebox
                 tkMessageBox.showinfo("Information", "Frames have been loaded successfully.")
@@ -277,3 +328,46 @@ class ToolbarButtons(Tk.Frame):
         else:
             logging.error("User has chosen invalid directory with images")
             tkMessageBox.showerror("Error", "This directory is invalid. Please choose a valid one.")
+
+    def __open_video_file(self):
+
+        # Open Tk dialog
+        self.videoFileName = askopenfilename(filetypes=[("Video files", "*.avi *.mp4 *.mkv *.mov"),
+                                                        ("Frame archives", "*" + ARCHIVE_EXTENSION), ("All files", "*")])
+
+        if not self.videoFileName:
+            logging.info("User has not chosen a video file")
+            return
+
+        try:
+            # Check that the video file can be decoded
+            if self.videoFileName.endswith(ARCHIVE_EXTENSION):
+                video_file_loader = FrameArchiveLoader(self.videoFileName)
+            else:
+                video_file_loader = VideoFileLoader(self.videoFileName)
+            video_file_loader.get_frame()
+            video_file_loader.close()
+
+        except (IOError, IndexError):
+            logging.error("User has chosen invalid video file")
+            tkMessageBox.showerror("Error", "This video file can not be read. Please choose a valid one.")
+            return
+
+        # Store file name in camera thread
+        self.cameraInstance.store_video_file(self.videoFileName)
+
+        # Update GUI
+        self.__disable_camera_settings()
+
+        # Show messagebox
+        tkMessageBox.showinfo("Information", "Video file has been loaded successfully.")
+
+        logging.info("Video file has been loaded successfully.")
+
+    def __disable_camera_settings(self):
+        """Frames are read from hard disk, the camera can not be chosen anymore"""
+        self.dropDownListCamera.config(state=Tk.DISABLED)
+        self.textbox_fps.config(state=Tk.DISABLED)
+        self.textbox_fps.config(bg='lightgray')
+        self.button_files.config(bg='green')
+        self.button_files.config(state=Tk.DISABLED)
@@ -169,7 +169,7 @@ class ToolbarROI(Tk.Frame):
 
         # Create window
         self.menu = Tk.Toplevel()
-        self.menu.wm_geometry("270x210")
+        self.menu.wm_geometry("270x490")
         self.menu.title("Algorithm parameters")
 
         # Add label
@@ -183,6 +183,32 @@ class ToolbarROI(Tk.Frame):
         if curr_param[IDX_ZERO_PADDING]:
             button_zero_padding.toggle()
 
+        # Add dropdown list for interpolation of spectral peak (also used by algorithm 3)
+        self.label_peak_interpolation = Tk.Label(self.menu, text="Peak interpolation", anchor="w")
+        self.label_peak_interpolation.pack(side=Tk.TOP, fill="both")
+        self.list_peak_interpolationStr = Tk.StringVar()
+        self.list_peak_interpolationStr.set(LABEL_PEAK_INTERPOLATION[int(curr_param[IDX_PEAK_INTERPOLATION])])
+        self.dropDownListPeakInterpolation = Tk.OptionMenu(self.menu, self.list_peak_interpolationStr,
+                                                           *LABEL_PEAK_INTERPOLATION,
+                                                           command=lambda _: self.__store_peak_interpolation())
+        self.dropDownListPeakInterpolation.pack(side=Tk.TOP, fill="both")
+
+        # Add dropdown list for computation of band spectrum (also used by algorithm 3)
+        self.label_spectrum_backend = Tk.Label(self.menu, text="Spectrum backend", anchor="w")
+        self.label_spectrum_backend.pack(side=Tk.TOP, fill="both")
+        self.list_spectrum_backendStr = Tk.StringVar()
+        self.list_spectrum_backendStr.set(LABEL_SPECTRUM_BACKEND[int(curr_param[IDX_SPECTRUM_BACKEND])])
+        self.dropDownListSpectrumBackend = Tk.OptionMenu(self.menu, self.list_spectrum_backendStr,
+                                                         *LABEL_SPECTRUM_BACKEND,
+                                                         command=lambda _: self.__store_spectrum_backend())
+        self.dropDownListSpectrumBackend.pack(side=Tk.TOP, fill="both")
+
+        self.label_resolution = Tk.Label(self.menu, text="Spectrum resolution in Hz (0: FFT)", anchor="w")
+        self.label_resolution.pack(side=Tk.TOP, fill="both")
+        self.textbox_resolution = Tk.Text(self.menu, width=6, height=1)
+        self.textbox_resolution.pack(side=Tk.TOP, fill="both")
+        self.textbox_resolution.insert(Tk.END, curr_param[IDX_SPECTRUM_RESOLUTION])
+
         # Add label
         self.label_info_text_2 = Tk.Label(self.menu, text=LABEL_ALGORITHM_2 + ":", anchor="w", font="Verdana 10 bold")
         self.label_info_text_2.pack(side=Tk.TOP, fill="both")
@@ -205,6 +231,32 @@ class ToolbarROI(Tk.Frame):
         self.textbox_param_3.pack(side=Tk.TOP, fill="both")
         self.textbox_param_3.insert(Tk.END, curr_param[IDX_MIN_TIME])
 
+        self.label_param_4 = Tk.Label(self.menu, text="Sigma of Gaussian weights (0: none)", anchor="w")
+        self.label_param_4.pack(side=Tk.TOP, fill="both")
+        self.textbox_param_4 = Tk.Text(self.menu, width=6, height=1)
+        self.textbox_param_4.pack(side=Tk.TOP, fill="both")
+        self.textbox_param_4.insert(Tk.END, curr_param[IDX_SIGMA])
+
+        # Add label
+        self.label_info_text_3 = Tk.Label(self.menu, text="Pulse map:", anchor="w", font="Verdana 10 bold")
+        self.label_info_text_3.pack(side=Tk.TOP, fill="both")
+
+        self.label_pulse_map_grid = Tk.Label(self.menu, text="Grid size (N x N blocks, 0: disabled)", anchor="w")
+        self.label_pulse_map_grid.pack(side=Tk.TOP, fill="both")
+        self.textbox_pulse_map_grid = Tk.Text(self.menu, width=6, height=1)
+        self.textbox_pulse_map_grid.pack(side=Tk.TOP, fill="both")
+        self.textbox_pulse_map_grid.insert(Tk.END, int(curr_settings[IDX_PULSE_MAP_GRID]))
+
+        # Add label
+        self.label_info_text_4 = Tk.Label(self.menu, text="Face detection:", anchor="w", font="Verdana 10 bold")
+        self.label_info_text_4.pack(side=Tk.TOP, fill="both")
+
+        button_multi_subject = Tk.Checkbutton(self.menu, text="Separate HR for every face", anchor="w",
+                                              command=lambda: settings.flip_setting(IDX_MULTI_SUBJECT))
+        button_multi_subject.pack(side=Tk.TOP, fill="both")
+        if curr_settings[IDX_MULTI_SUBJECT]:
+            button_multi_subject.toggle()
+
         self.button_options_store = Tk.Button(self.menu, text="Save", width=6,
                                               command=lambda: self.__store_values_in_options_menu())
         self.button_options_store.pack(side=Tk.TOP)
@@ -233,9 +285,37 @@ class ToolbarROI(Tk.Frame):
         else:
             logging.warn('Option MIN_TIME was invalid and not stored')
 
+        # Standard deviation and resolution can be any non-negative number
+        for idx_param, textbox, name in ((IDX_SIGMA, self.textbox_param_4, 'SIGMA'),
+                                         (IDX_SPECTRUM_RESOLUTION, self.textbox_resolution, 'SPECTRUM_RESOLUTION')):
+            try:
+                value = float(textbox.get("1.0", Tk.END + "-1c"))
+            except ValueError:
+                value = -1
+            if value >= 0:
+                self.__change_algorithm_parameter(idx_param, value)
+            else:
+                logging.warn('Option ' + name + ' was invalid and not stored')
+
+        # Size of grid of pulse map is a program setting
+        if self.textbox_pulse_map_grid.get("1.0", Tk.END + "-1c").isdigit():
+            settings.change_settings(IDX_PULSE_MAP_GRID, int(self.textbox_pulse_map_grid.get("1.0", Tk.END + "-1c")))
+        else:
+            logging.warn('Option PULSE_MAP_GRID was invalid and not stored')
+
         # Close menu
         self.menu.destroy()
 
+    def __store_peak_interpolation(self):
+        """Stores the selected interpolation method of the spectral peak"""
+        idx_method = LABEL_PEAK_INTERPOLATION.index(self.list_peak_interpolationStr.get())
+        self.__change_algorithm_parameter(IDX_PEAK_INTERPOLATION, idx_method)
+
+    def __store_spectrum_backend(self):
+        """Stores the selected computation of the band spectrum"""
+        idx_backend = LABEL_SPECTRUM_BACKEND.index(self.list_spectrum_backendStr.get())
+        self.__change_algorithm_parameter(IDX_SPECTRUM_BACKEND, idx_backend)
+
     def close_options_menu(self):
         """Allows other parts of the GUI to close the menu"""
         if self.menu is not None:
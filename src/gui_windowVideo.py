@@ -3,6 +3,8 @@
 """gui_windowVideo.py - GUI element: frame that displays video"""
 
 from defines import *
+from face_tracking import FaceTracker
+from face_worker import FaceDetectionWorker
 from PIL import Image
 from PIL import ImageTk
 
@@ -31,6 +33,21 @@ class WindowVideo(Tk.Frame):
         self.first_frame = True
         self.faceCascade = cv2.CascadeClassifier('data/haarcascade_frontalface_default.xml')
 
+        # Faces are detected every few frames on a downscaled frame and tracked in between (see face_tracking.py).
+        # By default, this is done by a worker process (see face_worker.py), otherwise in this thread.
+        self.faceDetectionInProcess = True
+        self.faceTracker = FaceTracker(self.faceCascade)
+        self.faceWorker = FaceDetectionWorker()
+
+        # Crop offset of every frame that has been submitted to the worker (by sequence number), the boxes of the
+        # worker belong to one of these frames
+        self.submittedOffsets = {}
+
+        # Boxes (x, y, w, h) of the faces in coordinates of the full frame, and results of the subjects (see
+        # multi_subject.py) that are shown next to their faces
+        self.faces = []
+        self.subjectResults = []
+
         # Save camera object
         self.cameraInstance = cam
 
@@ -63,6 +80,7 @@ class WindowVideo(Tk.Frame):
 
         # Start frame display as thread
         self.frameCounter = 0
+        self.lastSequenceNumber = None
         self.displayThread = threading.Thread(target=self.__show_image)
         self.displayThread.start()
 
@@ -82,6 +100,7 @@ class WindowVideo(Tk.Frame):
         self.lmain.pack()
 
     def clear(self):
+        self.faceWorker.stop()
         self.video_frame.destroy()
 
     def __show_image(self):
@@ -91,7 +110,21 @@ class WindowVideo(Tk.Frame):
         self.curr_settings, _ = settings.get_parameters()
 
         # Get current frame
-        self.isTrueFrame, self.frame = self.cameraInstance.get_frame()
+        self.isTrueFrame, frame, _, sequence_number = self.cameraInstance.get_timestamped_frame()
+
+        # Frame has already been displayed: Check again shortly
+        if self.isTrueFrame and sequence_number == self.lastSequenceNumber:
+            self.video_frame.after(1, lambda: self.__show_image())
+            return
+        self.lastSequenceNumber = sequence_number
+
+        # The frame is shared with other threads and read-only, so symbols are drawn on a copy. Afterwards, the buffer of
+        # the frame can be reused by the camera thread.
+        self.frame = np.copy(frame)
+        self.cameraInstance.release_frame_buffer()
+
+        # Position of the frame in the full frame of the camera, if it has been cropped to the ROI
+        offset_x, offset_y = self.cameraInstance.get_crop_offset()
 
         # Check if first frame is received
         if self.isTrueFrame & self.first_frame:
@@ -102,7 +135,15 @@ class WindowVideo(Tk.Frame):
             # If first frame from camera is received store dimensions
             x_max = np.size(self.frame, 0)
             y_max = np.size(self.frame, 1)
-            self.roiToolbarInstance.set_roi(0, x_max, 0, y_max)
+            self.roiToolbarInstance.set_roi(offset_x, offset_x + x_max, offset_y, offset_y + y_max)
+
+            # Shared memory of the face detection worker is sized for the full frame, so that frames cropped to the
+            # ROI always fit
+            capture_format = self.cameraInstance.get_capture_format()
+            if capture_format is not None:
+                self.faceWorker.set_slot_size(max(x_max * y_max, int(capture_format[0] * capture_format[1])))
+            else:
+                self.faceWorker.set_slot_size(x_max * y_max)
 
             self.first_frame = False
             self.frameCounter += 1
@@ -122,19 +163,50 @@ class WindowVideo(Tk.Frame):
             # Increase frame counter
             self.frameCounter += 1
 
-            # Use Viola Jones Algorithm for Face Detection
+            # Use Viola Jones Algorithm for Face Detection, faces are tracked between detections
             if self.curr_settings[IDX_FACE]:
-                frame_bw = cv2.cvtColor(self.frame, cv2.COLOR_BGR2GRAY)
-                faces = self.faceCascade.detectMultiScale(frame_bw, scaleFactor=1.1, minNeighbors=5,
-                                                          minSize=(30, 30), flags=cv2.cv.CV_HAAR_SCALE_IMAGE)
-                for (x, y, w, h) in faces:
-                    cv2.rectangle(self.frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
+
+                # The worker gets the frame and the latest faces are used without waiting, they may belong to one of
+                # the previous frames. Their boxes are moved by the crop offset of that frame.
+                if self.faceDetectionInProcess:
+                    self.faceWorker.submit(self.frame, sequence_number)
+                    self.submittedOffsets[sequence_number] = (offset_x, offset_y)
+                    faces, face_sequence_number = self.faceWorker.get_faces()
+                    face_offset_x, face_offset_y = self.submittedOffsets.get(face_sequence_number, (offset_x, offset_y))
+                    if face_sequence_number is not None:
+                        self.submittedOffsets = dict((number, offset) for number, offset in self.submittedOffsets.items()
+                                                     if number >= face_sequence_number)
+                else:
+                    faces = self.faceTracker.update(self.frame)
+                    face_offset_x, face_offset_y = offset_x, offset_y
+
+                # Boxes in coordinates of the full frame
+                self.faces = [(face_offset_y + x, face_offset_x + y, w, h) for (x, y, w, h) in faces]
+
+                for (x, y, w, h) in self.faces:
+                    cv2.rectangle(self.frame, (x - offset_y, y - offset_x), (x - offset_y + w, y - offset_x + h),
+                                  (0, 255, 0), 2)
                     self.roiToolbarInstance.set_roi(y, y + h, x, x + w)
 
-            # Otherwise: Use manual ROI input
+                # Number and HR of every subject
+                for result in self.subjectResults:
+                    x, y = result['box'][0] - offset_y, result['box'][1] - offset_x
+                    cv2.putText(self.frame, "%d: %d" % (result['subject'], result['heart_rate']), (x, max(15, y - 5)),
+                                cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
+
+            # Otherwise: Use manual ROI input, faces are detected again when face detection is enabled
             else:
+                self.faceTracker.clear()
+                self.faceWorker.stop()
+                self.submittedOffsets = {}
+                self.faces = []
                 x_min, x_max, y_min, y_max = self.roiToolbarInstance.get_roi()
-                cv2.rectangle(self.frame, (y_min, x_min), (y_max, x_max), (0, 255, 0), 2)
+                cv2.rectangle(self.frame, (y_min - offset_y, x_min - offset_x), (y_max - offset_y, x_max - offset_x),
+                              (0, 255, 0), 2)
+
+            # Pass ROI to the camera thread: it is used by the signal processing thread and the camera thread crops
+            # the next frames to the ROI if enabled in the settings
+            self.cameraInstance.set_roi(*self.roiToolbarInstance.get_roi())
 
             # Store frame on hard disk
             if self.curr_settings[IDX_FRAMES]:
@@ -145,7 +217,7 @@ class WindowVideo(Tk.Frame):
         current_location = os.path.dirname(os.path.realpath(__file__)) + os.sep
 
         # Heart icon
-        if self.curr_settings[IDX_ALGORITHM] in (0, 2):
+        if self.curr_settings[IDX_ALGORITHM] in (0, 2, 3):
             # Add heart icon
             heart_location = current_location + 'data/heart.png'
             self.frame = self.__add_figure_to_frame(self.frame, heart_location)
@@ -229,6 +301,14 @@ class WindowVideo(Tk.Frame):
         """Returns number of frames shown so far"""
         return self.frameCounter
 
+    def get_faces(self):
+        """Returns the boxes (x, y, w, h) of the faces of the frame shown last, in coordinates of the full frame"""
+        return self.faces
+
+    def set_subject_results(self, results):
+        """Set results of the subjects that are shown next to their faces (see MultiSubjectProcessor.compute())"""
+        self.subjectResults = results
+
     def set_heart_rate_text(self, newHR):
         """Set Heart Rate Text"""
         self.HeartRateText = newHR
@@ -13,23 +13,43 @@
             (4) a thread that shows the obtained signal in the GUI
 
         The GUI class contains all GUI elements which are defined in gui_*.py using Tkinter
+
+    If face detection is enabled, the faces are found by a separate worker process (see face_worker.py).
+
+    Usage: python main.py [--free-running]
+
+        --free-running: Frames from hard disk are processed as fast as possible instead of in real time. All threads
+                        use a virtual clock that advances by 1/FPS per frame (see clock.py).
 """
 
+import sys
+import clock
 import logger
 import gui
 import video
 
-# Configure logging
-logger.init()
+# The program is only started if this file is executed, not if it is imported by a worker process (see
+# face_worker.py)
+if __name__ == '__main__':
+
+    # Measure time until the GUI is ready
+    startupTime = clock.monotonic()
+
+    # Configure logging
+    logger.init()
+
+    # Choose clock before the threads are created
+    if '--free-running' in sys.argv:
+        clock.use_virtual_clock()
 
-# Initialize camera thread
-videoThread = video.VideoThread()
+    # Initialize camera thread
+    videoThread = video.VideoThread()
 
-# Start camera thread
-videoThread.start()
+    # Start camera thread
+    videoThread.start()
 
-# Initialize gui
-guiThread = gui.GUI()
+    # Initialize gui
+    guiThread = gui.GUI()
 
-# Add camera thread and start gui
-guiThread.start(videoThread)
+    # Add camera thread and start gui
+    guiThread.start(videoThread, startupTime)
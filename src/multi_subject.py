@@ -0,0 +1,206 @@
+#!/usr/bin/env python
+# -*- coding: ascii -*-
+"""multi_subject.py - one signal processing chain per detected face (subject), the spectra of all chains are computed
+   at once
+"""
+
+import cv2
+import numpy as np
+import spectrum
+
+from frame_timing import UniformResampler
+from ring_buffer import RingBuffer
+from signal_processing import SignalProcessor
+
+
+def compute_overlap(box_1, box_2):
+    """Returns the intersection over union of two boxes (x, y, w, h), 0 if they do not overlap"""
+
+    x_1, y_1, w_1, h_1 = box_1
+    x_2, y_2, w_2, h_2 = box_2
+
+    width = min(x_1 + w_1, x_2 + w_2) - max(x_1, x_2)
+    height = min(y_1 + h_1, y_2 + h_2) - max(y_1, y_2)
+    if width <= 0 or height <= 0:
+        return 0.0
+
+    intersection = float(width * height)
+    return intersection / (w_1 * h_1 + w_2 * h_2 - intersection)
+
+
+class SubjectIdentities(object):
+    """Stable identities of the faces in consecutive frames.
+
+       A face gets the identity of the subject whose last box overlaps most with it (intersection over union of at
+       least ''min_overlap''), the pairs with the largest overlap are assigned first. Other faces are new subjects with
+       new identities. A subject that has not been found in ''max_missing'' consecutive frames is removed, so a face that
+       is not detected in a few frames keeps its identity.
+    """
+
+    def __init__(self, min_overlap=0.3, max_missing=25):
+        """Create empty list of subjects"""
+
+        self.min_overlap = min_overlap
+        self.max_missing = max_missing
+
+        # Identity -> [last box, number of frames without the subject]
+        self.subjects = {}
+        self.next_identity = 0
+
+    def update(self, faces):
+        """Assign identities to the boxes (x, y, w, h) of the faces of a new frame, returns dict identity -> box"""
+
+        faces = [tuple(int(value) for value in face) for face in faces]
+
+        # Overlap of all pairs of subjects and faces, largest first
+        pairs = [(compute_overlap(subject[0], face), identity, index)
+                 for identity, subject in self.subjects.items() for index, face in enumerate(faces)]
+        pairs.sort(reverse=True)
+
+        found_subjects = {}
+        for overlap, identity, index in pairs:
+            if overlap < self.min_overlap:
+                break
+            if identity in found_subjects or index in found_subjects.values():
+                continue
+            found_subjects[identity] = index
+
+        # New subjects
+        for index in range(0, len(faces)):
+            if index not in found_subjects.values():
+                found_subjects[self.next_identity] = index
+                self.next_identity += 1
+
+        # Update boxes, remove subjects that have been missing too long
+        for identity in list(self.subjects.keys()):
+            if identity not in found_subjects:
+                self.subjects[identity][1] += 1
+                if self.subjects[identity][1] >= self.max_missing:
+                    del self.subjects[identity]
+
+        for identity, index in found_subjects.items():
+            self.subjects[identity] = [faces[index], 0]
+
+        return dict((identity, faces[index]) for identity, index in found_subjects.items())
+
+    def get_identities(self):
+        """Returns the identities of all subjects that have not been removed"""
+        return sorted(self.subjects.keys())
+
+
+class SubjectChain(object):
+    """Signal of one subject: the mean values of its box, resampled onto a uniform grid, in a RingBuffer"""
+
+    def __init__(self, identity, fps, length):
+        """Create empty signal"""
+        self.identity = identity
+        self.box = None
+        self.values = RingBuffer(length)
+        self.resampler = UniformResampler(fps)
+
+    def append(self, value, capture_time, box):
+        """Append mean value of the box of a frame"""
+        self.box = box
+        for resampled_value in self.resampler.push(capture_time, value):
+            self.values.append(resampled_value)
+
+    def get_number_of_values(self):
+        """Returns the number of values of the signal"""
+        return min(self.values.count, self.values.capacity)
+
+
+class MultiSubjectProcessor(object):
+    """Heart rates of several subjects in the same video stream.
+
+       Every subject (see SubjectIdentities) has its own chain: mean value of its box, RingBuffer, spectrum and HR. The
+       mean values are computed for every frame. compute() computes the HRs of all subjects like
+       SignalProcessor.compute_heart_rate(), but the signals are stacked as columns of one array, so the band spectra
+       of all subjects are computed by one FFT (or DFT matrix product) with the same spectral plan.
+    """
+
+    def __init__(self, fps, length=400, min_overlap=0.3, max_missing=25):
+        """fps: Rate of the signals
+           length: Number of values of the signal of every subject
+        """
+
+        self.fps = fps
+        self.length = length
+
+        self.identities = SubjectIdentities(min_overlap, max_missing)
+        self.chains = {}
+
+        # Provides the cached spectral plans, the serial interface is not needed
+        self.signalProcessor = SignalProcessor(use_serial_interface=False)
+
+    def update(self, frame, faces, capture_time, channel, offset=(0, 0)):
+        """Append the mean values of the faces of a new frame to the signals of their subjects
+
+           faces: Boxes (x, y, w, h) in coordinates of the full frame
+           channel: Index of the color channel
+           offset: Position (row, column) of the frame in the full frame, if it has been cropped
+        """
+
+        height, width = frame.shape[:2]
+
+        for identity, box in self.identities.update(faces).items():
+
+            # Box in coordinates of the frame, restricted to the frame
+            x, y, w, h = box
+            x_min, x_max = max(0, x - offset[1]), min(width, x + w - offset[1])
+            y_min, y_max = max(0, y - offset[0]), min(height, y + h - offset[0])
+            if x_min >= x_max or y_min >= y_max:
+                continue
+
+            if identity not in self.chains:
+                self.chains[identity] = SubjectChain(identity, self.fps, self.length)
+
+            self.chains[identity].append(cv2.mean(frame[y_min:y_max, x_min:x_max])[channel], capture_time, box)
+
+        # Remove chains of subjects that have been removed
+        for identity in set(self.chains.keys()) - set(self.identities.get_identities()):
+            del self.chains[identity]
+
+    def compute(self, zero_padding=False, peak_interpolation=None, spectrum_resolution=None, hr_min=0.5, hr_max=3):
+        """Returns the results of all subjects with at least two values as list of dicts, sorted by identity:
+
+           'subject': Identity, 'box': Last box of the face, 'heart_rate': HR (in beats per minute),
+           'spectrum', 'freq_axis', 'max_val': Spectrum of the band with its frequencies and the index of its maximum
+           'number_of_values': Number of values of the signal
+
+           The settings are passed by the caller, they are not read from settings.ini.
+           zero_padding: See algorithm parameter IDX_ZERO_PADDING
+           peak_interpolation, spectrum_resolution: See SignalProcessor.peak_interpolation and .spectrum_resolution
+        """
+
+        chains = [self.chains[identity] for identity in sorted(self.chains.keys())
+                  if self.chains[identity].get_number_of_values() >= 2]
+        if len(chains) == 0:
+            return []
+
+        # One column per subject, normalized like SignalProcessor.normalize()
+        signals = np.column_stack([chain.values.get() for chain in chains])
+        magnitudes = np.abs(signals)
+        min_vals, max_vals = magnitudes.min(axis=0), magnitudes.max(axis=0)
+        ranges = max_vals - min_vals
+        signals = np.where(max_vals > 0, (signals - min_vals) / np.where(ranges > 0, ranges, 1), signals)
+
+        # Band spectra of all subjects with the plan of compute_heart_rate()
+        plan = self.signalProcessor.get_spectral_plan(self.length, self.fps, zero_padding, hr_min, hr_max, zero_padding,
+                                                      spectrum_resolution)
+        band_spectra = plan.band_spectrum(signals)
+        spectra = np.abs(band_spectra)
+        max_vals = np.argmax(spectra, axis=0)
+
+        results = []
+        for num, chain in enumerate(chains):
+            frequency = plan.band_frequency(max_vals[num] + spectrum.interpolate_peak(band_spectra[:, num], max_vals[num],
+                                                                                      peak_interpolation))
+            results.append({'subject': chain.identity, 'box': chain.box, 'heart_rate': np.round(frequency * 60),
+                            'spectrum': spectra[:, num], 'freq_axis': plan.freq_axis_band, 'max_val': max_vals[num],
+                            'number_of_values': chain.get_number_of_values()})
+
+        return results
+
+    def get_number_of_subjects(self):
+        """Returns number of subjects with a signal"""
+        return len(self.chains)
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# -*- coding: ascii -*-
+"""offline_analysis.py - vectorized analysis of whole recordings, e.g. for retrospective evaluation"""
+
+import numpy as np
+import settings
+import spectrum
+
+from defines import *
+from numpy.lib.stride_tricks import as_strided
+
+# Number of windows that are processed at once, limits the memory of the intermediate arrays
+CHUNK_SIZE = 1024
+
+
+def get_windows(trace, window_size, hop_size):
+    """Returns a read-only view of all windows of the trace, one window per row. Window k contains the values
+       trace[k * hop_size:k * hop_size + window_size].
+    """
+
+    trace = np.ascontiguousarray(trace, dtype=float)
+    number_of_windows = max(0, (np.size(trace) - window_size) // hop_size + 1)
+    stride = trace.strides[0]
+
+    return as_strided(trace, shape=(number_of_windows, window_size), strides=(hop_size * stride, stride),
+                      writeable=False)
+
+
+def compute_heart_rate_batch(trace, fps, hop_size=1, window_size=400, zero_padding=None, resolution=None,
+                             peak_interpolation=None):
+    """Computes the HR of all windows of a trace in the same way as SignalProcessor.compute_heart_rate() does for a
+       RingBuffer that contains the window. Normalization, windowing and spectra are computed for many windows at once.
+
+       trace: Mean values of the ROI of the whole recording
+       fps: FPS of video stream
+       hop_size: Number of values between the beginnings of two windows
+       window_size: Number of values per window, i.e. length of the RingBuffer
+       zero_padding: Apply zero padding? None: Use algorithm parameter IDX_ZERO_PADDING of settings
+       resolution: See SignalProcessor.spectrum_resolution
+       peak_interpolation: See SignalProcessor.peak_interpolation
+
+       Returns HR, magnitude of band spectrum and index of maximum for every window (the last value of window k is
+       trace[k * hop_size + window_size - 1]) and the frequency axis of the band. If the plan uses the band-limited
+       DFT, the spectra may differ from compute_heart_rate() by rounding errors, because a matrix product is used.
+    """
+
+    if zero_padding is None:
+        _, curr_parameters = settings.get_parameters()
+        zero_padding = curr_parameters[IDX_ZERO_PADDING]
+
+    # Parameters: Minimal and maximum HR (48..180 bpm)
+    hr_min = 0.5
+    hr_max = 3
+
+    # Precomputed window, frequency axis, band limits and DFT matrix, as used by compute_heart_rate()
+    plan = spectrum.SpectralPlan(window_size, fps, zero_padding, hr_min, hr_max, resolution)
+
+    windows = get_windows(trace, window_size, hop_size)
+    number_of_windows = windows.shape[0]
+
+    spectra = np.zeros((number_of_windows, np.size(plan.freq_axis_band)))
+    max_vals = np.zeros(number_of_windows, dtype=int)
+    heart_rates = np.zeros(number_of_windows)
+
+    for begin in range(0, number_of_windows, CHUNK_SIZE):
+
+        # Complex band spectra of normalized windows
+        signal_fft_band = __compute_band_spectra(plan, windows[begin:begin + CHUNK_SIZE])
+        spectrum_band = abs(signal_fft_band)
+
+        # Get index of maximum frequency in spectrum
+        max_val = np.argmax(spectrum_band, axis=1)
+
+        # Get frequency of maximum, refined between the frequencies of the spectrum if desired
+        if peak_interpolation is None:
+            frequency = plan.freq_axis_band[max_val]
+        else:
+            frequency = np.array([plan.band_frequency(max_val[i] + spectrum.interpolate_peak(
+                signal_fft_band[i], max_val[i], peak_interpolation)) for i in range(0, np.size(max_val))])
+
+        spectra[begin:begin + CHUNK_SIZE] = spectrum_band
+        max_vals[begin:begin + CHUNK_SIZE] = max_val
+        heart_rates[begin:begin + CHUNK_SIZE] = np.round(frequency * 60)
+
+    return heart_rates, spectra, plan.freq_axis_band, max_vals
+
+
+def __compute_band_spectra(plan, windows):
+    """Returns the complex band spectra of the normalized windows (one window per row)"""
+
+    # MinMax normalization of every window as in SignalProcessor.normalize(), windows with zeros only are not modified
+    abs_windows = np.abs(windows)
+    max_val = np.max(abs_windows, axis=1)[:, np.newaxis]
+    min_val = np.min(abs_windows, axis=1)[:, np.newaxis]
+    nonzero = max_val > 0
+    signals = np.where(nonzero, (windows - min_val) / np.where(nonzero, max_val - min_val, 1), windows)
+
+    # Spectrum of band with the method of the plan
+    if plan.method == 'dft':
+        return signals.dot(plan.band_matrix.T)
+
+    if plan.number_before or plan.number_after:
+        signals = np.pad(signals, ((0, 0), (plan.number_before, plan.number_after)), 'constant')
+
+    return np.fft.rfft(signals * plan.window, axis=1)[:, plan.limits]
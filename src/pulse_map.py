@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+# -*- coding: ascii -*-
+"""pulse_map.py - signals of the blocks of a grid over the ROI: map of pulse amplitude and SNR, combined heart rate"""
+
+import numpy as np
+import settings
+import spectrum
+
+from defines import *
+from ring_buffer import RingBuffer
+
+
+def compute_block_means(frame, rows, columns, channel=None):
+    """Returns the mean values of the blocks of a rows x columns grid over the frame (rows x columns array)
+
+       The sums of all blocks are computed in one pass over the frame (np.add.reduceat along both axes), the frame can
+       be a view (e.g. the ROI of a larger frame) and is not copied. If the size of the frame is not a multiple of the
+       grid, the blocks differ by one pixel at most.
+
+       frame: 2-D frame or frame with channels
+       channel: Index of the channel that is used, None: Mean of all channels
+    """
+
+    frame = np.asarray(frame)
+
+    if channel is not None and frame.ndim == 3:
+        frame = frame[:, :, channel]
+
+    height, width = frame.shape[:2]
+    if height < rows or width < columns:
+        raise ValueError("Frame of %dx%d pixels is smaller than grid of %dx%d blocks" % (height, width, rows, columns))
+
+    # First row and column of every block
+    row_edges = np.linspace(0, height, rows + 1).astype(int)
+    column_edges = np.linspace(0, width, columns + 1).astype(int)
+
+    # Sums of blocks, 32 bit integers are sufficient for uint8 frames up to 16 million pixels per block
+    dtype = np.uint32 if frame.dtype == np.uint8 else np.float64
+    sums = np.add.reduceat(frame, row_edges[:-1], axis=0, dtype=dtype)
+    sums = np.add.reduceat(sums, column_edges[:-1], axis=1, dtype=dtype)
+
+    # Mean of channels
+    if sums.ndim == 3:
+        sums = sums.sum(axis=2) / float(np.size(frame, 2))
+
+    areas = np.outer(np.diff(row_edges), np.diff(column_edges))
+
+    return sums / areas.astype(np.float64)
+
+
+class PulseMap(object):
+    """Mean values of the blocks of an N x M grid over the ROI, frame by frame. Every block has its own signal, all
+       signals are stored in one RingBuffer (one row per frame).
+
+       compute() analyzes all signals at once: their band spectra are computed with one FFT along the time axis, with
+       the same spectral plan as SignalProcessor.compute_heart_rate(). The normalized power spectra of all blocks are
+       averaged, weighted by the SNR of the blocks, which gives the combined heart rate. Thus blocks with a strong pulse
+       (e.g. skin) dominate and blocks without a pulse (e.g. hair or background) hardly contribute.
+    """
+
+    def __init__(self, rows, columns, length=400):
+        """Create empty map
+
+           rows, columns: Size of the grid
+           length: Number of values of the signal of every block
+        """
+
+        self.rows = int(rows)
+        self.columns = int(columns)
+        self.signals = RingBuffer(length, value_shape=(self.rows * self.columns,))
+
+    def append(self, frame, channel=None):
+        """Append the mean values of the blocks of a frame (or its ROI)"""
+        self.append_means(compute_block_means(frame, self.rows, self.columns, channel))
+
+    def append_means(self, means):
+        """Append mean values of the blocks (rows x columns array), e.g. resampled ones"""
+        self.signals.append(np.ravel(means))
+
+    def clear(self):
+        """Remove all values"""
+        self.signals.clear()
+
+    def get_number_of_values(self):
+        """Returns the number of values of every signal"""
+        return min(self.signals.count, self.signals.capacity)
+
+    def compute(self, signal_processor, fps, hr_min=0.5, hr_max=3):
+        """Returns the analysis of the signals as dict, None if there are less than two values:
+
+           'heart_rate': Combined heart rate (in beats per minute)
+           'snr': SNR (in dB) of every block, i.e. power at the combined heart rate compared to the rest of the band
+           'amplitude': Amplitude of every block at the combined heart rate, relative to its mean value
+           'spectrum': Combined normalized power spectrum and 'freq_axis': its frequencies (in Hz)
+
+           signal_processor: SignalProcessor that provides the spectral plan and the peak interpolation
+        """
+
+        number_of_values = self.get_number_of_values()
+        if number_of_values < 2:
+            return None
+
+        # Remove mean value of every block (blocks differ in brightness), the zeros before the first value stay zero
+        signals = self.signals.get()
+        means = signals[-number_of_values:].mean(axis=0)
+        signals = signals - means
+        signals[:-number_of_values] = 0
+
+        # Same plan as compute_heart_rate()
+        _, curr_parameters = settings.get_parameters()
+        plan = signal_processor.get_spectral_plan(np.size(signals, 0), fps, curr_parameters[IDX_ZERO_PADDING], hr_min,
+                                                  hr_max, curr_parameters[IDX_ZERO_PADDING],
+                                                  signal_processor.spectrum_resolution)
+
+        # Band spectra of all blocks (one column per block) and power spectra normalized to a sum of one
+        band_spectra = plan.band_spectrum(signals)
+        power = np.abs(band_spectra) ** 2
+        total_power = power.sum(axis=0)
+        normalized_power = power / np.where(total_power > 0, total_power, 1)
+
+        # First estimate: Every block contributes equally. Then every block is weighted with its SNR at this estimate.
+        max_val = np.argmax(normalized_power.mean(axis=1))
+        snr = self.__compute_snr(normalized_power, max_val)
+        combined_spectrum = normalized_power.dot(snr) / max(np.sum(snr), np.finfo(float).tiny)
+        max_val = np.argmax(combined_spectrum)
+        snr = self.__compute_snr(normalized_power, max_val)
+
+        # Interpolation of the peak, Jacobsen's estimator needs complex spectra and is replaced by a parabola
+        method = signal_processor.peak_interpolation
+        if method == 'jacobsen':
+            method = 'parabolic'
+        frequency = plan.band_frequency(max_val + spectrum.interpolate_peak(np.sqrt(combined_spectrum), max_val,
+                                                                            method))
+
+        # Amplitude of the sinusoid at the maximum (the window reduces the magnitude by the sum of its values)
+        amplitude = 2 * np.abs(band_spectra[max_val]) / np.sum(plan.window_signal)
+        relative_amplitude = amplitude / np.where(np.abs(means) > 0, np.abs(means), 1)
+
+        with np.errstate(divide='ignore'):
+            snr_db = 10 * np.log10(snr)
+
+        return {'heart_rate': np.round(frequency * 60),
+                'snr': snr_db.reshape(self.rows, self.columns),
+                'amplitude': relative_amplitude.reshape(self.rows, self.columns),
+                'spectrum': combined_spectrum,
+                'freq_axis': plan.freq_axis_band}
+
+    def __compute_snr(self, normalized_power, max_val):
+        """Returns the ratio of the power at the maximum (and its neighbors) to the power of the rest of the band for
+           every block
+        """
+
+        peak_power = normalized_power[max(0, max_val - 1):max_val + 2].sum(axis=0)
+        other_power = 1.0 - peak_power
+
+        return peak_power / np.maximum(other_power, 1e-12)
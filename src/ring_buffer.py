@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+# -*- coding: ascii -*-
+"""ring_buffer.py - fixed-capacity circular buffers for signals that are updated frame by frame"""
+
+import numpy as np
+
+
+class RingBuffer(object):
+    """A preallocated circular buffer that holds the last ''capacity'' samples of a signal.
+
+       Every sample is written twice, at position i and i + capacity, so that the samples in chronological order are
+       always available as one contiguous slice of the storage. Thus get() returns a view without copying and append()
+       takes constant time, independent of the capacity.
+
+       A sample can also be an array (e.g. one value per block of a frame), then the samples are the rows of get().
+    """
+
+    def __init__(self, capacity, dtype=np.float64, value_shape=()):
+        """Allocate memory. The buffer is filled with zeros, like the signal before the first frame arrives.
+
+           value_shape: Shape of a sample, () for scalar samples
+        """
+
+        if capacity < 1:
+            raise ValueError("Capacity of ring buffer has to be at least 1")
+
+        # Store properties
+        self.capacity = int(capacity)
+        self.dtype = dtype
+
+        # Storage of twice the capacity, see class description
+        self.data = np.zeros((2 * self.capacity,) + tuple(value_shape), dtype=dtype)
+
+        # Index of the oldest sample in storage
+        self.start = 0
+
+        # Total number of samples appended since creation or last clear()
+        self.count = 0
+
+    def append(self, value):
+        """Add a new sample and drop the oldest one"""
+
+        # Write value twice
+        self.data[self.start] = value
+        self.data[self.start + self.capacity] = value
+
+        # Move start of window
+        self.start += 1
+        if self.start == self.capacity:
+            self.start = 0
+
+        self.count += 1
+
+    def get(self):
+        """Return the samples in chronological order (oldest first) as a view on the storage.
+           The view is only valid until the next call of append(), copy it if it has to be kept.
+        """
+        return self.data[self.start:self.start + self.capacity]
+
+    def latest(self, number):
+        """Return a view on the newest ''number'' samples"""
+        number = min(int(number), self.capacity)
+        return self.data[self.start + self.capacity - number:self.start + self.capacity]
+
+    def clear(self):
+        """Reset buffer to zeros"""
+        self.data.fill(0)
+        self.start = 0
+        self.count = 0
+
+    def __len__(self):
+        return self.capacity
+
+    def __array__(self, dtype=None):
+        """Allows to use the buffer directly in numpy functions"""
+        if dtype is None:
+            return self.get()
+        return self.get().astype(dtype)
+
+
+class CircularHistory(RingBuffer):
+    """A RingBuffer that also provides mean and variance of the stored values in constant time.
+
+       In contrast to RingBuffer, the zeros before the first value are not part of the history: the statistics are
+       computed over the last min(count, capacity) values. They are updated with every append() (Welford's algorithm,
+       extended by the removal of the oldest value) and recomputed every ''resync_interval'' values to bound rounding
+       errors.
+    """
+
+    def __init__(self, capacity, dtype=np.float64, resync_interval=1000):
+        """Allocate memory and initialize statistics"""
+        self.resync_interval = int(resync_interval)
+        super(CircularHistory, self).__init__(capacity, dtype)
+        self.__reset_statistics()
+
+    def __reset_statistics(self):
+        """Statistics of an empty history"""
+        self.mean = 0.0
+        self.sum_of_squares = 0.0
+        self.updates_since_resync = 0
+
+    def append(self, value):
+        """Add a new value, the oldest one is removed if the history is full"""
+
+        value = float(value)
+
+        if self.count >= self.capacity:
+
+            # Replace oldest value
+            value_old = float(self.data[self.start])
+            mean_old = self.mean
+            self.mean += (value - value_old) / self.capacity
+            self.sum_of_squares += (value - value_old) * (value - self.mean + value_old - mean_old)
+
+        else:
+
+            # Add value
+            delta = value - self.mean
+            self.mean += delta / (self.count + 1)
+            self.sum_of_squares += delta * (value - self.mean)
+
+        super(CircularHistory, self).append(value)
+
+        # Recompute statistics from time to time
+        self.updates_since_resync += 1
+        if self.updates_since_resync >= self.resync_interval:
+            self.resync()
+
+    def resync(self):
+        """Recompute the statistics from the stored values"""
+
+        values = self.get_values()
+
+        if np.size(values):
+            self.mean = float(np.mean(values))
+            self.sum_of_squares = float(np.sum((values - self.mean) ** 2))
+        else:
+            self.__reset_statistics()
+
+        self.updates_since_resync = 0
+
+    def clear(self):
+        """Remove all values"""
+        super(CircularHistory, self).clear()
+        self.__reset_statistics()
+
+    def get_size(self):
+        """Return number of values in history"""
+        return min(self.count, self.capacity)
+
+    def get_values(self):
+        """Return a view on the values in history (oldest first), without the zeros before the first value"""
+        return self.latest(self.get_size())
+
+    def get_mean(self):
+        """Return mean of the values in history, 0 if it is empty"""
+        return self.mean
+
+    def get_variance(self):
+        """Return (population) variance of the values in history, 0 if it is empty"""
+        if self.count == 0:
+            return 0.0
+        return max(self.sum_of_squares, 0.0) / self.get_size()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+# -*- coding: ascii -*-
+"""scheduler.py - pacing of loops to a fixed rate with absolute deadlines on a monotonic clock"""
+
+import numpy as np
+import time
+
+from clock import monotonic
+from ring_buffer import CircularHistory
+
+# What happens after a deadline has been missed (overrun):
+# 'skip': Missed deadlines are skipped, the next deadline is the next one of the original grid (no drift, no burst)
+# 'burst': All missed deadlines are kept, the loop runs without waiting until it has caught up (up to max_lag)
+# 'reset': The grid starts again one period after the overrun
+CATCH_UP_POLICIES = ('skip', 'burst', 'reset')
+
+
+class DeadlineScheduler(object):
+    """Paces a loop to a fixed rate. In contrast to waiting 1 / FPS minus the duration of the last iteration, the
+       deadlines are computed from the start of the grid (start + n / FPS), so that errors of single iterations and of
+       sleeping do not accumulate.
+
+       Sleeping is imprecise by a few milliseconds, so wait() sleeps until spin_time before the deadline and then
+       checks the clock repeatedly (yielding to other threads) until the deadline has been reached.
+    """
+
+    def __init__(self, fps, catch_up='skip', spin_time=0.002, max_lag=0.5, time_function=monotonic,
+                 sleep_function=time.sleep):
+        """Create scheduler, the grid starts with the first call of start() or wait()
+
+           fps: Rate of the loop
+           catch_up: Behaviour after an overrun, see CATCH_UP_POLICIES
+           spin_time: Time (in seconds) before the deadline in which the clock is polled instead of sleeping
+           max_lag: 'burst': If the loop is late by more than max_lag seconds, missed deadlines are skipped
+           time_function, sleep_function: Clock (in seconds) and sleep function, e.g. for tests
+        """
+
+        if catch_up not in CATCH_UP_POLICIES:
+            raise ValueError("Unknown catch-up policy: " + str(catch_up))
+
+        self.catch_up = catch_up
+        self.spin_time = spin_time
+        self.max_lag = max_lag
+        self.time_function = time_function
+        self.sleep_function = sleep_function
+
+        self.period = None
+        self.set_fps(fps)
+
+        # Next deadline and time of the last return of wait()
+        self.deadline = None
+        self.last_wake_time = None
+
+        # Statistics: Lateness of the last returns of wait() and the intervals between them (in seconds), number of
+        # periods, overruns and deadlines that have been skipped
+        self.lateness = CircularHistory(100)
+        self.intervals = CircularHistory(100)
+        self.number_of_periods = 0
+        self.number_of_overruns = 0
+        self.number_of_skipped_deadlines = 0
+
+    def set_fps(self, fps):
+        """Change the rate, the next deadline is kept"""
+        if fps <= 0:
+            raise ValueError("FPS must be positive")
+        self.period = 1.0 / fps
+
+    def start(self):
+        """Start the grid now, i.e. the first deadline is one period from now"""
+        now = self.time_function()
+        self.deadline = now + self.period
+        self.last_wake_time = now
+
+    def wait(self):
+        """Wait until the next deadline, returns False if the deadline had already passed (overrun)"""
+
+        if self.deadline is None:
+            self.start()
+
+        now = self.time_function()
+
+        # Overrun: Do not wait, choose next deadline according to the catch-up policy
+        if now > self.deadline:
+            self.number_of_overruns += 1
+            self.__update_statistics(now)
+            self.__catch_up(now)
+            return False
+
+        # Sleep for most of the remaining time, then poll the clock until the deadline has been reached
+        remaining_time = self.deadline - now
+        if remaining_time > self.spin_time:
+            self.sleep_function(remaining_time - self.spin_time)
+
+        now = self.time_function()
+        while now < self.deadline:
+            self.sleep_function(0)
+            now = self.time_function()
+
+        self.__update_statistics(now)
+        self.deadline += self.period
+
+        return True
+
+    def __catch_up(self, now):
+        """Choose next deadline after an overrun"""
+
+        lag = now - self.deadline
+
+        if self.catch_up == 'reset':
+            self.deadline = now + self.period
+
+        elif self.catch_up == 'burst' and lag <= self.max_lag:
+            self.deadline += self.period
+
+        else:
+            # Next deadline of the grid after now
+            missed_deadlines = int(np.floor(lag / self.period))
+            self.number_of_skipped_deadlines += missed_deadlines
+            self.deadline += (missed_deadlines + 1) * self.period
+
+    def __update_statistics(self, now):
+        """Store lateness and interval of a return of wait()"""
+        self.lateness.append(now - self.deadline)
+        if self.last_wake_time is not None:
+            self.intervals.append(now - self.last_wake_time)
+        self.last_wake_time = now
+        self.number_of_periods += 1
+
+    def get_statistics(self):
+        """Returns number of periods, overruns and skipped deadlines, and mean and maximum lateness, mean interval and
+           jitter (standard deviation of the intervals) of the last 100 periods (in seconds)
+        """
+
+        lateness = self.lateness.get_values()
+
+        return {'periods': self.number_of_periods,
+                'overruns': self.number_of_overruns,
+                'skipped_deadlines': self.number_of_skipped_deadlines,
+                'lateness_mean': self.lateness.get_mean(),
+                'lateness_max': float(lateness.max()) if lateness.size else 0.0,
+                'interval_mean': self.intervals.get_mean(),
+                'jitter': float(np.sqrt(max(0.0, self.intervals.get_variance())))}
@@ -3,6 +3,7 @@
 """serial_interface.py - tool for sending trigger to MRI using a device connected via the serial port"""
 
 import serial
+import clock
 import time
 import threading
 import numpy as np
@@ -39,8 +40,9 @@ class SerialInterface(threading.Thread):
         self.trigger_event = threading.Event()
         self.eventProgramEnd = threading.Event()
 
-        # Store current time
-        self.last_trigger_time = time.time()
+        # Store current time and time at which the pending trigger is sent (virtual clock only)
+        self.last_trigger_time = clock.now()
+        self.trigger_time = None
         self.firstRun = True
 
         # Call initialization of thread class
@@ -53,13 +55,17 @@ class SerialInterface(threading.Thread):
         if self.serial_connection_established:
 
             # Get current time
-            self.curr_trigger_time = time.time()
+            self.curr_trigger_time = clock.now()
+
+            # Virtual clock: The pending trigger is written as soon as its time has been reached
+            self.__write_due_trigger()
 
             # Only send if the last command was sent >0.5 second ago
             if (self.curr_trigger_time - self.last_trigger_time) > 0.5 and (self.trigger_event.is_set() is False):
 
                 # Store waiting time
                 self.waiting_time = waiting_time
+                self.trigger_time = self.curr_trigger_time + waiting_time
 
                 # Activate event
                 self.trigger_event.set()
@@ -76,22 +82,38 @@ class SerialInterface(threading.Thread):
             else:
                 return False, (self.curr_trigger_time - self.last_trigger_time) + waiting_time
 
+    def __write_due_trigger(self):
+        """With the virtual clock, triggers are not written by the thread. Instead, the pending trigger is written when
+           the clock has reached its time, so that the trigger times do not depend on the scheduling of the threads.
+        """
+
+        if clock.is_virtual() and self.trigger_event.is_set() and self.curr_trigger_time >= self.trigger_time:
+
+            # Write to serial port
+            self.serial_connection.write('T\n')
+
+            # Store time of trigger
+            self.last_trigger_time = self.trigger_time
+
+            # Clear event
+            self.trigger_event.clear()
+
     def run(self):
         """Main functionality of thread"""
 
         while self.eventProgramEnd.is_set() is False:
 
-            # If a application of trigger is desired
-            if self.trigger_event.is_set() and not np.isnan(self.waiting_time):
+            # If a application of trigger is desired (with the virtual clock, see __write_due_trigger())
+            if self.trigger_event.is_set() and not clock.is_virtual() and not np.isnan(self.waiting_time):
 
                 # Wait
-                time.sleep(self.waiting_time)
+                clock.sleep(self.waiting_time)
 
                 # Write to serial port
                 self.serial_connection.write('T\n')
 
                 # Store current time
-                self.last_trigger_time = time.time()
+                self.last_trigger_time = clock.now()
 
                 # Clear event
                 self.trigger_event.clear()
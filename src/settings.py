@@ -13,8 +13,11 @@ import threading
 from defines import *
 
 # Standard parameters if no settings.ini is available
-std_settings = [VAL_WEBCAM, VAL_CAMERA, VAL_ALGORITHM, VAL_CURVES, VAL_FRAMES, VAL_FACE, VAL_FPS, VAL_COLORCHANNEL]
-std_param = [VAL_ZERO_PADDING, VAL_WIN_SIZE, VAL_RUN_MAX, VAL_MIN_TIME]
+std_settings = [VAL_WEBCAM, VAL_CAMERA, VAL_ALGORITHM, VAL_CURVES, VAL_FRAMES, VAL_FACE, VAL_FPS, VAL_COLORCHANNEL,
+                VAL_CAPTURE_WIDTH, VAL_CAPTURE_HEIGHT, VAL_CROP, VAL_PULSE_MAP_GRID,
+                VAL_MULTI_SUBJECT]
+std_param = [VAL_ZERO_PADDING, VAL_WIN_SIZE, VAL_RUN_MAX, VAL_MIN_TIME, VAL_PEAK_INTERPOLATION, VAL_SIGMA,
+             VAL_SPECTRUM_BACKEND, VAL_SPECTRUM_RESOLUTION]
 
 # Used for synchronization of threads
 lock = threading.Lock()
@@ -24,8 +27,8 @@ def get_parameters():
     """Load data from configuration file."""
 
     # Initialize vector for data
-    settings = np.zeros(8)
-    parameters = np.zeros(4)
+    settings = np.zeros(13)
+    parameters = np.zeros(8)
 
     parameter_acquired = False
 
@@ -78,7 +81,7 @@ def flip_setting(idx):
     # Get parameters
     settings, parameters = get_parameters()
 
-    if idx < 8:
+    if idx < np.size(settings):
 
         # Flip boolean value
         settings[idx] = 1 - settings[idx]
@@ -175,6 +178,19 @@ def __store_parameters(settings, parameters):
             config.set('settings', '# Which color channel should be used?')
             config.set('settings', 'val_color', settings[7])
 
+            config.set('settings', '# Requested width and height of camera frames (0: default of camera)')
+            config.set('settings', 'val_capture_width', settings[8])
+            config.set('settings', 'val_capture_height', settings[9])
+
+            config.set('settings', '# Crop frames to the ROI (with some margin) directly after capture?')
+            config.set('settings', 'bool_crop_to_roi', settings[10])
+
+            config.set('settings', '# Pulse map: Number of rows and columns of the grid over the ROI (0: disabled)')
+            config.set('settings', 'val_pulse_map_grid', settings[11])
+
+            config.set('settings', '# Compute a separate HR for every detected face?')
+            config.set('settings', 'bool_multi_subject', settings[12])
+
             config.add_section('parameters')
 
             config.set('parameters', '# Algorithm 1: Apply Zero padding?')
@@ -189,6 +205,19 @@ def __store_parameters(settings, parameters):
             config.set('parameters', '# Algorithm 2: Minimum time until new trigger')
             config.set('parameters', 'val_min_time', parameters[3])
 
+            config.set('parameters', '# Algorithm 1 and 3: Interpolation of spectral peak (0: none, 1: parabolic, '
+                                     '2: quadratic (log), 3: Jacobsen)')
+            config.set('parameters', 'idx_peak_interpolation', parameters[4])
+
+            config.set('parameters', '# Algorithm 2: Standard deviation of Gaussian weights of curve fit (0: no weights)')
+            config.set('parameters', 'val_sigma', parameters[5])
+
+            config.set('parameters', '# Algorithm 1 and 3: Computation of band spectrum (0: FFT, 1: sliding DFT)')
+            config.set('parameters', 'idx_spectrum_backend', parameters[6])
+
+            config.set('parameters', '# Algorithm 1: Resolution of spectrum in Hz (0: frequencies of FFT)')
+            config.set('parameters', 'val_spectrum_resolution', parameters[7])
+
             # Write and close file
             config.write(config_file)
             config_file.close()
@@ -3,43 +3,80 @@
 """signal_processing.py - a class for signal processing"""
 
 import numpy as np
-import datetime
+import clock
 import settings
 import serial_interface
+import spectrum
 
 from defines import *
+from analysis_frame import AnalysisFrame
+from ring_buffer import CircularHistory, RingBuffer
+from streaming import SlidingDFTBank, SlidingSlopeEstimator, StreamingNormalizer
 
 
 class SignalProcessor:
     """This class provides the essential signal processing algorithms"""
 
-    def __init__(self):
+    def __init__(self, use_serial_interface=True):
+        """use_serial_interface: Send triggers to the serial port? False: No serial interface thread is created, e.g. if
+           only the heart rate is computed
+        """
 
         # Define variables for function filterWaveform()
         self.value_last_running_max = -np.inf
         self.counter_running_max = 0
         self.time_diff = None
-        self.max_val_list = np.array([])
 
-        # Define variables for function estimate_trigger()
-        self.delta_times = np.zeros(30)
+        # Incremental curve fit of function filterWaveform(), the RingBuffer it has been filled from and the number of
+        # values of this buffer it has seen
+        self.slope_estimator = None
+        self.slope_estimator_buffer = None
+        self.slope_estimator_count = None
+
+        # Incremental normalization of RingBuffer objects, shared by all algorithms and the display
+        self.normalizer = StreamingNormalizer()
+
+        # Precomputed arrays for functions compute_heart_rate() and estimate_trigger()
+        self.spectral_plan_cache = spectrum.SpectralPlanCache()
+        self.spectral_plan_settings = None
+
+        # Resolution (in Hz) of the spectrum in compute_heart_rate(). None: Frequencies of the (zero-padded) FFT
+        self.spectrum_resolution = None
+
+        # Computation of the band spectrum: 'fft' (SpectralPlan of whole window) or 'sliding_dft' (a SlidingDFTBank
+        # per plan updates the spectrum with every new value of a RingBuffer, other signals always use the plan)
+        self.spectrum_backend = 'fft'
+        self.sliding_dft_banks = {}
+
+        # Interpolation of the spectral maximum, see spectrum.PEAK_INTERPOLATION_METHODS. None: Use frequency of maximum
+        self.peak_interpolation = None
+
+        # Define variables for function estimate_trigger(): Last positions of maximum in spectrum (created with the
+        # number of values used for averaging) and durations of the last 30 triggers
+        self.max_val_list = None
+        self.delta_times = CircularHistory(30)
 
-        # Get time for trigger algorithm
-        self.curr_time = datetime.datetime.now()
+        # Get time for trigger algorithm (in seconds, see clock.py)
+        self.curr_time = clock.now()
 
         # Create serial interface thread:
-        if settings.determine_if_under_testing():
+        if not use_serial_interface:
+            self.serial_interface = None
+        elif settings.determine_if_under_testing():
             self.serial_interface = serial_interface.SerialInterface('')
         else:
             self.serial_interface = serial_interface.SerialInterface('/dev/ttyUSB0')
 
         # Start serial interface thread
-        self.serial_interface.start()
+        if self.serial_interface is not None:
+            self.serial_interface.start()
 
     def clear(self):
-        self.serial_interface.clear()
+        if self.serial_interface is not None:
+            self.serial_interface.clear()
 
-    def filter_waveform(self, input_raw_signal, input_output_signal, input_param_1, input_param_2, input_param_3):
+    def filter_waveform(self, input_raw_signal, input_output_signal, input_param_1, input_param_2, input_param_3,
+                        input_param_4=None):
         """This function filters the video signal and thereby obtains a waveform more similar to pulse oximetry.
            This is a real-time implementation of the algorithm described in:
 
@@ -50,34 +87,69 @@ class SignalProcessor:
            inputParam1: Number of preceding values used for filtering (standard value: 9)
            inputParam2: Number of times the running maximum signal has to be stable (standard value: 3)
            inputParam3: Minimum time (in sec) until a new trigger can be sent (standard value: 0.5)
+           inputParam4: Standard deviation (in values) of Gaussian weights for the curve fit (standard value: None, i.e.
+                        no weights, 0 has the same meaning)
 
-           Please note that the curve fit is computed at the moment without Gaussian weights.
+           Both signals can be given as numpy arrays or as RingBuffer objects. If the output signal is a RingBuffer, the
+           new value is appended in place and a view on the buffer is returned instead of a new array.
+
+           The slope is computed by a SlidingSlopeEstimator. If the raw signal is a RingBuffer, only the values that were
+           appended since the last call are added to the estimator. Otherwise, the estimator is filled with the last
+           values of the signal. In both cases, the effort does not depend on the length of the raw signal.
         """
 
         # Get signals
-        raw_signal = input_raw_signal
+        raw_signal = np.asarray(input_raw_signal)
         output_signal = input_output_signal
 
-        # Normalize values
-        values_norm = self.normalize(raw_signal)
-
-        # Perform pseudo-derivation
-        values_norm_diff = np.abs(np.diff(values_norm))
-
-        # Apply window
-        values_norm_diff_window = values_norm_diff[-input_param_1:]
+        # Number of values used for fit
+        window_size = int(input_param_1)
+
+        # Standard deviation of weights, 0 (e.g. from settings) disables them
+        sigma = input_param_4 if input_param_4 else None
+
+        # Create new estimator if parameters have been changed
+        if self.slope_estimator is None or self.slope_estimator.window_size != window_size or \
+                self.slope_estimator.sigma != sigma:
+            self.slope_estimator = SlidingSlopeEstimator(window_size, sigma)
+            self.slope_estimator_count = None
+
+        # Perform pseudo-derivation of new values and update curve fit. Only the values of the buffer that the estimator
+        # has already seen are skipped, another buffer fills the estimator again.
+        if isinstance(input_raw_signal, RingBuffer) and input_raw_signal is self.slope_estimator_buffer and \
+                self.slope_estimator_count is not None and \
+                0 <= input_raw_signal.count - self.slope_estimator_count <= window_size:
+            new_values = input_raw_signal.latest(input_raw_signal.count - self.slope_estimator_count + 1)
+            for value in np.abs(np.diff(new_values)):
+                self.slope_estimator.push(value)
+        else:
+            self.slope_estimator.fill(np.abs(np.diff(raw_signal[-(window_size + 1):])))
 
-        # Prepare fit
-        values_x_data = np.linspace(0, 1, input_param_1)
+        if isinstance(input_raw_signal, RingBuffer):
+            self.slope_estimator_buffer = input_raw_signal
+            self.slope_estimator_count = input_raw_signal.count
+        else:
+            self.slope_estimator_buffer = self.slope_estimator_count = None
 
-        # Apply curve fit
-        value_m = self.__curve_fit(values_x_data, values_norm_diff_window)
+        # Apply normalization: It scales the pseudo-derivation and thereby the slope by 1 / (max - min)
+        value_m = self.slope_estimator.get_slope()
+        if isinstance(input_raw_signal, RingBuffer):
+            min_val, max_val = self.normalizer.get_extrema(input_raw_signal)
+        else:
+            max_val = np.max(np.abs(raw_signal))
+            min_val = np.min(np.abs(raw_signal))
+        if max_val - min_val > 0:
+            value_m /= (max_val - min_val)
 
         # Get output: Computed signal
-        output_signal = np.append(output_signal, value_m[0])
+        if isinstance(output_signal, RingBuffer):
+            output_signal.append(value_m)
+            output_signal = output_signal.get()
+        else:
+            output_signal = np.append(output_signal, value_m)
 
         # Apply running max window
-        value_running_max = np.amax(output_signal[-input_param_1:])
+        value_running_max = np.amax(output_signal[-window_size:])
 
         # Increase counter if running max is equal to last value. Otherwise reset counter.
         if value_running_max == self.value_last_running_max:
@@ -87,7 +159,7 @@ class SignalProcessor:
             self.value_last_running_max = value_running_max
 
         # Compute time since last trigger was sent
-        self.time_diff = (datetime.datetime.now() - self.curr_time).total_seconds()
+        self.time_diff = clock.now() - self.curr_time
 
         # If the running maximum was stable long enough and enough time has passed, return True
         if self.counter_running_max == input_param_2 and self.time_diff > input_param_3:
@@ -96,17 +168,18 @@ class SignalProcessor:
             self.counter_running_max = 0
 
             # Reset time
-            self.curr_time = datetime.datetime.now()
+            self.curr_time = clock.now()
 
             # Send trigger
-            self.serial_interface.send_trigger(0)
+            if self.serial_interface is not None:
+                self.serial_interface.send_trigger(0)
 
             return True, output_signal
 
         else:
             return False, output_signal
 
-    def compute_heart_rate(self, input_raw_signal, estimated_fps):
+    def compute_heart_rate(self, input_raw_signal, estimated_fps, frame=None):
         """This simple algorithm computes the heart rate as described in:
 
         Spicher N, Maderwald S, Ladd ME and Kukuk M. Heart rate monitoring in ultra-high-field MRI using frequency
@@ -116,13 +189,16 @@ class SignalProcessor:
 
         Please note that the different length of the input signal N and that a moving average filter as described in
         section 2.4) of the reference is not applied.
+
+        frame: AnalysisFrame of input_raw_signal that is shared with other algorithms (optional)
         """
 
-        # Get normalized signal
-        signal = self.normalize(input_raw_signal)
+        # Get intermediate results that are shared with other algorithms
+        if frame is None:
+            frame = self.create_analysis_frame(input_raw_signal, estimated_fps)
 
         # Store number of elements in signal
-        n = np.size(signal)
+        n = frame.get_size()
 
         # Store FPS of video stream
         fps = estimated_fps
@@ -134,44 +210,25 @@ class SignalProcessor:
         # Get current settings
         curr_settings, curr_parameters = settings.get_parameters()
 
-        # Apply zero padding if it is enabled
-        if curr_parameters[IDX_ZERO_PADDING]:
-
-            # Compute next power of 2 from N
-            next_n = self.nextpow2(self.nextpow2(n))
-
-            # Zero padding: Fill before and after signal with zeros
-            number_before, number_after = self.compute_zero_padding_values(next_n - n)
-            signal = np.concatenate((np.zeros(int(number_before)), signal, np.zeros(int(number_after))), 0)
-
-            # Use new N value instead
-            n = next_n
-
-        # Use Hamming window on signal
-        values_win = signal[0:n] * np.hamming(n)
-
-        # Compute FFT
-        signal_fft = np.fft.fft(values_win)
-
-        # Compute frequency axis
-        x = np.linspace(0, n / fps, n + 1)
-        freq_axis = np.fft.fftfreq(len(values_win), x[1] - x[0])
+        # Get precomputed window, frequency axis, band limits and DFT matrix
+        plan = self.get_spectral_plan(n, fps, curr_parameters[IDX_ZERO_PADDING], hr_min, hr_max,
+                                      curr_parameters[IDX_ZERO_PADDING], self.spectrum_resolution)
 
-        # Get boolean values if values are between hrMin and hrMax
-        limits_bool = (hr_min < freq_axis) & (hr_max > freq_axis)
-        limits_idx = np.linspace(0, n - 1, n)
+        # Compute spectrum between hrMin and hrMax of windowed and zero-padded signal
+        signal_fft_band = frame.get_band_spectrum(plan)
+        spectrum_band = frame.get_magnitude(plan)
 
-        # Get indices of frequencies between hrMin and hrMax
-        limits = limits_idx[limits_bool.nonzero()]
-        limits = limits.astype(int)
+        # Get index of maximum frequency in spectrum
+        max_val = np.argmax(spectrum_band)
 
-        # Get index of maximum frequency in FFT spectrum
-        max_val = limits[np.argmax(abs(signal_fft[limits]))]
+        # Get frequency of maximum, refined between the frequencies of the spectrum if desired
+        frequency = plan.band_frequency(max_val + spectrum.interpolate_peak(signal_fft_band, max_val,
+                                                                            self.peak_interpolation))
 
         # Return HR, spectrum with frequency axis, and found maximum
-        return (np.round(freq_axis[max_val] * 60)), abs(signal_fft[limits]), freq_axis[limits], max_val - limits[0]
+        return (np.round(frequency * 60)), spectrum_band, plan.freq_axis_band, max_val
 
-    def estimate_trigger(self, input_raw_signal, estimated_fps, input_param_1):
+    def estimate_trigger(self, input_raw_signal, estimated_fps, input_param_1, frame=None):
         """This simple algorithm computes MRI triggers as described in:
 
         Spicher N, Kukuk M, Ladd ME and Maderwald S. In vivo 7T MR imaging triggered by phase information obtained from
@@ -179,13 +236,18 @@ class SignalProcessor:
         30.05.-05.06.2015.
 
         inputParam1: Number of preceding values used for filtering
+        frame: AnalysisFrame of input_raw_signal that is shared with other algorithms (optional)
         """
 
-        # Get normalized signal
-        signal = self.normalize(input_raw_signal)
+        # Get intermediate results that are shared with other algorithms
+        if frame is None:
+            frame = self.create_analysis_frame(input_raw_signal, estimated_fps)
+
+        # Get signal, a RingBuffer is used without copying
+        input_raw_signal = np.asarray(input_raw_signal)
 
         # Store number of elements in signal
-        n = np.size(signal)
+        n = frame.get_size()
 
         # Store FPS of video stream
         fps = estimated_fps
@@ -194,65 +256,101 @@ class SignalProcessor:
         hr_min = 0.5
         hr_max = 3
 
-        # Use Hamming window on signal
-        values_win = signal[0:n] * np.hamming(n)
+        # Get precomputed window, frequency axis, band limits and DFT matrix (zero padding is not used here)
+        plan = self.get_spectral_plan(n, fps, False, hr_min, hr_max)
 
-        # Compute FFT
-        signal_fft = np.fft.fft(values_win)
+        # Compute spectrum between hrMin and hrMax of windowed signal
+        signal_fft_band = frame.get_band_spectrum(plan)
+        spectrum_band = frame.get_magnitude(plan)
 
         # Get phase
-        signal_phase = np.angle(signal_fft)
-
-        # Compute frequency axis
-        x = np.linspace(0, n / fps, n + 1)
-        freq_axis = np.fft.fftfreq(len(values_win), x[1] - x[0])
-
-        # Get boolean values if values are between hrMin and hrMax
-        limits_bool = (hr_min < freq_axis) & (hr_max > freq_axis)
-        limits_idx = np.linspace(0, n - 1, n)
+        signal_phase_band = frame.get_phase(plan)
 
         # Get indices of frequencies between hrMin and hrMax
-        limits = limits_idx[limits_bool.nonzero()]
-        limits = limits.astype(int)
+        limits = plan.limits
 
         # Get index of maximum frequency in FFT spectrum
-        max_val = limits[np.argmax(abs(signal_fft[limits]))]
-
-        # Average
-        if np.count_nonzero(input_raw_signal) >= 400:
-
-            if np.size(self.max_val_list) < input_param_1:
-                self.max_val_list = np.append(self.max_val_list, max_val)
-            else:
-                self.max_val_list = np.delete(self.max_val_list, 0)
-                self.max_val_list = np.append(self.max_val_list, max_val)
-                max_val = np.round(np.mean(self.max_val_list), 0)
+        max_val = limits[np.argmax(spectrum_band)]
+
+        # Refine position of maximum between the frequencies of the spectrum if desired
+        max_val += spectrum.interpolate_peak(signal_fft_band, max_val - limits[0], self.peak_interpolation)
+
+        # Average (an infinite number of values disables averaging)
+        if np.count_nonzero(input_raw_signal) >= 400 and np.isfinite(input_param_1):
+
+            # Create history, or start again if the number of values has been changed
+            if self.max_val_list is None or self.max_val_list.capacity != int(input_param_1):
+                self.max_val_list = CircularHistory(input_param_1)
+
+            # Average is used as soon as the history was full before
+            history_full = self.max_val_list.get_size() == self.max_val_list.capacity
+            self.max_val_list.append(max_val)
+            if history_full:
+                max_val = self.max_val_list.get_mean()
+                if self.peak_interpolation is None:
+                    max_val = np.round(max_val, 0)
+
+        # Get frequency and phase of maximum, the spectrum is evaluated again if it lies between two frequencies
+        frequency = plan.band_frequency(max_val - limits[0])
+        if max_val == int(max_val):
+            phase_max_val = signal_phase_band[int(max_val) - limits[0]]
+        else:
+            phase_max_val = np.angle(plan.spectrum_at(frame.get_normalized_signal(), max_val - limits[0]))
 
         # Compute time until next maximum in signal
-        if signal_phase[max_val] < 0:
-            self.delta = np.abs(signal_phase[max_val] / (2 * np.pi * freq_axis[max_val]))
+        if phase_max_val < 0:
+            self.delta = np.abs(phase_max_val / (2 * np.pi * frequency))
         else:
-            self.delta = (1 / freq_axis[max_val]) - np.abs(signal_phase[max_val] / (2 * np.pi * freq_axis[max_val]))
+            self.delta = (1 / frequency) - np.abs(phase_max_val / (2 * np.pi * frequency))
 
-        # If there are enough values
-        if np.count_nonzero(input_raw_signal) >= 400:
+        # If there are enough values and triggers are sent
+        if np.count_nonzero(input_raw_signal) >= 400 and self.serial_interface is not None:
 
             ret_1, ret_2 = self.serial_interface.send_trigger(self.delta)
 
             if ret_1:
 
-                # Drop first value of array and add at end
-                self.delta_times = np.delete(self.delta_times, 0)
-                self.delta_times = np.append(self.delta_times, ret_2)
+                # Add duration to history, the oldest one is dropped
+                self.delta_times.append(ret_2)
 
         # Return HR and waiting time until next trigger
-        return (np.round(freq_axis[max_val] * 60)), abs(signal_fft[limits]), \
-            freq_axis[limits], max_val - limits[0], self.delta_times
+        return (np.round(frequency * 60)), spectrum_band, \
+            plan.freq_axis_band, int(np.round(max_val)) - limits[0], self.delta_times.get()
+
+    def get_trigger_statistics(self):
+        """Returns running statistics of estimate_trigger(): Mean and variance of the position of the spectral
+        maximum (index of frequency axis) over the values used for averaging, and number, mean and variance of the
+        durations of the last triggers (in seconds).
+        """
+
+        statistics = {'max_val_mean': 0.0, 'max_val_variance': 0.0}
+        if self.max_val_list is not None:
+            statistics['max_val_mean'] = self.max_val_list.get_mean()
+            statistics['max_val_variance'] = self.max_val_list.get_variance()
+
+        statistics['number_of_triggers'] = self.delta_times.get_size()
+        statistics['trigger_duration_mean'] = self.delta_times.get_mean()
+        statistics['trigger_duration_variance'] = self.delta_times.get_variance()
+
+        return statistics
+
+    def create_analysis_frame(self, input_raw_signal, estimated_fps):
+        """Returns an AnalysisFrame of the current signal. If it is passed to compute_heart_rate() and
+        estimate_trigger(), normalization and spectra are only computed once for both algorithms.
+        """
+        return AnalysisFrame(self, input_raw_signal, estimated_fps)
 
     def normalize(self, input_signal):
-        """Normalize the signal to lie between 0 and 1"""
+        """Normalize the signal to lie between 0 and 1.
+
+        A RingBuffer is normalized incrementally by a StreamingNormalizer. The result is computed once per appended value
+        and the same array is returned to all callers until the next value is appended.
+        """
+
+        if isinstance(input_signal, RingBuffer):
+            return self.normalizer.normalize(input_signal)
 
-        output_signal = input_signal
+        output_signal = np.asarray(input_signal)
 
         # Prohibit dividing by zero
         if np.max(np.abs(output_signal)) > 0:
@@ -263,29 +361,61 @@ class SignalProcessor:
 
         return output_signal
 
-    def __curve_fit(self, input_signal_1, input_signal_2):
-        """perform curve fitting and return slope value"""
+    def __curve_fit(self, input_signal_1, input_signal_2, weights=None):
+        """perform curve fitting and return slope value (reference implementation of SlidingSlopeEstimator)"""
 
-        # Todo: Add gaussian weights
-        m = np.polyfit(input_signal_1, input_signal_2, 1)
+        # np.polyfit() multiplies the residuals with w, therefore the square root of the weights is used
+        if weights is not None:
+            weights = np.sqrt(weights)
+
+        m = np.polyfit(input_signal_1, input_signal_2, 1, w=weights)
 
         return m
 
+    def get_spectral_plan(self, n, fps, zero_padding, hr_min, hr_max, zero_padding_setting=None, resolution=None):
+        """Returns the precomputed arrays for the spectral analysis.
+
+        The cache is emptied if the FPS or the zero padding setting (if given) have been changed by the user.
+        """
+
+        if zero_padding_setting is None and self.spectral_plan_settings is not None:
+            zero_padding_setting = self.spectral_plan_settings[1]
+
+        if (fps, zero_padding_setting) != self.spectral_plan_settings:
+            self.spectral_plan_cache.clear()
+            self.sliding_dft_banks.clear()
+            self.spectral_plan_settings = (fps, zero_padding_setting)
+
+        return self.spectral_plan_cache.get(n, fps, zero_padding, hr_min, hr_max, resolution)
+
+    def compute_band_spectrum(self, plan, input_raw_signal, signal):
+        """Returns the complex band spectrum of the normalized signal, computed by the selected backend.
+
+        input_raw_signal: Signal before normalization, the sliding DFT is only used if it is a RingBuffer
+        signal: Normalized signal
+        """
+
+        if self.spectrum_backend != 'sliding_dft' or not isinstance(input_raw_signal, RingBuffer):
+            return plan.band_spectrum(signal)
+
+        # Get sliding DFT of plan, banks of plans that are not used anymore are removed from time to time
+        try:
+            bank = self.sliding_dft_banks[plan]
+        except KeyError:
+            if len(self.sliding_dft_banks) >= self.spectral_plan_cache.max_size:
+                self.sliding_dft_banks.clear()
+            bank = self.sliding_dft_banks[plan] = SlidingDFTBank(plan)
+
+        # Normalization is applied to the spectrum with the extrema of the StreamingNormalizer
+        min_val, max_val = self.normalizer.get_extrema(input_raw_signal)
+
+        return bank.band_spectrum(input_raw_signal, min_val, max_val)
+
     def nextpow2(self, number):
         """Simple implementation of MATLAB nextpow2() """
-        curr_value = 2
-        while curr_value <= number:
-            curr_value *= 2
-        return curr_value
+        return spectrum.nextpow2(number)
 
     def compute_zero_padding_values(self, number):
         """During zero padding, we want to fill zeros before and after signal.
         This function computes the number of zeros"""
-
-        number_of_zeros_before_signal = np.floor(number / 2)
-        if np.fmod(number, 2) == 1:
-            number_of_zeros_after_signal = number_of_zeros_before_signal + 1
-        else:
-            number_of_zeros_after_signal = number_of_zeros_before_signal
-
-        return number_of_zeros_before_signal, number_of_zeros_after_signal
+        return spectrum.compute_zero_padding_values(number)
@@ -0,0 +1,265 @@
+#!/usr/bin/env python
+# -*- coding: ascii -*-
+"""spectrum.py - precomputed data for the spectral analysis of signals with fixed length"""
+
+import collections
+import math
+import numpy as np
+
+# Methods for the interpolation of spectral peaks, the index is stored in the algorithm parameter IDX_PEAK_INTERPOLATION
+PEAK_INTERPOLATION_METHODS = (None, 'parabolic', 'quadratic_log', 'jacobsen')
+
+# Backends for the band spectrum (see SignalProcessor.spectrum_backend), the index is stored in the algorithm parameter
+# IDX_SPECTRUM_BACKEND
+SPECTRUM_BACKENDS = ('fft', 'sliding_dft')
+
+# Correction factor of Jacobsen's estimator for the Hamming window, see:
+# Jacobsen E and Kootsookos P. Fast, accurate frequency estimators. IEEE Signal Processing Magazine 24(3), 2007.
+JACOBSEN_HAMMING_CORRECTION = 0.6
+
+
+def nextpow2(number):
+    """Simple implementation of MATLAB nextpow2() """
+    curr_value = 2
+    while curr_value <= number:
+        curr_value *= 2
+    return curr_value
+
+
+def compute_zero_padding_values(number):
+    """During zero padding, we want to fill zeros before and after signal.
+    This function computes the number of zeros"""
+
+    number_of_zeros_before_signal = np.floor(number / 2)
+    if np.fmod(number, 2) == 1:
+        number_of_zeros_after_signal = number_of_zeros_before_signal + 1
+    else:
+        number_of_zeros_after_signal = number_of_zeros_before_signal
+
+    return number_of_zeros_before_signal, number_of_zeros_after_signal
+
+
+def interpolate_peak(spectrum_band, index, method):
+    """Returns the offset (in bins, between -0.5 and 0.5) of the true maximum from the maximum at index.
+
+       spectrum_band: Complex spectrum of the Hamming-windowed signal
+       index: Index of the maximum of abs(spectrum_band)
+       method: One of PEAK_INTERPOLATION_METHODS. 'parabolic' and 'quadratic_log' fit a parabola to the magnitudes or
+               log magnitudes of the maximum and its neighbors. 'jacobsen' uses the complex values and assumes that the
+               neighbors are FFT bins, i.e. it is not suited for spectra with a given resolution.
+    """
+
+    # No interpolation or no neighbors
+    if method is None or index <= 0 or index >= np.size(spectrum_band) - 1:
+        return 0.0
+
+    # Python scalars are used, because numpy has a large overhead for three values
+    left, center, right = [complex(value) for value in spectrum_band[index - 1:index + 2]]
+
+    if method == 'jacobsen':
+        # Neighbors of a maximum of the windowed spectrum have opposite sign, therefore they are added
+        numerator = left - right
+        denominator = 2 * center + left + right
+
+    else:
+        left, center, right = abs(left), abs(center), abs(right)
+
+        if method == 'quadratic_log':
+            # Logarithm of zero is not defined
+            if min(left, center, right) <= 0:
+                return 0.0
+            left, center, right = math.log(left), math.log(center), math.log(right)
+
+        numerator = 0.5 * (left - right)
+        denominator = left - 2 * center + right
+
+    # E.g. a flat spectrum
+    if denominator == 0:
+        return 0.0
+
+    offset = (numerator / denominator).real * JACOBSEN_HAMMING_CORRECTION if method == 'jacobsen' \
+        else numerator / denominator
+
+    return min(max(offset, -0.5), 0.5)
+
+
+class SpectralPlan(object):
+    """All arrays of the spectral analysis that only depend on signal length, FPS, zero padding and frequency band:
+       Hamming window, frequency axis, indices of the frequencies within the band and the band-limited DFT matrix.
+
+       Only the frequencies within the band are used by the algorithms. Therefore, band_spectrum() computes either a
+       real FFT or evaluates the DFT at the band frequencies only, whichever is expected to be faster. If a resolution
+       (in Hz) is given, the band is sampled with this resolution instead of the frequencies of the (zero-padded) FFT.
+    """
+
+    # Band-limited DFT is used if (number of frequencies * signal length) < DFT_COST_FACTOR * n * log2(n).
+    # The factor was determined with utilities/benchmark_spectrum.py.
+    DFT_COST_FACTOR = 3.5
+
+    def __init__(self, n, fps, zero_padding, hr_min, hr_max, resolution=None, method=None):
+        """Compute arrays in the same way as SignalProcessor.compute_heart_rate() did for every frame
+
+           method: 'rfft', 'dft' or None (automatic choice)
+        """
+
+        # Store key
+        self.n_signal = n
+        self.fps = fps
+        self.zero_padding = bool(zero_padding)
+        self.hr_min = hr_min
+        self.hr_max = hr_max
+        self.resolution = resolution
+
+        # Zero padding: Number of zeros before and after signal
+        self.number_before = self.number_after = 0
+        if self.zero_padding and resolution is None:
+            next_n = nextpow2(nextpow2(n))
+            number_before, number_after = compute_zero_padding_values(next_n - n)
+            self.number_before, self.number_after = int(number_before), int(number_after)
+            n = next_n
+
+        # Length of FFT
+        self.n = n
+
+        # Hamming window and the part of it that is applied to the signal
+        self.window = np.hamming(n)
+        self.window_signal = self.window[self.number_before:self.number_before + self.n_signal]
+
+        # Positions of the samples in the zero-padded signal
+        self.sample_positions = np.arange(self.n_signal) + self.number_before
+
+        if resolution is None:
+
+            # Frequency axis
+            x = np.linspace(0, n / fps, n + 1)
+            self.freq_axis = np.fft.fftfreq(n, x[1] - x[0])
+
+            # Get boolean values if values are between hrMin and hrMax
+            limits_bool = (hr_min < self.freq_axis) & (hr_max > self.freq_axis)
+            limits_idx = np.linspace(0, n - 1, n)
+
+            # Get indices of frequencies between hrMin and hrMax
+            self.limits = limits_idx[limits_bool.nonzero()].astype(int)
+
+            # Frequency axis within band
+            self.freq_axis_band = self.freq_axis[self.limits]
+
+            # Exponents of the DFT: Bin k times sample position (including zeros before signal) divided by n.
+            # The product is reduced modulo n, which is exact for integers and keeps the exponents small.
+            exponents = np.mod(np.outer(self.limits, self.sample_positions), n) / float(n)
+
+            # First frequency of band in cycles per sample and distance between frequencies
+            self.band_start = self.limits[0] / float(n)
+            self.band_step = 1.0 / n
+
+        else:
+
+            # Frequency axis within band with given resolution, there is no FFT
+            self.freq_axis = self.limits = None
+            self.freq_axis_band = np.arange(hr_min + resolution, hr_max, resolution)
+            method = 'dft'
+
+            # Exponents of the DFT: Frequency and time of sample
+            exponents = np.outer(self.freq_axis_band, self.sample_positions) / float(fps)
+
+            # First frequency of band in cycles per sample and distance between frequencies
+            self.band_start = self.freq_axis_band[0] / float(fps)
+            self.band_step = resolution / float(fps)
+
+        # Choose method
+        if method is None:
+            cost_dft = np.size(self.freq_axis_band) * self.n_signal
+            cost_fft = self.DFT_COST_FACTOR * n * np.log2(n)
+            method = 'dft' if cost_dft < cost_fft else 'rfft'
+        self.method = method
+
+        # DFT matrix for the band, the window is already applied
+        self.band_matrix = None
+        if method == 'dft':
+            self.band_matrix = np.exp(-2j * np.pi * exponents) * self.window_signal
+
+    def pad(self, signal):
+        """Apply zero padding to signal (along the first axis) if it is enabled"""
+        if self.number_before or self.number_after:
+            shape = np.shape(signal)[1:]
+            return np.concatenate((np.zeros((self.number_before,) + shape), signal,
+                                   np.zeros((self.number_after,) + shape)), 0)
+        return signal
+
+    def band_spectrum(self, signal):
+        """Returns the complex spectrum of the windowed signal at the frequencies of freq_axis_band.
+           Magnitude and phase are equal to the band of the full complex FFT of the windowed, zero-padded signal.
+
+           If the signal is a 2-D array, every column is a signal and the columns of the result are their spectra,
+           computed with one FFT (or matrix product) for all signals.
+        """
+
+        if self.method == 'dft':
+            return self.band_matrix.dot(signal)
+
+        window = self.window if np.ndim(signal) == 1 else self.window[:, np.newaxis]
+        return np.fft.rfft(self.pad(signal) * window, axis=0)[self.limits]
+
+    def band_frequency(self, position):
+        """Returns the frequency (in Hz) at a fractional index of freq_axis_band"""
+
+        index = min(int(np.floor(position)), np.size(self.freq_axis_band) - 1)
+
+        if index == position:
+            return self.freq_axis_band[index]
+
+        # Distance between neighboring frequencies of the band
+        if np.size(self.freq_axis_band) > 1:
+            frequency_step = self.freq_axis_band[1] - self.freq_axis_band[0]
+        else:
+            frequency_step = 0
+
+        return self.freq_axis_band[index] + (position - index) * frequency_step
+
+    def spectrum_at(self, signal, position):
+        """Returns the complex spectrum of the windowed signal at a fractional index of freq_axis_band.
+           At integer indices, it is equal to band_spectrum(signal)[position].
+        """
+
+        frequency = self.band_start + position * self.band_step
+        return np.dot(self.window_signal * np.exp(-2j * np.pi * frequency * self.sample_positions), signal)
+
+
+class SpectralPlanCache(object):
+    """A cache of SpectralPlan objects with bounded size. The least recently used plan is removed if it is full."""
+
+    def __init__(self, max_size=8):
+        """Create empty cache"""
+        self.max_size = max_size
+        self.plans = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, n, fps, zero_padding, hr_min, hr_max, resolution=None, method=None):
+        """Return plan for given parameters, it is computed only if it is not in the cache"""
+
+        key = (n, fps, bool(zero_padding), hr_min, hr_max, resolution, method)
+
+        try:
+            plan = self.plans.pop(key)
+            self.hits += 1
+        except KeyError:
+            plan = SpectralPlan(n, fps, zero_padding, hr_min, hr_max, resolution, method)
+            self.misses += 1
+
+            # Remove least recently used plan
+            if len(self.plans) >= self.max_size:
+                self.plans.popitem(last=False)
+
+        # Insert as most recently used plan
+        self.plans[key] = plan
+
+        return plan
+
+    def clear(self):
+        """Remove all plans, e.g. because settings have been changed"""
+        self.plans.clear()
+
+    def get_statistics(self):
+        """Returns number of cache hits, cache misses and stored plans"""
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self.plans)}
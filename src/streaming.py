@@ -0,0 +1,345 @@
+#!/usr/bin/env python
+# -*- coding: ascii -*-
+"""streaming.py - incremental estimators for signals that grow by one sample per frame"""
+
+import collections
+import numpy as np
+
+from ring_buffer import RingBuffer
+
+
+class SlidingSlopeEstimator(object):
+    """Slope of a linear regression over the last ''window_size'' samples, updated in constant time per sample.
+
+       The samples are fitted against x = linspace(0, 1, window_size), i.e. the same x axis as used by
+       SignalProcessor.filter_waveform(). Without weights, the running sums of y and k*y (k = index in window) are
+       updated when a sample enters and leaves the window. With Gaussian weights, the slope is a fixed linear
+       combination of the window, whose coefficients are computed once in the constructor.
+    """
+
+    def __init__(self, window_size, sigma=None, resync_interval=1000):
+        """Prepare sums or weight tables
+
+           window_size: Number of samples used for the fit
+           sigma: Standard deviation (in samples) of Gaussian weights centered on the newest sample, None disables them
+           resync_interval: Number of updates after which the running sums are recomputed to bound numerical drift
+        """
+
+        if window_size < 1:
+            raise ValueError("Window of slope estimator has to contain at least one value")
+
+        # Store parameters
+        self.window_size = int(window_size)
+        self.sigma = sigma
+        self.resync_interval = int(resync_interval)
+
+        # Window of the last samples, needed for the values leaving the window
+        self.window = RingBuffer(self.window_size)
+
+        # Constants of the unweighted least squares solution for k = 0..window_size-1
+        p = self.window_size
+        self.sum_k = p * (p - 1) / 2.0
+        self.denominator = p * (p - 1) * (2 * p - 1) / 6.0 * p - self.sum_k ** 2
+
+        # Weight table: slope = dot(coefficients, window)
+        self.coefficients = None
+        if sigma is not None and p > 1:
+            self.coefficients = self.compute_weighted_coefficients(p, sigma)
+
+        # Running sums
+        self.sum_y = 0.0
+        self.sum_ky = 0.0
+        self.updates_since_resync = 0
+
+    @staticmethod
+    def compute_weighted_coefficients(window_size, sigma):
+        """Compute the coefficients c so that dot(c, y) is the weighted least squares slope of y"""
+
+        x = np.linspace(0, 1, window_size)
+        w = np.exp(-0.5 * ((np.arange(window_size) - (window_size - 1)) / float(sigma)) ** 2)
+
+        # Weighted mean of x and weighted variance
+        x_mean = np.sum(w * x) / np.sum(w)
+        x_var = np.sum(w * (x - x_mean) ** 2)
+
+        return w * (x - x_mean) / x_var
+
+    def push(self, value):
+        """Add a sample, remove the oldest one, and return the new slope"""
+
+        # Value that leaves the window
+        value_old = self.window.get()[0]
+        self.window.append(value)
+
+        # Update sums, see class description
+        # (all remaining values move one index down, the new value gets index window_size - 1)
+        self.sum_ky += (self.window_size - 1) * value - (self.sum_y - value_old)
+        self.sum_y += value - value_old
+
+        # Recompute sums from time to time
+        self.updates_since_resync += 1
+        if self.updates_since_resync >= self.resync_interval:
+            self.resync()
+
+        return self.get_slope()
+
+    def fill(self, values):
+        """Replace the window by the last ''window_size'' values and return the slope"""
+        for value in np.asarray(values)[-self.window_size:]:
+            self.window.append(value)
+        self.resync()
+        return self.get_slope()
+
+    def resync(self):
+        """Recompute the running sums from the window"""
+        window = self.window.get()
+        self.sum_y = float(np.sum(window))
+        self.sum_ky = float(np.dot(np.arange(self.window_size), window))
+        self.updates_since_resync = 0
+
+    def get_slope(self):
+        """Return slope of the current window"""
+
+        p = self.window_size
+
+        # One value does not define a slope
+        if p == 1:
+            return 0.0
+
+        if self.coefficients is not None:
+            return float(np.dot(self.coefficients, self.window.get()))
+
+        # Slope with respect to k, scaled to x = linspace(0, 1, p)
+        return (p * self.sum_ky - self.sum_k * self.sum_y) / self.denominator * (p - 1)
+
+
+class SlidingExtrema(object):
+    """Minimum and maximum of the last ''window_size'' samples with amortized constant effort per sample.
+
+       Two monotonic deques store the candidates for the minimum and the maximum together with their sample index.
+       Every sample is added and removed at most once from each deque.
+    """
+
+    def __init__(self, window_size):
+        """Create empty deques"""
+
+        if window_size < 1:
+            raise ValueError("Window of sliding extrema has to contain at least one value")
+
+        self.window_size = int(window_size)
+        self.clear()
+
+    def clear(self):
+        """Remove all samples"""
+        self.deque_min = collections.deque()
+        self.deque_max = collections.deque()
+        self.count = 0
+
+    def push(self, value):
+        """Add a sample, the oldest sample leaves the window"""
+
+        # Remove candidates that can not be the minimum or maximum anymore
+        while self.deque_min and self.deque_min[-1][1] >= value:
+            self.deque_min.pop()
+        while self.deque_max and self.deque_max[-1][1] <= value:
+            self.deque_max.pop()
+
+        self.deque_min.append((self.count, value))
+        self.deque_max.append((self.count, value))
+
+        # Remove samples that left the window
+        oldest_index = self.count - self.window_size
+        if self.deque_min[0][0] <= oldest_index:
+            self.deque_min.popleft()
+        if self.deque_max[0][0] <= oldest_index:
+            self.deque_max.popleft()
+
+        self.count += 1
+
+    def get_min(self):
+        """Return minimum of window"""
+        return self.deque_min[0][1]
+
+    def get_max(self):
+        """Return maximum of window"""
+        return self.deque_max[0][1]
+
+
+class StreamingNormalizer(object):
+    """MinMax normalization of a RingBuffer that only processes the values appended since the last call.
+
+       The result is computed once per new sample and then returned to every caller, so the algorithms and the display
+       share the same normalized signal. It is identical to SignalProcessor.normalize() of the buffer content.
+    """
+
+    def __init__(self):
+        """Initialize variables"""
+        self.ring_buffer = self.extrema = self.count = self.normalized = None
+
+    def update(self, ring_buffer):
+        """Update extrema of the absolute values with the values appended to the buffer since the last call"""
+
+        # Values that were appended since the last call
+        if ring_buffer is self.ring_buffer:
+            number_of_new_values = ring_buffer.count - self.count
+        else:
+            number_of_new_values = -1
+
+        if number_of_new_values == 0:
+            return
+
+        # Add new values or start again with the whole window
+        if 0 < number_of_new_values <= ring_buffer.capacity:
+            new_values = ring_buffer.latest(number_of_new_values)
+        else:
+            self.ring_buffer = ring_buffer
+            self.extrema = SlidingExtrema(ring_buffer.capacity)
+            new_values = ring_buffer.get()
+
+        for value in np.abs(new_values):
+            self.extrema.push(value)
+
+        self.count = ring_buffer.count
+        self.normalized = None
+
+    def get_extrema(self, ring_buffer):
+        """Return minimum and maximum of the absolute values in the buffer"""
+        self.update(ring_buffer)
+        return self.extrema.get_min(), self.extrema.get_max()
+
+    def normalize(self, ring_buffer):
+        """Return the normalized content of the buffer as a new array, which is reused until a value is appended"""
+
+        self.update(ring_buffer)
+
+        if self.normalized is None:
+            min_val, max_val = self.extrema.get_min(), self.extrema.get_max()
+
+            # Prohibit dividing by zero
+            if max_val > 0:
+                self.normalized = (ring_buffer.get() - min_val) / (max_val - min_val)
+            else:
+                self.normalized = np.copy(ring_buffer.get())
+
+        return self.normalized
+
+
+class SlidingDFTBank(object):
+    """Band spectrum of a SpectralPlan that is updated with O(K) effort per sample (K: number of frequencies in band).
+
+       For every frequency w, the sum S(w) = sum_m x[m] exp(-i w m) over the window x is updated by the sliding DFT
+       recursion S'(w) = exp(i w) (S(w) - x_old) + x_new exp(-i w (n - 1)), which is valid for arbitrary frequencies.
+       The Hamming window 0.54 - 0.46 cos(theta p) is a sum of three complex exponentials. Therefore, the windowed
+       spectrum is a linear combination of S(w - theta), S(w) and S(w + theta). MinMax normalization is an affine map
+       and is applied to the spectrum as well. The result equals plan.band_spectrum() of the normalized window.
+
+       Rounding errors of the recursion are removed by recomputing the sums from the window every ''resync_interval''
+       samples.
+    """
+
+    def __init__(self, plan, resync_interval=None):
+        """Precompute factors of recursion, window and normalization
+
+           plan: SpectralPlan that defines signal length, window and frequencies
+           resync_interval: Number of samples after which the sums are recomputed (standard value: signal length)
+        """
+
+        # Store plan
+        self.plan = plan
+        self.n = plan.n_signal
+        self.resync_interval = resync_interval if resync_interval is not None else self.n
+
+        # Frequencies (in rad per sample) and period of the Hamming window
+        if plan.resolution is None:
+            omega = 2 * np.pi * plan.limits / float(plan.n)
+        else:
+            omega = 2 * np.pi * plan.freq_axis_band / float(plan.fps)
+        theta = 2 * np.pi / (plan.n - 1)
+        self.number_of_frequencies = np.size(omega)
+        omegas = np.concatenate((omega - theta, omega, omega + theta))
+
+        # Factors of recursion
+        self.rotation = np.exp(1j * omegas)
+        self.factor_new_value = np.exp(-1j * omegas * (self.n - 1))
+
+        # Matrix for recomputation of the sums
+        self.resync_matrix = np.exp(-1j * np.outer(omegas, np.arange(self.n)))
+
+        # Coefficients of the window, including the shift by the zeros before the signal
+        shift = np.exp(-1j * omegas * plan.number_before)
+        self.coefficients = np.concatenate((np.repeat(-0.23, self.number_of_frequencies),
+                                            np.repeat(0.54, self.number_of_frequencies),
+                                            np.repeat(-0.23, self.number_of_frequencies))) * shift
+
+        # Spectrum of a signal containing ones only, needed for normalization
+        self.spectrum_of_ones = plan.band_spectrum(np.ones(self.n))
+
+        # Copy of the window, needed for the values leaving it
+        self.window = RingBuffer(self.n)
+
+        # Sums, samples since last recomputation and number of samples of RingBuffer seen so far
+        self.sums = np.zeros(3 * self.number_of_frequencies, dtype=complex)
+        self.updates_since_resync = 0
+        self.ring_buffer = self.count = None
+
+    def push(self, value):
+        """Add a sample to the window, the oldest one leaves it"""
+
+        value_old = self.window.get()[0]
+        self.window.append(value)
+
+        self.sums = self.rotation * (self.sums - value_old) + value * self.factor_new_value
+
+        # Recompute sums from time to time
+        self.updates_since_resync += 1
+        if self.updates_since_resync >= self.resync_interval:
+            self.resync()
+
+    def fill(self, values):
+        """Replace the window by the last n values"""
+        for value in np.asarray(values)[-self.n:]:
+            self.window.append(value)
+        self.resync()
+
+    def resync(self):
+        """Recompute the sums from the window"""
+        self.sums = self.resync_matrix.dot(self.window.get())
+        self.updates_since_resync = 0
+
+    def update(self, ring_buffer):
+        """Add the values appended to the RingBuffer since the last call"""
+
+        if ring_buffer is self.ring_buffer:
+            number_of_new_values = ring_buffer.count - self.count
+        else:
+            number_of_new_values = -1
+
+        if 0 <= number_of_new_values <= self.n:
+            for value in ring_buffer.latest(number_of_new_values) if number_of_new_values else []:
+                self.push(value)
+        else:
+            self.ring_buffer = ring_buffer
+            self.fill(ring_buffer.get())
+
+        self.count = ring_buffer.count
+
+    def band_spectrum(self, ring_buffer=None, min_val=0, max_val=0):
+        """Returns the complex band spectrum of the windowed, normalized signal
+
+           ring_buffer: If given, the values appended since the last call are added first
+           min_val, max_val: Minimum and maximum of the absolute values of the window, see SignalProcessor.normalize()
+        """
+
+        if ring_buffer is not None:
+            self.update(ring_buffer)
+
+        # Combine the three sums of every frequency to the windowed spectrum
+        weighted_sums = self.coefficients * self.sums
+        k = self.number_of_frequencies
+        spectrum = weighted_sums[:k] + weighted_sums[k:2 * k] + weighted_sums[2 * k:]
+
+        # Prohibit dividing by zero
+        if max_val > 0:
+            spectrum = (spectrum - min_val * self.spectrum_of_ones) / (max_val - min_val)
+
+        return spectrum
@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# -*- coding: ascii -*-
+"""test_analysis_frame.py - tests for src/analysis_frame.py"""
+
+import nose
+import numpy as np
+import settings
+
+from defines import *
+from signal_processing import SignalProcessor
+from ring_buffer import RingBuffer
+from nose.tools import assert_equal, assert_true
+
+
+class Test(object):
+
+    def setUp(self):
+        """Create instances"""
+        self.signal_processor = SignalProcessor()
+        self.ring_buffer = RingBuffer(400)
+        for value in np.cos(2 * np.pi * 1.2 * np.arange(450) / 25.0) + np.random.rand(450):
+            self.ring_buffer.append(value)
+
+    def tearDown(self):
+        """Clear instance"""
+        self.signal_processor.clear()
+
+    def test_results_are_cached(self):
+        """Intermediate results are only computed once"""
+
+        frame = self.signal_processor.create_analysis_frame(self.ring_buffer, 25.0)
+        plan = self.signal_processor.get_spectral_plan(400, 25.0, False, 0.5, 3)
+
+        assert_true(frame.get_normalized_signal() is frame.get_normalized_signal())
+        assert_true(frame.get_band_spectrum(plan) is frame.get_band_spectrum(plan))
+        assert_true(frame.get_magnitude(plan) is frame.get_magnitude(plan))
+        assert_true(frame.get_phase(plan) is frame.get_phase(plan))
+        assert_equal(frame.get_size(), 400)
+
+    def test_results_are_equal_to_direct_computation(self):
+        """The results are equal to normalization and spectrum of the signal"""
+
+        frame = self.signal_processor.create_analysis_frame(self.ring_buffer, 25.0)
+        plan = self.signal_processor.get_spectral_plan(400, 25.0, False, 0.5, 3)
+        band_spectrum = plan.band_spectrum(self.signal_processor.normalize(self.ring_buffer.get()))
+
+        assert_true(np.allclose(frame.get_normalized_signal(), self.signal_processor.normalize(self.ring_buffer.get())))
+        assert_true(np.allclose(frame.get_band_spectrum(plan), band_spectrum))
+        assert_true(np.allclose(frame.get_phase(plan), np.angle(band_spectrum)))
+
+    def test_shared_frame(self):
+        """HR estimation and trigger estimation share one spectrum if zero padding is disabled"""
+
+        _, curr_parameters = settings.get_parameters()
+        settings.change_parameters(IDX_ZERO_PADDING, 0)
+
+        try:
+            # Count computations of spectra
+            computations = []
+            compute_band_spectrum = self.signal_processor.compute_band_spectrum
+
+            def counting_compute_band_spectrum(*args):
+                computations.append(args[0])
+                return compute_band_spectrum(*args)
+
+            self.signal_processor.compute_band_spectrum = counting_compute_band_spectrum
+
+            frame = self.signal_processor.create_analysis_frame(self.ring_buffer, 25.0)
+            ret_hr = self.signal_processor.compute_heart_rate(self.ring_buffer, 25.0, frame)
+            ret_trigger = self.signal_processor.estimate_trigger(self.ring_buffer, 25.0, 50, frame)
+
+        finally:
+            settings.change_parameters(IDX_ZERO_PADDING, curr_parameters[IDX_ZERO_PADDING])
+
+        assert_equal(len(computations), 1)
+        assert_equal(ret_hr[0], ret_trigger[0])
+        assert_true(ret_hr[1] is ret_trigger[1])
+
+
+if __name__ == '__main__':
+    nose.main()
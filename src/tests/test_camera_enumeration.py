@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: ascii -*-
+"""test_camera_enumeration.py - tests for src/camera_enumeration.py"""
+
+import nose
+import json
+import os
+import shutil
+import tempfile
+import time
+import camera_enumeration
+
+from camera_enumeration import CameraEnumerator
+from nose.tools import assert_equal, assert_true, assert_false
+
+
+class Test(object):
+
+    def setUp(self):
+        """Create temporary folder and replace probing of cameras by a slow fake that finds two cameras"""
+
+        self.directory = tempfile.mkdtemp()
+        self.cache_file = os.path.join(self.directory, 'cameras.json')
+
+        self.probed_indices = []
+        self.probe_camera = camera_enumeration.probe_camera
+
+        def slow_probe_camera(index):
+            self.probed_indices.append(index)
+            time.sleep(0.3)
+            return index < 2
+
+        camera_enumeration.probe_camera = slow_probe_camera
+
+    def tearDown(self):
+        """Restore probing and remove temporary folder"""
+        camera_enumeration.probe_camera = self.probe_camera
+        shutil.rmtree(self.directory)
+
+    def test_without_cache(self):
+        """Cameras are probed in the background and stored in the cache"""
+
+        start_time = time.time()
+        camera_enumerator = CameraEnumerator(self.cache_file, 3)
+        camera_enumerator.start()
+
+        # Caller is not blocked
+        assert_true(time.time() - start_time < 0.2)
+        assert_false(camera_enumerator.is_finished())
+        assert_equal(camera_enumerator.get_cameras(), [])
+
+        assert_true(camera_enumerator.wait(5))
+        assert_equal(camera_enumerator.get_cameras(), [0, 1])
+        assert_equal(self.probed_indices, [0, 1, 2])
+        assert_true(camera_enumerator.duration > 0)
+
+        with open(self.cache_file) as f:
+            assert_equal(json.load(f)['cameras'], [0, 1])
+
+    def test_recent_cache(self):
+        """A recent cache is used without probing"""
+
+        with open(self.cache_file, 'w') as f:
+            json.dump({'cameras': [0], 'time': time.time(), 'number_of_indices': 2}, f)
+
+        camera_enumerator = CameraEnumerator(self.cache_file, 2)
+        camera_enumerator.start()
+
+        assert_true(camera_enumerator.is_finished())
+        assert_equal(camera_enumerator.get_cameras(), [0])
+        assert_equal(self.probed_indices, [])
+
+    def test_old_cache(self):
+        """An old cache is used until probing has finished"""
+
+        with open(self.cache_file, 'w') as f:
+            json.dump({'cameras': [0], 'time': time.time() - 10, 'number_of_indices': 2}, f)
+
+        camera_enumerator = CameraEnumerator(self.cache_file, 2, max_age=5)
+        camera_enumerator.start()
+
+        assert_equal(camera_enumerator.get_cameras(), [0])
+        assert_true(camera_enumerator.wait(5))
+        assert_equal(camera_enumerator.get_cameras(), [0, 1])
+
+    def test_invalid_cache(self):
+        """Invalid caches are ignored and can be removed"""
+
+        with open(self.cache_file, 'w') as f:
+            f.write('no json')
+
+        camera_enumerator = CameraEnumerator(self.cache_file, 2)
+        camera_enumerator.start()
+        assert_true(camera_enumerator.wait(5))
+        assert_equal(camera_enumerator.get_cameras(), [0, 1])
+
+        camera_enumerator.invalidate()
+        assert_false(os.path.isfile(self.cache_file))
+
+
+if __name__ == '__main__':
+    nose.main()
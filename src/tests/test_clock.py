@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: ascii -*-
+"""test_clock.py - tests for src/clock.py"""
+
+import nose
+import time
+import clock
+
+from nose.tools import assert_equal, assert_true, assert_false, assert_almost_equal
+
+
+class Test(object):
+
+    def tearDown(self):
+        """Restore default clock"""
+        clock.use_real_time_clock()
+
+    def test_monotonic(self):
+        """Monotonic clock advances with real time"""
+
+        start_time = clock.monotonic()
+        time.sleep(0.1)
+        assert_almost_equal(clock.monotonic() - start_time, 0.1, delta=0.05)
+
+    def test_monotonic_clock_of_platforms(self):
+        """Every platform gets a high-resolution clock, platforms without monotonic clock fall back to time.time()"""
+
+        assert_equal(clock.load_monotonic_clock('win32'), time.clock)
+        assert_equal(clock.load_monotonic_clock('sunos5'), time.time)
+
+        # clock_gettime() with the identifier of Linux
+        linux_clock = clock.load_monotonic_clock('linux2')
+        assert_true(linux_clock is not time.time)
+        start_time = linux_clock()
+        time.sleep(0.1)
+        assert_almost_equal(linux_clock() - start_time, 0.1, delta=0.05)
+
+    def test_real_time_clock(self):
+        """Real time clock is used by default"""
+
+        assert_false(clock.is_virtual())
+
+        start_time = clock.now()
+        clock.sleep(0.1)
+        clock.advance(10)
+        assert_almost_equal(clock.now() - start_time, 0.1, delta=0.05)
+
+    def test_virtual_clock(self):
+        """Virtual clock only advances when it is told to, waiting returns immediately"""
+
+        clock.use_virtual_clock(5)
+        assert_true(clock.is_virtual())
+
+        start_time = time.time()
+        clock.sleep(10)
+        assert_true(time.time() - start_time < 1)
+        assert_equal(clock.now(), 5)
+
+        for num in range(0, 25):
+            clock.advance(0.04)
+        assert_almost_equal(clock.now(), 6)
+
+        clock.use_real_time_clock()
+        assert_false(clock.is_virtual())
+
+
+if __name__ == '__main__':
+    nose.main()
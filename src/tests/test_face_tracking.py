@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: ascii -*-
+"""test_face_tracking.py - tests for src/face_tracking.py"""
+
+import os
+import cv2
+import nose
+import numpy as np
+
+from face_tracking import FaceTracker
+from nose.tools import assert_equal, assert_true, assert_raises, assert_almost_equal
+
+
+class FakeCascade(object):
+    """Finds the face at a given position (in the frame passed to the cascade) and counts the calls"""
+
+    def __init__(self):
+        self.face = None
+        self.calls = []
+
+    def detectMultiScale(self, frame, **kwargs):
+        self.calls.append((frame.shape, kwargs['minSize']))
+        if self.face is None:
+            return ()
+        return np.array([self.face])
+
+
+def create_frame(x, y, face, random_state):
+    """Frame of 640x480 pixels with a textured background and the face at (x, y)"""
+    frame = random_state.randint(0, 256, (480, 640)).astype(np.uint8)
+    frame = cv2.GaussianBlur(frame, (5, 5), 0)
+    frame[y:y + np.size(face, 0), x:x + np.size(face, 1)] = face
+    return np.dstack((frame, frame, frame))
+
+
+class Test(object):
+
+    def setUp(self):
+        """Create instances"""
+        self.cascade = FakeCascade()
+        self.face_tracker = FaceTracker(self.cascade, detection_interval=5, detection_width=320)
+        self.random_state = np.random.RandomState(0)
+        self.face = cv2.GaussianBlur(self.random_state.randint(0, 256, (80, 80)).astype(np.uint8), (5, 5), 0)
+
+    def test_detection_on_downscaled_frame(self):
+        self.cascade.face = (100, 50, 40, 40)
+        faces = self.face_tracker.update(create_frame(200, 100, self.face, self.random_state))
+
+        # Cascade gets half of the frame, the box is returned in coordinates of the original frame
+        assert_equal(self.cascade.calls, [((240, 320), (15, 15))])
+        assert_equal(faces, [(200, 100, 80, 80)])
+
+    def test_tracking_between_detections(self):
+        """The cascade only runs every few frames, the face is followed in between"""
+
+        self.cascade.face = (100, 50, 40, 40)
+        self.face_tracker.update(create_frame(200, 100, self.face, self.random_state))
+
+        for n in range(1, 5):
+            faces = self.face_tracker.update(create_frame(200 + 4 * n, 100 + 2 * n, self.face, self.random_state))
+            assert_equal(faces, [(200 + 4 * n, 100 + 2 * n, 80, 80)])
+            assert_true(self.face_tracker.get_confidences()[0] > 0.9)
+
+        assert_equal(len(self.cascade.calls), 1)
+
+        # Next detection after the interval
+        self.face_tracker.update(create_frame(216, 108, self.face, self.random_state))
+        assert_equal(len(self.cascade.calls), 2)
+        assert_equal(self.face_tracker.get_statistics(), {'frames': 6, 'detections': 2, 'lost_faces': 0})
+
+    def test_redetection_when_face_is_lost(self):
+        self.cascade.face = (100, 50, 40, 40)
+        self.face_tracker.update(create_frame(200, 100, self.face, self.random_state))
+
+        # Face disappears: Tracking fails and the cascade runs again, it finds nothing
+        self.cascade.face = None
+        faces = self.face_tracker.update(create_frame(0, 0, self.face[:0, :0], self.random_state))
+
+        assert_equal(faces, [])
+        assert_equal(len(self.cascade.calls), 2)
+        assert_equal(self.face_tracker.get_statistics()['lost_faces'], 1)
+
+    def test_face_at_border(self):
+        """A face that leaves the frame is detected again"""
+        self.cascade.face = (0, 0, 40, 40)
+        self.face_tracker.update(create_frame(0, 0, self.face, self.random_state))
+        self.face_tracker.update(create_frame(0, 0, self.face, self.random_state))
+        assert_equal(len(self.cascade.calls), 1)
+
+        self.cascade.face = (280, 200, 40, 40)
+        self.face_tracker.update(create_frame(560, 400, self.face, self.random_state))
+        assert_equal(len(self.cascade.calls), 2)
+
+    def test_clear(self):
+        self.face_tracker.update(create_frame(200, 100, self.face, self.random_state))
+        self.face_tracker.clear()
+        self.face_tracker.update(create_frame(200, 100, self.face, self.random_state))
+        assert_equal(len(self.cascade.calls), 2)
+
+    def test_detection_in_every_frame(self):
+        face_tracker = FaceTracker(self.cascade, detection_interval=1)
+        for n in range(0, 3):
+            face_tracker.update(create_frame(200, 100, self.face, self.random_state))
+        assert_equal(len(self.cascade.calls), 3)
+
+    def test_invalid_interval(self):
+        assert_raises(ValueError, FaceTracker, self.cascade, 0)
+
+    def test_cascade_of_repository(self):
+        """The cascade of the repository can be used, a frame without a face has no faces"""
+
+        cascade = cv2.CascadeClassifier(os.path.join(os.path.dirname(os.path.realpath(__file__)), os.pardir, 'data',
+                                                     'haarcascade_frontalface_default.xml'))
+        face_tracker = FaceTracker(cascade)
+        assert_equal(face_tracker.update(np.zeros((480, 640, 3), dtype=np.uint8)), [])
+        assert_almost_equal(face_tracker.scale, 0.5)
+
+
+if __name__ == '__main__':
+    nose.main()
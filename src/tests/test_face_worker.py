@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# -*- coding: ascii -*-
+"""test_face_worker.py - tests for src/face_worker.py"""
+
+import nose
+import time
+import numpy as np
+
+from face_worker import FaceDetectionWorker, SLOT_HEADROOM
+from nose.tools import assert_equal, assert_true, assert_false, assert_raises
+
+
+def wait_for_result(worker, sequence_number, timeout=10):
+    """Returns the faces of the frame with the sequence number, None if the worker did not publish them in time"""
+    end_time = time.time() + timeout
+    while time.time() < end_time:
+        faces, result_sequence_number = worker.get_faces()
+        if result_sequence_number == sequence_number:
+            return faces
+        time.sleep(0.01)
+    return None
+
+
+class Test(object):
+
+    def setUp(self):
+        """Create instance"""
+        self.worker = FaceDetectionWorker(detection_interval=5)
+
+    def tearDown(self):
+        """Stop worker process"""
+        self.worker.stop()
+
+    def test_worker_is_started_by_first_frame(self):
+        assert_false(self.worker.is_running())
+        assert_equal(self.worker.get_faces(), ([], None))
+
+        self.worker.submit(np.zeros((48, 64, 3), dtype=np.uint8), 7)
+        assert_true(self.worker.is_running())
+        assert_equal(self.worker.slotSize, 48 * 64)
+
+        # Boxes are published with the sequence number of their frame
+        assert_equal(wait_for_result(self.worker, 7), [])
+
+    def test_submit_does_not_wait(self):
+        """Frames are submitted faster than they are processed: the worker skips frames, but gets the newest one"""
+
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        self.worker.submit(frame, 0)
+        wait_for_result(self.worker, 0)
+
+        for sequence_number in range(1, 101):
+            self.worker.submit(frame, sequence_number)
+
+        assert_equal(wait_for_result(self.worker, 100), [])
+        statistics = self.worker.get_statistics()
+        assert_equal(statistics['submitted_frames'], 101)
+        assert_true(statistics['results'] < 101)
+
+    def test_frame_in_shared_memory(self):
+        """The grayscale frame is written into the slot, smaller frames do not restart the worker"""
+
+        self.worker.submit(np.full((48, 64), 100, dtype=np.uint8), 0)
+        process = self.worker.process
+        self.worker.submit(np.full((20, 30, 3), 50, dtype=np.uint8), 1)
+
+        assert_true(self.worker.process is process)
+        slot = self.worker.newestSlot.value
+        assert_true(np.all(self.worker.frameArray[slot, :600] == 50))
+        assert_equal(list(self.worker.slotShapes[2 * slot:2 * slot + 2]), [20, 30])
+        assert_equal(wait_for_result(self.worker, 1), [])
+
+    def test_larger_frame_restarts_worker(self):
+        self.worker.submit(np.zeros((20, 30, 3), dtype=np.uint8), 0)
+        process = self.worker.process
+        self.worker.submit(np.zeros((48, 64, 3), dtype=np.uint8), 1)
+
+        assert_false(self.worker.process is process)
+        assert_false(process.is_alive())
+        assert_equal(self.worker.slotSize, int(48 * 64 * SLOT_HEADROOM))
+        assert_equal(wait_for_result(self.worker, 1), [])
+
+    def test_slot_size_of_full_frame(self):
+        """Slots sized for the full frame: frames cropped to different ROIs do not restart the worker"""
+
+        self.worker.set_slot_size(48 * 64)
+        self.worker.submit(np.zeros((20, 30, 3), dtype=np.uint8), 0)
+        process = self.worker.process
+        assert_equal(self.worker.slotSize, 48 * 64)
+
+        self.worker.submit(np.zeros((40, 50, 3), dtype=np.uint8), 1)
+        self.worker.submit(np.zeros((48, 64, 3), dtype=np.uint8), 2)
+
+        assert_true(self.worker.process is process)
+        assert_equal(wait_for_result(self.worker, 2), [])
+
+    def test_stop(self):
+        self.worker.submit(np.zeros((48, 64, 3), dtype=np.uint8), 0)
+        process = self.worker.process
+        self.worker.stop()
+
+        assert_false(process.is_alive())
+        assert_false(self.worker.is_running())
+        assert_equal(self.worker.get_faces(), ([], None))
+
+    def test_invalid_number_of_slots(self):
+        assert_raises(ValueError, FaceDetectionWorker, 1)
+
+
+if __name__ == '__main__':
+    nose.main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+# -*- coding: ascii -*-
+"""test_frame_archive.py - tests for src/frame_archive.py"""
+
+import nose
+import cv2
+import numpy as np
+import os
+import shutil
+import tempfile
+
+from frame_archive import FrameArchive, FrameArchiveWriter, convert_image_folder, convert_recording, \
+    sort_numbered_files
+from nose.tools import assert_equal, assert_true, assert_false, assert_raises, assert_almost_equal
+
+
+class Test(object):
+
+    def setUp(self):
+        """Create temporary folder"""
+        self.directory = tempfile.mkdtemp()
+        self.file_name = os.path.join(self.directory, 'frames.vbcg')
+        self.frames = [np.random.randint(0, 256, (48, 64, 3)).astype(np.uint8) for num in range(0, 5)]
+
+    def tearDown(self):
+        """Remove temporary folder"""
+        shutil.rmtree(self.directory)
+
+    def test_write_and_read(self):
+        """Frames and timestamps are restored, frames are read-only views of the file"""
+
+        writer = FrameArchiveWriter(self.file_name, 25)
+        for num, frame in enumerate(self.frames):
+            writer.append(frame, num * 33.5 if num > 0 else None)
+        writer.close()
+
+        archive = FrameArchive(self.file_name)
+
+        assert_equal(len(archive), 5)
+        assert_equal(archive.shape, (48, 64, 3))
+        assert_almost_equal(archive.fps, 25)
+
+        for num, frame in enumerate(self.frames):
+            assert_true(np.array_equal(archive[num], frame))
+            assert_almost_equal(archive.get_timestamp(num), num * 33.5)
+
+        assert_true(isinstance(archive[2], np.memmap))
+        assert_false(archive[2].flags.writeable)
+
+        archive.close()
+
+    def test_default_timestamps_and_gray_frames(self):
+        """Without timestamps, they are computed from the FPS. Frames with one channel are returned as 2D arrays"""
+
+        writer = FrameArchiveWriter(self.file_name, 20)
+        for frame in self.frames:
+            writer.append(frame[:, :, 0])
+        writer.close()
+
+        archive = FrameArchive(self.file_name)
+
+        assert_equal(archive[3].shape, (48, 64))
+        assert_true(np.array_equal(archive[3], self.frames[3][:, :, 0]))
+        assert_almost_equal(archive.get_timestamp(3), 150.0)
+
+        archive.close()
+
+    def test_errors(self):
+        """Frames must have equal dimensions and other files are not accepted"""
+
+        writer = FrameArchiveWriter(self.file_name, 25)
+        writer.append(self.frames[0])
+        assert_raises(ValueError, writer.append, self.frames[0][:10])
+        writer.close()
+
+        other_file = os.path.join(self.directory, 'other.vbcg')
+        with open(other_file, 'wb') as f:
+            f.write('not an archive' * 10)
+
+        assert_raises(IOError, FrameArchive, other_file)
+
+    def test_empty_archive(self):
+        """An archive without frames can be read"""
+
+        FrameArchiveWriter(self.file_name, 25).close()
+        assert_equal(len(FrameArchive(self.file_name)), 0)
+
+    def test_sort_numbered_files(self):
+        """Files are sorted by their number"""
+        assert_equal(sort_numbered_files(["frame10.jpg", "frame2.jpg", "log.txt", "frame9.jpg"]),
+                     ["frame2.jpg", "frame9.jpg", "frame10.jpg"])
+
+    def test_convert_image_folder(self):
+        """Images of a folder are stored in order of their numbers"""
+
+        folder = os.path.join(self.directory, 'images')
+        os.makedirs(folder)
+        for num, frame in enumerate(self.frames):
+            cv2.imwrite(os.path.join(folder, "frame%d.png" % (num + 8)), frame)
+
+        assert_equal(convert_image_folder(folder, self.file_name, 10), 5)
+
+        archive = FrameArchive(self.file_name)
+        for num, frame in enumerate(self.frames):
+            assert_true(np.array_equal(archive[num], frame))
+            assert_almost_equal(archive.get_timestamp(num), num * 100.0)
+        archive.close()
+
+    def test_convert_recording(self):
+        """Modification times of a recording are used as timestamps"""
+
+        folder = os.path.join(self.directory, 'recording')
+        os.makedirs(folder)
+        for num, frame in enumerate(self.frames):
+            path = os.path.join(folder, "frame%d.jpg" % (num + 2))
+            cv2.imwrite(path, frame)
+            os.utime(path, (1000 + num * 0.04, 1000 + num * 0.04))
+
+        assert_equal(convert_recording(folder, self.file_name), 5)
+
+        archive = FrameArchive(self.file_name)
+        assert_almost_equal(archive.fps, 25, delta=0.01)
+        assert_almost_equal(archive.get_timestamp(4), 160.0, delta=0.01)
+        archive.close()
+
+    def test_convert_recording_cropped_frames(self):
+        """Frames that have been cropped to the ROI are padded to the size of the largest frame"""
+
+        folder = os.path.join(self.directory, 'recording')
+        os.makedirs(folder)
+        frames = [self.frames[0], self.frames[1][:20, :30], self.frames[2]]
+        for num, frame in enumerate(frames):
+            path = os.path.join(folder, "frame%d.png" % (num + 2))
+            cv2.imwrite(path, frame)
+            os.utime(path, (1000 + num * 0.04, 1000 + num * 0.04))
+
+        assert_equal(convert_recording(folder, self.file_name), 3)
+
+        archive = FrameArchive(self.file_name)
+        assert_equal(archive.shape, (48, 64, 3))
+        assert_true(np.array_equal(archive[1][:20, :30], frames[1]))
+        assert_equal(np.count_nonzero(archive[1][20:, :]) + np.count_nonzero(archive[1][:, 30:]), 0)
+        assert_true(np.array_equal(archive[2], frames[2]))
+        archive.close()
+
+    def test_coarse_modification_times(self):
+        """Modification times that are not strictly increasing are replaced by timestamps from the FPS"""
+
+        folder = os.path.join(self.directory, 'recording')
+        os.makedirs(folder)
+        for num, frame in enumerate(self.frames):
+            path = os.path.join(folder, "frame%d.jpg" % (num + 2))
+            cv2.imwrite(path, frame)
+            os.utime(path, (1000 + num // 2, 1000 + num // 2))
+
+        assert_equal(convert_image_folder(folder, self.file_name, 20, timestamps_from_files=True), 5)
+
+        archive = FrameArchive(self.file_name)
+        for num in range(0, 5):
+            assert_almost_equal(archive.get_timestamp(num), num * 50.0)
+        archive.close()
+
+
+if __name__ == '__main__':
+    nose.main()
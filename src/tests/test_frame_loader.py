@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+# -*- coding: ascii -*-
+"""test_frame_loader.py - tests for src/frame_loader.py"""
+
+import nose
+import cv2
+import numpy as np
+import os
+import shutil
+import tempfile
+
+from frame_archive import convert_image_folder
+from frame_loader import PrefetchingFrameLoader, VideoFileLoader, FrameArchiveLoader
+from nose.tools import assert_equal, assert_true, assert_raises, assert_almost_equal
+
+
+def write_video_file(file_name, files, fps=25):
+    """Write frames of the files to a video file (Motion JPEG)"""
+
+    frames = [cv2.imread(file_name_frame) for file_name_frame in files]
+    height, width = frames[0].shape[:2]
+
+    video_writer = cv2.VideoWriter(file_name, cv2.VideoWriter_fourcc(*'MJPG'), fps, (width, height))
+    for frame in frames:
+        video_writer.write(frame)
+    video_writer.release()
+
+
+class Test(object):
+
+    def setUp(self):
+        """Create instance"""
+        self.directory = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'test_frames')
+        self.files = [str(num) + ".jpg" for num in range(1, 31)]
+        self.frame_loader = PrefetchingFrameLoader(self.directory, self.files, number_of_threads=3, queue_size=4)
+
+        # Video file with the same frames
+        self.video_directory = tempfile.mkdtemp()
+        self.video_file = os.path.join(self.video_directory, 'video.avi')
+        write_video_file(self.video_file, [os.path.join(self.directory, file_name) for file_name in self.files])
+
+    def tearDown(self):
+        """Stop threads and remove video file"""
+        self.frame_loader.close()
+        shutil.rmtree(self.video_directory)
+
+    def test_order(self):
+        """Frames are returned in the order of the file list"""
+
+        for file_name in self.files:
+            frame = self.frame_loader.get_frame()
+            assert_true(np.array_equal(frame, cv2.imread(os.path.join(self.directory, file_name))))
+
+        assert_raises(IndexError, self.frame_loader.get_frame)
+
+    def test_queue_is_bounded(self):
+        """Only queue_size frames are read ahead"""
+
+        self.frame_loader.get_frame()
+
+        assert_true(len(self.frame_loader.pending) <= 4)
+        assert_true(self.frame_loader.get_queue_depth() <= 4)
+        assert_equal(self.frame_loader.next_file, 5)
+
+    def test_missing_file(self):
+        """A file that can not be read results in None"""
+
+        frame_loader = PrefetchingFrameLoader(self.directory, ["missing.jpg"])
+        assert_equal(frame_loader.get_frame(), None)
+        frame_loader.close()
+
+    def test_statistics(self):
+        """Statistics count the returned frames and their decoding time"""
+
+        for num in range(0, 10):
+            self.frame_loader.get_frame()
+
+        statistics = self.frame_loader.get_statistics()
+
+        assert_equal(statistics['frames'], 10)
+        assert_true(statistics['decode_time_max'] >= statistics['decode_time_mean'] > 0)
+        assert_true(0 <= statistics['stalls'] <= 10)
+
+    def test_video_file_sequential(self):
+        """All frames of the video file are returned with the timestamps of the container"""
+
+        video_file_loader = VideoFileLoader(self.video_file)
+
+        assert_equal(video_file_loader.frame_count, 30)
+        assert_almost_equal(video_file_loader.fps, 25)
+
+        for num in range(0, 30):
+            frame = video_file_loader.get_frame()
+            assert_equal(frame.shape, cv2.imread(os.path.join(self.directory, self.files[num])).shape)
+            assert_almost_equal(video_file_loader.get_timestamp(), num * 40.0)
+
+        assert_raises(IndexError, video_file_loader.get_frame)
+        assert_equal(video_file_loader.get_statistics()['frames'], 30)
+
+        video_file_loader.close()
+
+    def test_video_file_seek(self):
+        """After seeking, the same frames are returned as during sequential decoding"""
+
+        video_file_loader = VideoFileLoader(self.video_file)
+        frames = [video_file_loader.get_frame() for num in range(0, 30)]
+
+        for frame_index in (17, 3, 29, 0):
+            video_file_loader.seek(frame_index)
+            assert_equal(video_file_loader.get_position(), frame_index)
+            assert_true(np.array_equal(video_file_loader.get_frame(), frames[frame_index]))
+            assert_almost_equal(video_file_loader.get_timestamp(), frame_index * 40.0)
+
+        assert_raises(IndexError, video_file_loader.seek, 30)
+        assert_raises(IndexError, video_file_loader.seek, -1)
+
+        video_file_loader.close()
+
+    def test_frame_archive(self):
+        """Frames of an archive are returned in order and after seeking"""
+
+        folder = os.path.join(self.video_directory, 'frames')
+        os.makedirs(folder)
+        for file_name in self.files[:10]:
+            shutil.copy(os.path.join(self.directory, file_name), folder)
+
+        archive_file = os.path.join(self.video_directory, 'frames.vbcg')
+        convert_image_folder(folder, archive_file, 25)
+
+        frame_archive_loader = FrameArchiveLoader(archive_file)
+
+        for num in range(0, 10):
+            frame = frame_archive_loader.get_frame()
+            assert_true(np.array_equal(frame, cv2.imread(os.path.join(self.directory, self.files[num]))))
+            assert_almost_equal(frame_archive_loader.get_timestamp(), num * 40.0)
+
+        assert_raises(IndexError, frame_archive_loader.get_frame)
+
+        frame_archive_loader.seek(4)
+        assert_true(np.array_equal(frame_archive_loader.get_frame(), cv2.imread(os.path.join(self.directory, "5.jpg"))))
+        assert_raises(IndexError, frame_archive_loader.seek, 10)
+        assert_equal(frame_archive_loader.get_statistics()['frames'], 11)
+
+        frame_archive_loader.close()
+
+    def test_video_file_invalid(self):
+        """A file that is not a video can not be opened"""
+        assert_raises(IOError, VideoFileLoader, os.path.join(self.video_directory, 'missing.avi'))
+
+
+if __name__ == '__main__':
+    nose.main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding: ascii -*-
+"""test_frame_pool.py - tests for src/frame_pool.py"""
+
+import nose
+import numpy as np
+
+from frame_pool import FramePool
+from nose.tools import assert_equal, assert_true, assert_false
+
+
+class Test(object):
+
+    def setUp(self):
+        """Create instance"""
+        self.frame_pool = FramePool(2)
+
+    def test_buffers_are_reused(self):
+        buffer_1 = self.frame_pool.acquire((48, 64, 3))
+        assert_equal(buffer_1.shape, (48, 64, 3))
+        assert_equal(buffer_1.dtype, np.uint8)
+        assert_true(self.frame_pool.is_in_use(buffer_1))
+
+        self.frame_pool.release(buffer_1)
+        assert_false(self.frame_pool.is_in_use(buffer_1))
+        buffer_2 = self.frame_pool.acquire((48, 64, 3))
+        assert_true(buffer_2 is buffer_1)
+        assert_equal(self.frame_pool.get_statistics()['allocations'], 1)
+
+    def test_references(self):
+        buffer_1 = self.frame_pool.acquire((48, 64, 3))
+        self.frame_pool.add_reference(buffer_1)
+
+        # Buffer is only returned after both users have released it
+        self.frame_pool.release(buffer_1)
+        assert_true(self.frame_pool.is_in_use(buffer_1))
+        self.frame_pool.release(buffer_1)
+        assert_false(self.frame_pool.is_in_use(buffer_1))
+
+    def test_read_only_buffer_is_writable_again(self):
+        buffer_1 = self.frame_pool.acquire((48, 64, 3))
+        buffer_1.flags.writeable = False
+        self.frame_pool.release(buffer_1)
+        assert_true(self.frame_pool.acquire((48, 64, 3)).flags.writeable)
+
+    def test_exhaustion(self):
+        buffer_1 = self.frame_pool.acquire((48, 64, 3))
+        buffer_2 = self.frame_pool.acquire((48, 64, 3))
+
+        # All buffers are in use: A new array is returned, releasing it has no effect
+        buffer_3 = self.frame_pool.acquire((48, 64, 3))
+        assert_false(buffer_3 is buffer_1 or buffer_3 is buffer_2)
+        assert_false(self.frame_pool.is_in_use(buffer_3))
+        self.frame_pool.release(buffer_3)
+
+        assert_equal(self.frame_pool.get_statistics(),
+                     {'buffers': 2, 'in_use': 2, 'acquisitions': 3, 'allocations': 2, 'exhaustions': 1})
+
+    def test_change_of_shape(self):
+        buffer_1 = self.frame_pool.acquire((48, 64, 3))
+        buffer_2 = self.frame_pool.acquire((48, 64, 3))
+        self.frame_pool.release(buffer_2)
+
+        # Buffers of the old shape are not reused, also after they have been released
+        buffer_3 = self.frame_pool.acquire((20, 30, 3))
+        assert_equal(buffer_3.shape, (20, 30, 3))
+        self.frame_pool.release(buffer_1)
+        buffer_4 = self.frame_pool.acquire((20, 30, 3))
+        assert_equal(buffer_4.shape, (20, 30, 3))
+        assert_false(buffer_4 is buffer_1)
+
+        statistics = self.frame_pool.get_statistics()
+        assert_equal(statistics['buffers'], 2)
+        assert_equal(statistics['in_use'], 2)
+        assert_equal(statistics['allocations'], 4)
+
+
+if __name__ == '__main__':
+    nose.main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: ascii -*-
+"""test_frame_timing.py - tests for src/frame_timing.py"""
+
+import nose
+import numpy as np
+
+from frame_timing import FrameTimingStatistics, UniformResampler
+from signal_processing import SignalProcessor
+from ring_buffer import RingBuffer
+from nose.tools import assert_equal, assert_true, assert_almost_equal, assert_raises
+
+
+class Test(object):
+
+    def test_resampler_regular_frames(self):
+        """Values captured on the grid are not changed"""
+
+        resampler = UniformResampler(25.0)
+        values = np.random.rand(100)
+
+        resampled_values = []
+        for num, value in enumerate(values):
+            resampled_values.extend(resampler.push(10 + num / 25.0, value))
+
+        assert_true(np.allclose(resampled_values, values))
+
+    def test_resampler_irregular_frames(self):
+        """Early frames yield no value, dropped frames are interpolated, repeated frames are ignored"""
+
+        resampler = UniformResampler(10.0)
+
+        assert_equal(resampler.push(0.0, 0.0), [0.0])
+        assert_equal(resampler.push(0.05, 5.0), [])
+        assert_true(np.allclose(resampler.push(0.15, 15.0), [10.0]))
+        assert_true(np.allclose(resampler.push(0.4, 40.0), [20.0, 30.0, 40.0]))
+        assert_equal(resampler.push(0.4, 40.0), [])
+
+        # Long gap: Grid starts again
+        assert_equal(resampler.push(5.0, 1.0), [1.0])
+        assert_true(np.allclose(resampler.push(5.1, 2.0), [2.0]))
+
+        # Jump back in time (e.g. seek in video file): Grid starts again
+        assert_equal(resampler.push(0.3, 3.0), [3.0])
+        assert_true(np.allclose(resampler.push(0.35, 3.5), []))
+        assert_true(np.allclose(resampler.push(0.4, 4.0), [4.0]))
+
+    def test_resampler_invalid_fps(self):
+        # FPS of empty settings
+        assert_raises(ValueError, UniformResampler, 0)
+
+    def test_resampler_jitter(self):
+        """Resampled values of a jittered sinusoid are close to the values at the grid times"""
+
+        fps = 25.0
+        capture_times = np.arange(500) / fps + np.random.uniform(0, 0.3 / fps, 500)
+        signal = np.sin(2 * np.pi * 1.2 * capture_times)
+
+        resampler = UniformResampler(fps)
+        resampled_values = []
+        for capture_time, value in zip(capture_times, signal):
+            resampled_values.extend(resampler.push(capture_time, value))
+
+        grid_times = capture_times[0] + np.arange(len(resampled_values)) / fps
+        error_resampled = np.max(np.abs(np.array(resampled_values) - np.sin(2 * np.pi * 1.2 * grid_times)))
+        error_raw = np.max(np.abs(signal - np.sin(2 * np.pi * 1.2 * (capture_times[0] + np.arange(500) / fps))))
+
+        assert_true(error_resampled < error_raw)
+
+    def test_heart_rate_with_slower_camera(self):
+        """If the camera is slower than the FPS setting, the HR is only correct after resampling"""
+
+        fps = 25.0
+        capture_times = np.cumsum(np.random.uniform(0.9, 1.3, 800) / fps)
+        signal = np.cos(2 * np.pi * 1.2 * capture_times) + 5
+
+        resampler = UniformResampler(fps)
+        values_nominal = RingBuffer(400)
+        values_resampled = RingBuffer(400)
+
+        for capture_time, value in zip(capture_times, signal):
+            values_nominal.append(value)
+            for resampled_value in resampler.push(capture_time, value):
+                values_resampled.append(resampled_value)
+
+        signal_processor = SignalProcessor()
+
+        try:
+            hr_nominal = signal_processor.compute_heart_rate(values_nominal, fps)[0]
+            hr_resampled = signal_processor.compute_heart_rate(values_resampled, fps)[0]
+        finally:
+            signal_processor.clear()
+
+        assert_true(abs(hr_nominal - 72) > 5)
+        assert_true(abs(hr_resampled - 72) <= 2)
+
+    def test_statistics(self):
+        """Frame rate, jitter and dropped frames are computed from capture times and sequence numbers"""
+
+        frame_timing = FrameTimingStatistics(10)
+
+        for num in range(0, 30):
+            frame_timing.update(num * 0.04, num + 1)
+
+        assert_almost_equal(frame_timing.get_effective_fps(), 25)
+        assert_almost_equal(frame_timing.get_jitter(), 0)
+        assert_equal(frame_timing.dropped_frames, 0)
+
+        # Two frames are missing
+        frame_timing.update(32 * 0.04, 33)
+        statistics = frame_timing.get_statistics()
+
+        assert_equal(statistics['dropped_frames'], 2)
+        assert_equal(statistics['frames'], 31)
+        assert_true(statistics['effective_fps'] < 25)
+        assert_true(statistics['jitter'] > 0)
+
+
+if __name__ == '__main__':
+    nose.main()
@@ -88,6 +88,8 @@ class Test(object):
             assert True
         elif curr_settings[IDX_ALGORITHM] == 2 and curr_text == LABEL_ALGORITHM_3:
             assert True
+        elif curr_settings[IDX_ALGORITHM] == 3 and curr_text == LABEL_ALGORITHM_4:
+            assert True
         else:
             assert False
 
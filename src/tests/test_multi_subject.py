@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+# -*- coding: ascii -*-
+"""test_multi_subject.py - tests for src/multi_subject.py"""
+
+import nose
+import numpy as np
+import settings
+
+from defines import *
+
+from multi_subject import MultiSubjectProcessor, SubjectIdentities, compute_overlap
+from signal_processing import SignalProcessor
+from nose.tools import assert_equal, assert_true, assert_almost_equal
+
+
+def create_frame(n, fps, subjects):
+    """Frame with a pulse in the green channel of every subject, subjects is a list of (box, frequency)"""
+    frame = np.full((240, 320, 3), 100, dtype=np.uint8)
+    for (x, y, w, h), frequency in subjects:
+        frame[y:y + h, x:x + w, 1] += np.uint8(np.round(10 + 10 * np.sin(2 * np.pi * frequency * n / fps)))
+    return frame
+
+
+class Test(object):
+
+    def test_compute_overlap(self):
+        assert_almost_equal(compute_overlap((0, 0, 10, 10), (0, 0, 10, 10)), 1)
+        assert_almost_equal(compute_overlap((0, 0, 10, 10), (5, 0, 10, 10)), 50 / 150.0)
+        assert_equal(compute_overlap((0, 0, 10, 10), (10, 0, 10, 10)), 0)
+
+    def test_identities_are_stable(self):
+        """Moving faces keep their identities, also if the order of the boxes changes"""
+
+        identities = SubjectIdentities()
+        assert_equal(identities.update([(0, 0, 50, 50), (100, 0, 50, 50)]), {0: (0, 0, 50, 50), 1: (100, 0, 50, 50)})
+        assert_equal(identities.update([(105, 2, 50, 50), (5, 2, 50, 50)]), {0: (5, 2, 50, 50), 1: (105, 2, 50, 50)})
+
+        # New face gets a new identity
+        assert_equal(identities.update([(5, 2, 50, 50), (200, 0, 50, 50)]), {0: (5, 2, 50, 50), 2: (200, 0, 50, 50)})
+
+    def test_missing_subjects(self):
+        """A subject that is missing for a few frames keeps its identity, it is removed after max_missing frames"""
+
+        identities = SubjectIdentities(max_missing=3)
+        identities.update([(0, 0, 50, 50), (100, 0, 50, 50)])
+        identities.update([(0, 0, 50, 50)])
+        identities.update([(0, 0, 50, 50)])
+        assert_equal(identities.get_identities(), [0, 1])
+        assert_equal(identities.update([(0, 0, 50, 50), (100, 0, 50, 50)]), {0: (0, 0, 50, 50), 1: (100, 0, 50, 50)})
+
+        for n in range(0, 3):
+            identities.update([(0, 0, 50, 50)])
+        assert_equal(identities.get_identities(), [0])
+        assert_equal(identities.update([(100, 0, 50, 50)]), {2: (100, 0, 50, 50)})
+
+    def test_heart_rates(self):
+        """Every subject has its own HR"""
+
+        fps = 25.0
+        subjects = [((20, 20, 60, 60), 1.0), ((200, 100, 60, 80), 1.5)]
+        processor = MultiSubjectProcessor(fps, 400)
+
+        for n in range(0, 400):
+            processor.update(create_frame(n, fps, subjects), [box for box, _ in subjects], n / fps, 1)
+        results = processor.compute()
+
+        assert_equal([result['subject'] for result in results], [0, 1])
+        assert_equal([result['heart_rate'] for result in results], [60, 90])
+        assert_equal(results[1]['box'], (200, 100, 60, 80))
+        assert_equal(results[0]['number_of_values'], 400)
+
+    def helper_same_results_as_compute_heart_rate(self, zero_padding, peak_interpolation, spectrum_resolution):
+        fps = 25.0
+        processor = MultiSubjectProcessor(fps, 200)
+        boxes = [(0, 0, 10, 10), (20, 0, 10, 10), (40, 0, 10, 10)]
+        frame = np.zeros((10, 50, 3), dtype=np.uint8)
+        for n in range(0, 150):
+            frame[:, :, 1] = np.random.randint(0, 256, 50).astype(np.uint8)
+            processor.update(frame, boxes, n / fps, 1)
+
+        results = processor.compute(zero_padding, peak_interpolation, spectrum_resolution)
+
+        # Reference: compute_heart_rate() for every signal, with the same settings
+        signal_processor = SignalProcessor(use_serial_interface=False)
+        signal_processor.peak_interpolation = peak_interpolation
+        signal_processor.spectrum_resolution = spectrum_resolution
+        _, curr_parameters = settings.get_parameters()
+        zero_padding_backup = curr_parameters[IDX_ZERO_PADDING]
+        settings.change_parameters(IDX_ZERO_PADDING, zero_padding)
+        try:
+            for result in results:
+                heart_rate, spectrum, freq_axis, max_val = \
+                    signal_processor.compute_heart_rate(np.copy(processor.chains[result['subject']].values.get()), fps)
+                assert_equal(result['heart_rate'], heart_rate)
+                assert_true(np.allclose(result['spectrum'], spectrum))
+                assert_true(np.allclose(result['freq_axis'], freq_axis))
+                assert_equal(result['max_val'], max_val)
+        finally:
+            settings.change_parameters(IDX_ZERO_PADDING, zero_padding_backup)
+
+    def test_same_results_as_compute_heart_rate(self):
+        """The batched spectra give the same results as compute_heart_rate() for every subject"""
+        for zero_padding, peak_interpolation, spectrum_resolution in ((0, None, None), (1, 'jacobsen', None),
+                                                                      (0, 'parabolic', 0.05)):
+            yield self.helper_same_results_as_compute_heart_rate, zero_padding, peak_interpolation, spectrum_resolution
+
+    def test_cropped_frame(self):
+        """Boxes in coordinates of the full frame are moved to the cropped frame and limited to it"""
+
+        frame = np.zeros((100, 100, 3), dtype=np.uint8)
+        frame[10:20, 30:50, 1] = 200
+        processor = MultiSubjectProcessor(25.0, 10)
+
+        # Frame starts at row 50, column 20 of the full frame. The second box is outside of the frame.
+        processor.update(frame, [(50, 60, 20, 10), (0, 0, 10, 10)], 0.0, 1, offset=(50, 20))
+
+        assert_equal(processor.get_number_of_subjects(), 1)
+        assert_equal(processor.chains[0].values.get()[-1], 200)
+        assert_equal(processor.compute(), [])
+
+    def test_removed_subjects_have_no_signal(self):
+        processor = MultiSubjectProcessor(25.0, 10, max_missing=2)
+        frame = np.zeros((100, 100, 3), dtype=np.uint8)
+        processor.update(frame, [(0, 0, 10, 10), (50, 50, 10, 10)], 0.0, 1)
+        processor.update(frame, [(0, 0, 10, 10)], 0.04, 1)
+        processor.update(frame, [(0, 0, 10, 10)], 0.08, 1)
+
+        assert_equal(processor.get_number_of_subjects(), 1)
+        assert_equal([result['subject'] for result in processor.compute()], [0])
+
+
+if __name__ == '__main__':
+    nose.main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: ascii -*-
+"""test_offline_analysis.py - tests for src/offline_analysis.py"""
+
+import nose
+import numpy as np
+import settings
+
+from defines import *
+from offline_analysis import compute_heart_rate_batch, get_windows
+from signal_processing import SignalProcessor
+from ring_buffer import RingBuffer
+from nose.tools import assert_equal, assert_true, assert_false
+
+
+class Test(object):
+
+    def setUp(self):
+        """Create instance"""
+        self.signal_processor = SignalProcessor()
+
+    def tearDown(self):
+        """Clear instance"""
+        self.signal_processor.clear()
+
+    def test_get_windows(self):
+        """Windows are views of the trace with the given hop size"""
+
+        trace = np.arange(20.0)
+        windows = get_windows(trace, 5, 3)
+
+        assert_equal(windows.shape, (6, 5))
+        assert_true(np.array_equal(windows[2], trace[6:11]))
+        assert_false(windows.flags.writeable)
+
+    def test_get_windows_short_trace(self):
+        """A trace shorter than a window has no windows"""
+        assert_equal(get_windows(np.arange(3.0), 5, 1).shape, (0, 5))
+
+    def test_compute_heart_rate_batch(self):
+        """The results should be identical to compute_heart_rate() of a RingBuffer (spectra up to rounding)"""
+
+        for fps in (25.0, 60.0):
+            for zero_padding in (0, 1):
+                for peak_interpolation in (None, 'quadratic_log'):
+                    yield self.compute_heart_rate_batch, fps, zero_padding, peak_interpolation
+
+    def compute_heart_rate_batch(self, fps, zero_padding, peak_interpolation):
+        """Called by generators in test_compute_heart_rate_batch"""
+
+        hop_size = 13
+        trace = np.cos(2 * np.pi * 1.3 * np.arange(1000) / fps) + np.random.rand(1000) + 2
+
+        heart_rates, spectra, spectrum_axis, max_vals = \
+            compute_heart_rate_batch(trace, fps, hop_size, 400, zero_padding, peak_interpolation=peak_interpolation)
+
+        # Streaming computation with the same settings
+        _, curr_parameters = settings.get_parameters()
+        settings.change_parameters(IDX_ZERO_PADDING, zero_padding)
+        self.signal_processor.peak_interpolation = peak_interpolation
+        ring_buffer = RingBuffer(400)
+
+        try:
+            for num in range(0, np.size(trace)):
+                ring_buffer.append(trace[num])
+
+                if num >= 399 and (num - 399) % hop_size == 0:
+                    idx = (num - 399) // hop_size
+                    ret_1, ret_2, ret_3, ret_4 = self.signal_processor.compute_heart_rate(ring_buffer, fps)
+
+                    assert_equal(ret_1, heart_rates[idx])
+                    assert_true(np.allclose(ret_2, spectra[idx], rtol=1e-12, atol=1e-12))
+                    assert_true(np.array_equal(ret_3, spectrum_axis))
+                    assert_equal(ret_4, max_vals[idx])
+        finally:
+            settings.change_parameters(IDX_ZERO_PADDING, curr_parameters[IDX_ZERO_PADDING])
+
+        assert_equal(np.size(heart_rates), (1000 - 400) // hop_size + 1)
+
+    def test_compute_heart_rate_batch_zeros(self):
+        """Windows containing zeros only are not normalized"""
+
+        heart_rates, spectra, _, _ = compute_heart_rate_batch(np.zeros(500), 25.0, 10, zero_padding=0)
+        assert_equal(np.count_nonzero(spectra), 0)
+
+
+if __name__ == '__main__':
+    nose.main()
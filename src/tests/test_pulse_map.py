@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: ascii -*-
+"""test_pulse_map.py - tests for src/pulse_map.py"""
+
+import nose
+import numpy as np
+
+from pulse_map import PulseMap, compute_block_means
+from signal_processing import SignalProcessor
+from nose.tools import assert_equal, assert_true, assert_is_none, assert_raises, assert_almost_equal
+
+
+class Test(object):
+
+    def setUp(self):
+        """Create instance"""
+        self.signal_processor = SignalProcessor()
+
+    def tearDown(self):
+        """Stop thread of serial interface"""
+        self.signal_processor.clear()
+
+    def test_block_means(self):
+        """Block means should be equal to the mean of the reshaped frame"""
+
+        frame = np.random.randint(0, 256, (48, 64, 3)).astype(np.uint8)
+        reference = frame.reshape(4, 12, 8, 8, 3).mean(axis=(1, 3))
+
+        assert_true(np.allclose(compute_block_means(frame, 4, 8, 1), reference[:, :, 1]))
+        assert_true(np.allclose(compute_block_means(frame, 4, 8), reference.mean(axis=2)))
+
+    def test_block_means_of_view(self):
+        """A view (e.g. the ROI) can be used and blocks of different sizes are possible"""
+
+        frame = np.random.rand(100, 100)
+        roi = frame[10:33, 20:45]
+        means = compute_block_means(roi, 3, 4)
+
+        assert_equal(means.shape, (3, 4))
+        assert_almost_equal(means[0, 0], np.mean(roi[0:7, 0:6]))
+        assert_almost_equal(means[2, 3], np.mean(roi[15:23, 18:25]))
+
+    def test_frame_smaller_than_grid(self):
+        assert_raises(ValueError, compute_block_means, np.zeros((3, 10)), 4, 4)
+
+    def test_empty_map(self):
+        pulse_map = PulseMap(2, 2, 100)
+        assert_is_none(pulse_map.compute(self.signal_processor, 25.0))
+        pulse_map.append(np.ones((10, 10)))
+        assert_equal(pulse_map.get_number_of_values(), 1)
+        assert_is_none(pulse_map.compute(self.signal_processor, 25.0))
+
+    def test_pulse_in_some_blocks(self):
+        """Blocks with a pulse should have a higher SNR and amplitude, the combined HR is the pulse"""
+
+        fps = 25.0
+        pulse_map = PulseMap(2, 2, 400)
+        random_state = np.random.RandomState(0)
+
+        for n in range(0, 400):
+            # Pulse of 72 bpm in the upper blocks, noise only in the lower blocks
+            frame = 100 + random_state.normal(0, 0.5, (20, 20))
+            frame[0:10] += 2 * np.sin(2 * np.pi * 1.2 * n / fps)
+            pulse_map.append(frame)
+
+        result = pulse_map.compute(self.signal_processor, fps)
+
+        assert_almost_equal(result['heart_rate'], 72, delta=2)
+        assert_equal(result['snr'].shape, (2, 2))
+        assert_true(np.min(result['snr'][0]) > np.max(result['snr'][1]) + 10)
+        assert_almost_equal(result['amplitude'][0, 0], 0.02, delta=0.005)
+        assert_true(np.max(result['amplitude'][1]) < 0.005)
+        assert_equal(np.size(result['spectrum']), np.size(result['freq_axis']))
+
+    def test_clear(self):
+        pulse_map = PulseMap(2, 2, 100)
+        pulse_map.append(np.ones((10, 10)))
+        pulse_map.clear()
+        assert_equal(pulse_map.get_number_of_values(), 0)
+
+
+if __name__ == '__main__':
+    nose.main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# -*- coding: ascii -*-
+"""test_ring_buffer.py - tests for src/ring_buffer.py"""
+
+import nose
+import numpy as np
+
+from ring_buffer import CircularHistory, RingBuffer
+from nose.tools import assert_equal, assert_true, assert_false, assert_raises, assert_almost_equal
+
+
+class Test(object):
+
+    def setUp(self):
+        """Create instance"""
+        self.ring_buffer = RingBuffer(10)
+
+    def test_initial_values(self):
+        """A new buffer contains zeros only"""
+        assert_equal(np.count_nonzero(self.ring_buffer.get()), 0)
+        assert_equal(np.size(self.ring_buffer.get()), 10)
+
+    def test_append(self):
+        """Compare buffer to the trimmed output of np.append for random lengths"""
+
+        for n in range(0, 25):
+            number_of_values = np.random.randint(50) + 1
+            yield self.append, np.random.rand(number_of_values)
+
+    def append(self, values):
+        """Called by generators in test_append"""
+
+        reference = np.zeros(10)
+
+        for value in values:
+            self.ring_buffer.append(value)
+            reference = np.append(reference, value)[-10:]
+            assert_true(np.array_equal(self.ring_buffer.get(), reference))
+
+        assert_equal(self.ring_buffer.count, np.size(values))
+
+    def test_get_returns_view(self):
+        """get() should not copy the storage"""
+        self.ring_buffer.append(1)
+        assert_false(self.ring_buffer.get().flags['OWNDATA'])
+        assert_true(np.may_share_memory(self.ring_buffer.get(), self.ring_buffer.data))
+
+    def test_memory_is_constant(self):
+        """The storage is not reallocated when appending"""
+        data_before = self.ring_buffer.data
+        for n in range(0, 100):
+            self.ring_buffer.append(n)
+        assert_true(data_before is self.ring_buffer.data)
+
+    def test_latest(self):
+        """latest() returns the newest values"""
+        for n in range(0, 15):
+            self.ring_buffer.append(n)
+        assert_true(np.array_equal(self.ring_buffer.latest(3), [12, 13, 14]))
+
+    def test_numpy_conversion(self):
+        """The buffer can be used in numpy functions"""
+        self.ring_buffer.append(5)
+        assert_equal(np.max(np.asarray(self.ring_buffer)), 5)
+        assert_equal(np.size(self.ring_buffer), 10)
+
+    def test_clear(self):
+        """clear() resets values and counter"""
+        self.ring_buffer.append(5)
+        self.ring_buffer.clear()
+        assert_equal(np.count_nonzero(self.ring_buffer.get()), 0)
+        assert_equal(self.ring_buffer.count, 0)
+
+    def test_array_values(self):
+        """Every sample can be an array, get() returns one row per sample"""
+
+        ring_buffer = RingBuffer(4, value_shape=(3,))
+        for n in range(0, 6):
+            ring_buffer.append(np.arange(3) + n)
+
+        assert_equal(ring_buffer.get().shape, (4, 3))
+        assert_true(np.array_equal(ring_buffer.get()[:, 0], [2, 3, 4, 5]))
+        assert_true(np.array_equal(ring_buffer.latest(1), [[5, 6, 7]]))
+
+    def test_invalid_capacity(self):
+        """A buffer without capacity can not be created"""
+        assert_raises(ValueError, RingBuffer, 0)
+
+    def test_circular_history_statistics(self):
+        """Mean and variance should match np.mean and np.var of the stored values"""
+
+        for n in range(0, 10):
+            capacity = np.random.randint(20) + 1
+            yield self.circular_history_statistics, capacity, np.random.rand(100) * 100
+
+    def circular_history_statistics(self, capacity, values):
+        """Called by generators in test_circular_history_statistics"""
+
+        history = CircularHistory(capacity, resync_interval=30)
+
+        for num in range(0, np.size(values)):
+            history.append(values[num])
+            window = values[max(0, num - capacity + 1):num + 1]
+
+            assert_true(np.array_equal(history.get_values(), window))
+            assert_almost_equal(history.get_mean(), np.mean(window))
+            assert_almost_equal(history.get_variance(), np.var(window))
+
+    def test_circular_history_empty(self):
+        """An empty history has no values and zero statistics"""
+
+        history = CircularHistory(5)
+        history.append(3)
+        history.clear()
+
+        assert_equal(history.get_size(), 0)
+        assert_equal(np.size(history.get_values()), 0)
+        assert_equal(history.get_mean(), 0)
+        assert_equal(history.get_variance(), 0)
+
+
+if __name__ == '__main__':
+    nose.main()
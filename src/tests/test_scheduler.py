@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# -*- coding: ascii -*-
+"""test_scheduler.py - tests for src/scheduler.py"""
+
+import nose
+import numpy as np
+
+from scheduler import DeadlineScheduler, CATCH_UP_POLICIES
+from nose.tools import assert_equal, assert_true, assert_false, assert_almost_equal, assert_raises
+
+
+class FakeClock(object):
+    """Clock that only advances when sleeping or when the loop does work"""
+
+    def __init__(self):
+        self.time = 100.0
+        self.sleep_times = []
+
+    def now(self):
+        return self.time
+
+    def sleep(self, seconds):
+        self.sleep_times.append(seconds)
+        # Sleeping is never precise: a small overshoot, and sleep(0) takes some time as well
+        self.time += seconds + 0.0001
+
+
+class Test(object):
+
+    def test_deadlines_do_not_drift(self):
+        """Deadlines are on the grid, independent of the duration of the iterations"""
+
+        fake_clock = FakeClock()
+        scheduler = DeadlineScheduler(25.0, time_function=fake_clock.now, sleep_function=fake_clock.sleep)
+        scheduler.start()
+
+        wake_times = []
+        for num in range(1000):
+            fake_clock.time += np.random.uniform(0, 0.03)
+            assert_true(scheduler.wait())
+            wake_times.append(fake_clock.time)
+
+        # Every wake-up is at most a few polls after its deadline, also after 1000 periods
+        lateness = np.asarray(wake_times) - (100.0 + np.arange(1, 1001) / 25.0)
+        assert_true(np.all(lateness >= 0))
+        assert_true(np.all(lateness < 0.0005))
+        assert_equal(scheduler.get_statistics()['overruns'], 0)
+
+    def test_hybrid_sleep(self):
+        """Most of the time is slept, the rest is polled"""
+
+        fake_clock = FakeClock()
+        scheduler = DeadlineScheduler(10.0, spin_time=0.002, time_function=fake_clock.now,
+                                      sleep_function=fake_clock.sleep)
+        scheduler.start()
+        scheduler.wait()
+
+        assert_almost_equal(fake_clock.sleep_times[0], 0.098)
+        assert_true(all(seconds == 0 for seconds in fake_clock.sleep_times[1:]))
+
+    def helper_catch_up(self, policy, expected_deadline, expected_skipped):
+        fake_clock = FakeClock()
+        scheduler = DeadlineScheduler(10.0, catch_up=policy, time_function=fake_clock.now,
+                                      sleep_function=fake_clock.sleep)
+        scheduler.start()
+
+        # Iteration takes 0.25 seconds, i.e. the deadlines at 100.1 and 100.2 are missed
+        fake_clock.time += 0.25
+        assert_false(scheduler.wait())
+        assert_almost_equal(scheduler.deadline, expected_deadline)
+
+        statistics = scheduler.get_statistics()
+        assert_equal(statistics['overruns'], 1)
+        assert_equal(statistics['skipped_deadlines'], expected_skipped)
+        assert_almost_equal(statistics['lateness_max'], 0.15)
+
+    def test_catch_up(self):
+        for policy, expected_deadline, expected_skipped in (('skip', 100.3, 1),
+                                                            ('burst', 100.2, 0),
+                                                            ('reset', 100.35, 0)):
+            yield self.helper_catch_up, policy, expected_deadline, expected_skipped
+
+    def test_burst_limited_by_max_lag(self):
+        fake_clock = FakeClock()
+        scheduler = DeadlineScheduler(10.0, catch_up='burst', max_lag=0.5, time_function=fake_clock.now,
+                                      sleep_function=fake_clock.sleep)
+        scheduler.start()
+
+        # Loop was blocked for 2 seconds: Missed deadlines are skipped instead of running 20 iterations at once
+        fake_clock.time += 2.05
+        assert_false(scheduler.wait())
+        assert_almost_equal(scheduler.deadline, 102.1)
+
+    def test_set_fps(self):
+        fake_clock = FakeClock()
+        scheduler = DeadlineScheduler(10.0, time_function=fake_clock.now, sleep_function=fake_clock.sleep)
+        scheduler.start()
+        scheduler.wait()
+
+        # New rate applies after the next deadline
+        scheduler.set_fps(50.0)
+        scheduler.wait()
+        scheduler.wait()
+        assert_almost_equal(scheduler.deadline, 100.24)
+
+    def test_invalid_arguments(self):
+        assert_raises(ValueError, DeadlineScheduler, 25.0, 'unknown')
+        assert_raises(ValueError, DeadlineScheduler, 0)
+        assert_equal(CATCH_UP_POLICIES, ('skip', 'burst', 'reset'))
+
+    def test_real_time_jitter(self):
+        """With the real clock, the intervals between wake-ups are close to the period"""
+
+        scheduler = DeadlineScheduler(100.0)
+        scheduler.start()
+        for num in range(50):
+            scheduler.wait()
+
+        statistics = scheduler.get_statistics()
+        assert_equal(statistics['periods'], 50)
+        assert_almost_equal(statistics['interval_mean'], 0.01, delta=0.002)
+
+
+if __name__ == '__main__':
+    nose.main()
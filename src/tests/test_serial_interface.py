@@ -5,9 +5,10 @@
 import nose
 import time
 import os
+import clock
 
 from serial_interface import SerialInterface
-from nose.tools import assert_false, assert_equal, assert_true
+from nose.tools import assert_false, assert_equal, assert_true, assert_almost_equal
 
 
 class Test(object):
@@ -60,6 +61,35 @@ class Test(object):
         # Is thread still running or has it shut down?
         assert_false(self.serial_interface.is_alive())
 
+    def test_send_trigger_virtual_clock(self):
+        """With the virtual clock, the trigger is written when the clock reaches its time"""
+
+        clock.use_virtual_clock()
+        serial_interface = SerialInterface("test")
+
+        try:
+            # First trigger is written after the waiting time
+            clock.advance(1)
+            assert_equal(serial_interface.send_trigger(0.3), (False, 0))
+            clock.advance(0.2)
+            serial_interface.send_trigger(0.3)
+            assert_true(serial_interface.trigger_event.is_set())
+            clock.advance(0.2)
+            ret_1, ret_2 = serial_interface.send_trigger(0.3)
+            assert_false(serial_interface.trigger_event.is_set())
+            assert_equal(os.read(serial_interface.master, 1024), 'T\n')
+            assert_false(ret_1)
+
+            # The next trigger is accepted 0.5 s after the first one has been written
+            clock.advance(0.5)
+            ret_1, ret_2 = serial_interface.send_trigger(0.1)
+            assert_true(ret_1)
+            assert_almost_equal(ret_2, 0.6 + 0.1)
+
+        finally:
+            serial_interface.clear()
+            clock.use_real_time_clock()
+
     def test_clear(self):
         """Check if if connection to serial port is closed"""
 
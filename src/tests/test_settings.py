@@ -4,6 +4,7 @@
 
 import nose
 import settings
+import spectrum
 import numpy as np
 import os
 import os.path
@@ -60,6 +61,18 @@ class Test(object):
         # Undo changes
         settings.change_settings(IDX_FPS, curr_value)
 
+    def test_capture_settings(self):
+        # Crop setting can be flipped like the other boolean settings
+        curr_settings_before, _ = settings.get_parameters()
+        settings.flip_setting(IDX_CROP)
+        curr_settings_after, _ = settings.get_parameters()
+        assert_equal(np.abs(curr_settings_before[IDX_CROP] - curr_settings_after[IDX_CROP]), 1)
+
+        # Capture size is stored
+        settings.change_settings(IDX_CAPTURE_WIDTH, 1280)
+        curr_settings_after, _ = settings.get_parameters()
+        assert_equal(curr_settings_after[IDX_CAPTURE_WIDTH], 1280)
+
     def test_change_parameters(self):
         # Get current settings
         _, self.curr_parameters_before = settings.get_parameters()
@@ -79,6 +92,44 @@ class Test(object):
         # Change parameter in settings
         settings.change_parameters(IDX_WIN_SIZE, curr_value)
 
+    def test_sigma_parameter(self):
+        # Standard deviation of the weights of algorithm 2 is stored as algorithm parameter
+        _, curr_parameters_before = settings.get_parameters()
+        settings.change_parameters(IDX_SIGMA, 2.5)
+        _, curr_parameters_after = settings.get_parameters()
+        settings.change_parameters(IDX_SIGMA, curr_parameters_before[IDX_SIGMA])
+        assert_equal(curr_parameters_after[IDX_SIGMA], 2.5)
+
+    def test_pulse_map_grid_setting(self):
+        # Size of the grid of the pulse map is a program setting, the map is disabled by default
+        curr_settings_before, _ = settings.get_parameters()
+        settings.change_settings(IDX_PULSE_MAP_GRID, 4)
+        curr_settings_after, _ = settings.get_parameters()
+        settings.change_settings(IDX_PULSE_MAP_GRID, curr_settings_before[IDX_PULSE_MAP_GRID])
+        assert_equal(curr_settings_after[IDX_PULSE_MAP_GRID], 4)
+        assert_equal(settings.std_settings[IDX_PULSE_MAP_GRID], 0)
+
+    def test_multi_subject_setting(self):
+        # Multi-subject mode is a boolean program setting, disabled by default
+        curr_settings_before, _ = settings.get_parameters()
+        settings.flip_setting(IDX_MULTI_SUBJECT)
+        curr_settings_after, _ = settings.get_parameters()
+        settings.change_settings(IDX_MULTI_SUBJECT, curr_settings_before[IDX_MULTI_SUBJECT])
+        assert_equal(curr_settings_after[IDX_MULTI_SUBJECT], 1 - curr_settings_before[IDX_MULTI_SUBJECT])
+        assert_equal(settings.std_settings[IDX_MULTI_SUBJECT], 0)
+
+    def test_spectrum_parameters(self):
+        # Backend and resolution of the spectrum are stored as algorithm parameters
+        _, curr_parameters_before = settings.get_parameters()
+        settings.change_parameters(IDX_SPECTRUM_BACKEND, 1)
+        settings.change_parameters(IDX_SPECTRUM_RESOLUTION, 0.05)
+        _, curr_parameters_after = settings.get_parameters()
+        settings.change_parameters(IDX_SPECTRUM_BACKEND, curr_parameters_before[IDX_SPECTRUM_BACKEND])
+        settings.change_parameters(IDX_SPECTRUM_RESOLUTION, curr_parameters_before[IDX_SPECTRUM_RESOLUTION])
+        assert_equal(spectrum.SPECTRUM_BACKENDS[int(curr_parameters_after[IDX_SPECTRUM_BACKEND])], 'sliding_dft')
+        assert_equal(curr_parameters_after[IDX_SPECTRUM_RESOLUTION], 0.05)
+        assert_equal(len(spectrum.SPECTRUM_BACKENDS), len(LABEL_SPECTRUM_BACKEND))
+
     def test_determine_if_under_testing(self):
         # Check if currently under testing
         assert_true(settings.determine_if_under_testing())
@@ -4,11 +4,13 @@
 
 import nose
 import numpy as np
+import clock
 import settings
 import time
 
 from defines import *
 from signal_processing import SignalProcessor
+from ring_buffer import RingBuffer
 from nose.tools import assert_is_instance, assert_false, assert_equal, assert_almost_equal, assert_true
 
 
@@ -44,6 +46,16 @@ class Test(object):
         """Test if normalization returns correct object class"""
         assert_is_instance(self.signal_processor.normalize(np.random.rand(100)), np.ndarray)
 
+    def test_normalize_ring_buffer(self):
+        """Normalization of a RingBuffer should be identical to the normalization of the equivalent array"""
+
+        ring_buffer = RingBuffer(100)
+        for value in np.random.rand(150):
+            ring_buffer.append(value)
+
+        assert_true(np.array_equal(self.signal_processor.normalize(ring_buffer),
+                                   self.signal_processor.normalize(np.copy(ring_buffer.get()))))
+
     def test_nextpow2(self):
         """Check if nextpow2 returns correct value"""
         assert_equal(self.signal_processor.nextpow2(100), 128)
@@ -111,6 +123,89 @@ class Test(object):
 
         assert_true(ret_1)
 
+    def test_without_serial_interface(self):
+        """Without serial interface, triggers are detected but not sent"""
+
+        signal_processor = SignalProcessor(use_serial_interface=False)
+        assert_equal(signal_processor.serial_interface, None)
+
+        time.sleep(0.2)
+        test_signal = np.random.rand(100)
+        ret_1, ret_2 = signal_processor.filter_waveform(test_signal, np.zeros(100), 10, 2, 0.1)
+        ret_1, ret_2 = signal_processor.filter_waveform(test_signal, ret_2, 10, 2, 0.1)
+        ret_1, ret_2 = signal_processor.filter_waveform(test_signal, ret_2, 10, 2, 0.1)
+        assert_true(ret_1)
+
+        signal = np.sin(2 * np.pi * 1.2 * np.arange(400) / 25.0) + 2
+        assert_almost_equal(signal_processor.estimate_trigger(signal, 25.0, 50)[0], 72, delta=2)
+        signal_processor.clear()
+
+    def test_filter_waveform_slope(self):
+        """The filtered value should match the curve fit of the normalized and derived signal"""
+
+        for n in range(0, 25):
+            param_1 = np.random.randint(10) + 2
+            yield self.filter_waveform_slope, np.random.rand(100), param_1
+
+    def filter_waveform_slope(self, signal, param_1):
+        """Called by generators in test_filter_waveform_slope"""
+
+        # Reference: Curve fit of the whole pipeline
+        values_norm_diff = np.abs(np.diff(self.signal_processor.normalize(signal)))
+        reference = self.signal_processor._SignalProcessor__curve_fit(np.linspace(0, 1, param_1),
+                                                                      values_norm_diff[-param_1:])
+
+        _, ret_2 = self.signal_processor.filter_waveform(signal, np.zeros(1), param_1, 3, np.inf)
+        assert_almost_equal(ret_2[-1], reference[0])
+
+    def test_filter_waveform_ring_buffer_slope(self):
+        """Streaming updates of a RingBuffer should give the same values as the whole signal"""
+
+        param_1 = 9
+        signal = np.random.rand(300)
+        raw_buffer = RingBuffer(100)
+        output_buffer = RingBuffer(100)
+
+        for num in range(0, np.size(signal)):
+            raw_buffer.append(signal[num])
+            self.signal_processor.filter_waveform(raw_buffer, output_buffer, param_1, 3, np.inf)
+
+        values_norm_diff = np.abs(np.diff(self.signal_processor.normalize(signal[-100:])))
+        reference = self.signal_processor._SignalProcessor__curve_fit(np.linspace(0, 1, param_1),
+                                                                      values_norm_diff[-param_1:])
+        assert_almost_equal(output_buffer.get()[-1], reference[0])
+
+    def test_filter_waveform_swapped_ring_buffer(self):
+        """Another RingBuffer with the same number of values must not use the curve fit of the previous buffer"""
+
+        param_1 = 9
+        raw_buffer_1 = RingBuffer(100)
+        raw_buffer_2 = RingBuffer(100)
+        output_buffer = RingBuffer(100)
+
+        for value in np.random.rand(50):
+            raw_buffer_1.append(value)
+            self.signal_processor.filter_waveform(raw_buffer_1, output_buffer, param_1, 3, np.inf)
+
+        signal = np.random.rand(50)
+        for value in signal:
+            raw_buffer_2.append(value)
+        self.signal_processor.filter_waveform(raw_buffer_2, output_buffer, param_1, 3, np.inf)
+
+        values_norm_diff = np.abs(np.diff(self.signal_processor.normalize(raw_buffer_2.get())))
+        reference = self.signal_processor._SignalProcessor__curve_fit(np.linspace(0, 1, param_1),
+                                                                      values_norm_diff[-param_1:])
+        assert_almost_equal(output_buffer.get()[-1], reference[0])
+
+    def test_filter_waveform_sigma_zero(self):
+        """Standard deviation 0 (standard value of the settings) disables the weights"""
+
+        signal = np.random.rand(100)
+        _, ret_1 = self.signal_processor.filter_waveform(signal, np.zeros(100), 9, 3, np.inf, 0)
+        assert_equal(self.signal_processor.slope_estimator.sigma, None)
+        _, ret_2 = self.signal_processor.filter_waveform(signal, np.zeros(100), 9, 3, np.inf)
+        assert_almost_equal(ret_1[-1], ret_2[-1])
+
     def test_filter_waveform_return_true(self):
 
         # Create random input signal
@@ -129,6 +224,39 @@ class Test(object):
         assert_true(ret_1)
         assert_is_instance(ret_2, np.ndarray)
 
+    def test_filter_waveform_virtual_clock(self):
+        """With the virtual clock, the minimum time between triggers refers to the time of the frames, so the results
+        do not depend on the processing speed"""
+
+        fps = 25.0
+        signal = np.cos(2 * np.pi * 1.2 * np.arange(600) / fps) + 0.1 * np.random.rand(600)
+
+        triggers = []
+        for num in range(0, 2):
+            clock.use_virtual_clock()
+            signal_processor = SignalProcessor()
+
+            try:
+                raw_buffer = RingBuffer(100)
+                output_buffer = RingBuffer(100)
+                frames_with_trigger = []
+
+                for num_value, value in enumerate(signal):
+                    clock.advance(1 / fps)
+                    raw_buffer.append(value)
+                    if signal_processor.filter_waveform(raw_buffer, output_buffer, 9, 3, 0.5)[0]:
+                        frames_with_trigger.append(num_value)
+
+                triggers.append(frames_with_trigger)
+
+            finally:
+                signal_processor.clear()
+                clock.use_real_time_clock()
+
+        assert_true(len(triggers[0]) > 0)
+        assert_equal(triggers[0], triggers[1])
+        assert_true(np.all(np.diff(triggers[0]) > 0.5 * fps))
+
     def test_compute_heart_rate_frequency(self):
         """Test if HR is computed correctly"""
 
@@ -196,6 +324,136 @@ class Test(object):
         else:
             assert_almost_equal(self.signal_processor.delta, np.abs(phase / (2 * np.pi)))
 
+    def test_compute_heart_rate_ring_buffer(self):
+        """Test if a RingBuffer gives the same result as the equivalent numpy array"""
+
+        # Fill ring buffer with more values than it can hold
+        ring_buffer = RingBuffer(400)
+        signal = np.cos(2 * np.pi * np.arange(500) * 0.1) + np.random.rand(500)
+        for value in signal:
+            ring_buffer.append(value)
+
+        ret_array = self.signal_processor.compute_heart_rate(signal[-400:], 10)
+        ret_buffer = self.signal_processor.compute_heart_rate(ring_buffer, 10)
+
+        assert_equal(ret_array[0], ret_buffer[0])
+        assert_true(np.array_equal(ret_array[1], ret_buffer[1]))
+
+    def test_sliding_dft_backend(self):
+        """Test if the sliding DFT gives the same results as the FFT while values are appended"""
+
+        ring_buffer = RingBuffer(400)
+        signal_processor_fft = self.signal_processor
+        signal_processor_fft.spectrum_backend = 'fft'
+        signal_processor_sdft = SignalProcessor()
+        signal_processor_sdft.spectrum_backend = 'sliding_dft'
+
+        try:
+            for value in np.cos(2 * np.pi * np.arange(600) * 0.1) + np.random.rand(600):
+                ring_buffer.append(value)
+                ret_fft = signal_processor_fft.compute_heart_rate(ring_buffer, 10)
+                ret_sdft = signal_processor_sdft.compute_heart_rate(ring_buffer, 10)
+
+                assert_true(np.allclose(ret_fft[1], ret_sdft[1]))
+
+            assert_equal(ret_fft[0], ret_sdft[0])
+
+            ret_fft = signal_processor_fft.estimate_trigger(ring_buffer, 10, 1)
+            ret_sdft = signal_processor_sdft.estimate_trigger(ring_buffer, 10, 1)
+
+            assert_equal(ret_fft[0], ret_sdft[0])
+            assert_almost_equal(signal_processor_fft.delta, signal_processor_sdft.delta)
+        finally:
+            signal_processor_sdft.clear()
+
+    def test_compute_heart_rate_with_peak_interpolation(self):
+        """Test if HR between two frequencies of the spectrum is found with peak interpolation"""
+
+        signal = np.cos(2 * np.pi * 1.23 * np.arange(400) / 25.0)
+
+        # Bins of the spectrum without zero padding are 0.0625 Hz apart, the nearest one is 75 bpm
+        _, curr_parameters = settings.get_parameters()
+        settings.change_parameters(IDX_ZERO_PADDING, 0)
+        try:
+            ret_bin = self.signal_processor.compute_heart_rate(signal, 25.0)
+            self.signal_processor.peak_interpolation = 'quadratic_log'
+            ret_interpolated = self.signal_processor.compute_heart_rate(signal, 25.0)
+        finally:
+            settings.change_parameters(IDX_ZERO_PADDING, curr_parameters[IDX_ZERO_PADDING])
+
+        assert_equal(ret_bin[0], 75)
+        assert_equal(ret_interpolated[0], 74)
+        assert_equal(ret_bin[3], ret_interpolated[3])
+
+    def test_estimate_trigger_with_peak_interpolation(self):
+        """Test if phase and averaging work with fractional maxima"""
+
+        self.signal_processor.peak_interpolation = 'parabolic'
+        t = np.arange(400) / 25.0
+
+        for n in range(0, 5):
+            hr, spectrum, spectrum_axis, max_val, _ = \
+                self.signal_processor.estimate_trigger(np.cos(2 * np.pi * 1.23 * t) + 2, 25.0, 3)
+
+        assert_equal(hr, 74)
+        assert_is_instance(max_val, int)
+        assert_true(0 < self.signal_processor.delta < 1 / 1.23)
+
+    def test_estimate_trigger_averaging(self):
+        """Test if the position of the maximum is averaged over the last values"""
+
+        t = np.arange(400) / 25.0
+        positions = []
+
+        for frequency in (1.0, 1.1, 1.2, 1.3, 1.4):
+            self.signal_processor.estimate_trigger(np.cos(2 * np.pi * frequency * t) + 2, 25.0, 3)
+            positions.append(self.signal_processor.max_val_list.get_values()[-1])
+
+        statistics = self.signal_processor.get_trigger_statistics()
+
+        assert_almost_equal(statistics['max_val_mean'], np.mean(positions[-3:]))
+        assert_almost_equal(statistics['max_val_variance'], np.var(positions[-3:]))
+
+    def test_estimate_trigger_durations(self):
+        """Test if trigger durations are returned as array of the last 30 values"""
+
+        ret = self.signal_processor.estimate_trigger(np.cos(2 * np.pi * np.arange(400) / 25.0) + 2, 25.0, 3)
+
+        assert_is_instance(ret[4], np.ndarray)
+        assert_equal(np.size(ret[4]), 30)
+        assert_equal(self.signal_processor.get_trigger_statistics()['number_of_triggers'],
+                     np.count_nonzero(ret[4]))
+
+    def test_compute_heart_rate_with_resolution(self):
+        """Test if HR is computed correctly if the band is sampled with a given resolution"""
+
+        self.signal_processor.spectrum_resolution = 1 / 60.0
+
+        t = np.arange(400) / 25.0
+        ret_1, ret_2, ret_3, ret_4 = self.signal_processor.compute_heart_rate(np.cos(2 * np.pi * 1.3 * t), 25.0)
+
+        assert_equal(ret_1, 78)
+        assert_equal(np.size(ret_2), np.size(ret_3))
+
+    def test_compute_heart_rate_uses_spectral_plan_cache(self):
+        """The window, frequency axis and band limits are only computed for the first frame"""
+
+        for num in range(0, 10):
+            self.signal_processor.compute_heart_rate(np.random.rand(400), 25.0)
+
+        statistics = self.signal_processor.spectral_plan_cache.get_statistics()
+        assert_equal(statistics['misses'], 1)
+        assert_equal(statistics['hits'], 9)
+
+    def test_filter_waveform_ring_buffer(self):
+        """Test if the filtered value is appended to a RingBuffer"""
+
+        output_buffer = RingBuffer(100)
+        _, ret_2 = self.signal_processor.filter_waveform(np.random.rand(100), output_buffer, 9, 3, 0.5)
+
+        assert_equal(output_buffer.count, 1)
+        assert_true(np.array_equal(ret_2, output_buffer.get()))
+
     def test_compute_heart_rate_without_zero_padding_data_types(self):
         """Test if data types returned by compute_heart_rate() are valid"""
 
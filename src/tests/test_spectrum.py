@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+# -*- coding: ascii -*-
+"""test_spectrum.py - tests for src/spectrum.py"""
+
+import nose
+import numpy as np
+
+from spectrum import SpectralPlan, SpectralPlanCache, nextpow2, interpolate_peak
+from nose.tools import assert_equal, assert_true, assert_false, assert_almost_equal
+
+
+class Test(object):
+
+    def setUp(self):
+        """Create instance"""
+        self.cache = SpectralPlanCache(max_size=2)
+
+    def test_nextpow2(self):
+        """Check if nextpow2 returns correct value"""
+        assert_equal(nextpow2(400), 512)
+
+    def test_plan(self):
+        """Compare arrays of plan to a direct computation"""
+
+        for fps in (10, 25.0, 30.0, 60.0):
+            for zero_padding in (False, True):
+                yield self.plan, 400, fps, zero_padding
+
+    def plan(self, n, fps, zero_padding):
+        """Called by generators in test_plan"""
+
+        plan = SpectralPlan(n, fps, zero_padding, 0.5, 3)
+
+        if zero_padding:
+            n = nextpow2(nextpow2(n))
+
+        x = np.linspace(0, n / fps, n + 1)
+        freq_axis = np.fft.fftfreq(n, x[1] - x[0])
+        limits = np.nonzero((0.5 < freq_axis) & (3 > freq_axis))[0]
+
+        assert_equal(plan.n, n)
+        assert_true(np.array_equal(plan.window, np.hamming(n)))
+        assert_true(np.array_equal(plan.freq_axis, freq_axis))
+        assert_true(np.array_equal(plan.limits, limits))
+        assert_equal(np.size(plan.pad(np.ones(400))), n)
+
+    def test_band_spectrum(self):
+        """The band spectrum should be equal to the band of the full FFT"""
+
+        for fps in (25.0, 60.0, 120.0):
+            for zero_padding in (False, True):
+                for method in ('rfft', 'dft'):
+                    yield self.band_spectrum, np.random.rand(400), fps, zero_padding, method
+
+    def band_spectrum(self, signal, fps, zero_padding, method):
+        """Called by generators in test_band_spectrum"""
+
+        plan = SpectralPlan(np.size(signal), fps, zero_padding, 0.5, 3, method=method)
+        signal_fft = np.fft.fft(plan.pad(signal) * plan.window)
+
+        assert_equal(plan.method, method)
+        assert_true(np.allclose(plan.band_spectrum(signal), signal_fft[plan.limits]))
+
+    def test_band_spectrum_of_columns(self):
+        """The spectra of the columns of a 2-D signal should be equal to the spectra of the single columns"""
+
+        for zero_padding in (False, True):
+            for method in ('rfft', 'dft'):
+                yield self.band_spectrum_of_columns, np.random.rand(400, 5), zero_padding, method
+
+    def band_spectrum_of_columns(self, signals, zero_padding, method):
+        """Called by generators in test_band_spectrum_of_columns"""
+
+        plan = SpectralPlan(np.size(signals, 0), 25.0, zero_padding, 0.5, 3, method=method)
+        spectra = plan.band_spectrum(signals)
+
+        assert_equal(spectra.shape, (np.size(plan.freq_axis_band), 5))
+        for column in range(0, 5):
+            assert_true(np.allclose(spectra[:, column], plan.band_spectrum(signals[:, column])))
+
+    def test_band_spectrum_with_resolution(self):
+        """The band can be sampled with an arbitrary resolution"""
+
+        fps = 25.0
+        t = np.arange(400) / fps
+        plan = SpectralPlan(400, fps, False, 0.5, 3, resolution=0.01)
+
+        # Peak of a sinusoid between two FFT bins
+        max_val = np.argmax(np.abs(plan.band_spectrum(np.cos(2 * np.pi * 1.23 * t))))
+
+        assert_equal(plan.method, 'dft')
+        assert_almost_equal(plan.freq_axis_band[max_val], 1.23, delta=0.01)
+
+    def test_interpolate_peak(self):
+        """The interpolated frequency of a sinusoid between two bins should be more accurate than the bin"""
+
+        for method, tolerance in (('parabolic', 0.01), ('quadratic_log', 0.002), ('jacobsen', 0.01)):
+            for frequency in (1.0, 1.23, 1.27, 2.05):
+                yield self.interpolate_peak, method, tolerance, frequency
+
+    def interpolate_peak(self, method, tolerance, frequency):
+        """Called by generators in test_interpolate_peak"""
+
+        fps = 25.0
+        plan = SpectralPlan(400, fps, False, 0.5, 3)
+        signal_fft_band = plan.band_spectrum(np.cos(2 * np.pi * frequency * np.arange(400) / fps + 0.4))
+        max_val = np.argmax(np.abs(signal_fft_band))
+
+        offset = interpolate_peak(signal_fft_band, max_val, method)
+
+        assert_true(-0.5 <= offset <= 0.5)
+        assert_almost_equal(plan.band_frequency(max_val + offset), frequency, delta=tolerance)
+
+    def test_interpolate_peak_without_neighbors(self):
+        """Maxima at the border of the band and disabled interpolation are not modified"""
+
+        signal_fft_band = np.array([3, 2, 1, 2], dtype=complex)
+
+        assert_equal(interpolate_peak(signal_fft_band, 0, 'parabolic'), 0)
+        assert_equal(interpolate_peak(signal_fft_band, 2, None), 0)
+        assert_equal(interpolate_peak(np.zeros(4), 1, 'quadratic_log'), 0)
+
+    def test_spectrum_at(self):
+        """The spectrum at an integer position should be equal to the band spectrum"""
+
+        for zero_padding in (False, True):
+            for resolution in (None, 0.01):
+                signal = np.random.rand(400)
+                plan = SpectralPlan(400, 25.0, zero_padding, 0.5, 3, resolution=resolution)
+                yield self.spectrum_at, plan, signal
+
+    def spectrum_at(self, plan, signal):
+        """Called by generators in test_spectrum_at"""
+        assert_almost_equal(plan.spectrum_at(signal, 5), plan.band_spectrum(signal)[5])
+
+    def test_band_frequency(self):
+        """Fractional positions lie between the frequencies of the band"""
+
+        plan = SpectralPlan(400, 25.0, False, 0.5, 3)
+
+        assert_equal(plan.band_frequency(3), plan.freq_axis_band[3])
+        assert_almost_equal(plan.band_frequency(3.5), np.mean(plan.freq_axis_band[3:5]))
+
+    def test_cache_hits_and_misses(self):
+        """Plans are only computed once"""
+
+        plan_1 = self.cache.get(400, 25.0, False, 0.5, 3)
+        plan_2 = self.cache.get(400, 25.0, False, 0.5, 3)
+
+        assert_true(plan_1 is plan_2)
+        assert_equal(self.cache.get_statistics(), {'hits': 1, 'misses': 1, 'size': 1})
+
+    def test_cache_size_is_bounded(self):
+        """The least recently used plan is removed"""
+
+        self.cache.get(400, 25.0, False, 0.5, 3)
+        self.cache.get(400, 25.0, True, 0.5, 3)
+        self.cache.get(400, 25.0, False, 0.5, 3)
+        self.cache.get(400, 30.0, False, 0.5, 3)
+
+        assert_equal(self.cache.get_statistics()['size'], 2)
+        assert_false((400, 25.0, True, 0.5, 3, None, None) in self.cache.plans)
+
+    def test_cache_clear(self):
+        """All plans are removed"""
+        self.cache.get(400, 25.0, False, 0.5, 3)
+        self.cache.clear()
+        assert_equal(self.cache.get_statistics()['size'], 0)
+
+
+if __name__ == '__main__':
+    nose.main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+# -*- coding: ascii -*-
+"""test_streaming.py - tests for src/streaming.py"""
+
+import nose
+import numpy as np
+
+from streaming import SlidingDFTBank, SlidingSlopeEstimator, SlidingExtrema, StreamingNormalizer
+from spectrum import SpectralPlan
+from ring_buffer import RingBuffer
+from nose.tools import assert_equal, assert_almost_equal, assert_raises, assert_true
+
+
+class Test(object):
+
+    def test_slope_estimator_push(self):
+        """The slope of the sliding window should match np.polyfit"""
+
+        for n in range(0, 25):
+            window_size = np.random.randint(20) + 2
+            yield self.slope_estimator_push, window_size, np.random.rand(200)
+
+    def slope_estimator_push(self, window_size, signal):
+        """Called by generators in test_slope_estimator_push"""
+
+        estimator = SlidingSlopeEstimator(window_size, resync_interval=50)
+
+        for value in signal:
+            slope = estimator.push(value)
+
+        reference = np.polyfit(np.linspace(0, 1, window_size), signal[-window_size:], 1)[0]
+        assert_almost_equal(slope, reference)
+
+    def test_slope_estimator_gaussian_weights(self):
+        """The weighted slope should match np.polyfit with the same weights"""
+
+        window_size = 9
+        sigma = 3.0
+        signal = np.random.rand(50)
+
+        estimator = SlidingSlopeEstimator(window_size, sigma)
+        slope = estimator.fill(signal)
+
+        weights = np.exp(-0.5 * ((np.arange(window_size) - (window_size - 1)) / sigma) ** 2)
+        reference = np.polyfit(np.linspace(0, 1, window_size), signal[-window_size:], 1, w=np.sqrt(weights))[0]
+        assert_almost_equal(slope, reference)
+
+    def test_slope_estimator_single_value(self):
+        """A window of one value has no slope"""
+        estimator = SlidingSlopeEstimator(1)
+        assert_equal(estimator.push(5), 0)
+
+    def test_slope_estimator_invalid_window(self):
+        """A window without values can not be created"""
+        assert_raises(ValueError, SlidingSlopeEstimator, 0)
+
+    def test_sliding_extrema(self):
+        """Minimum and maximum should match np.min and np.max of the window"""
+
+        for n in range(0, 25):
+            window_size = np.random.randint(30) + 1
+            yield self.sliding_extrema, window_size, np.random.randint(-10, 10, 200)
+
+    def sliding_extrema(self, window_size, signal):
+        """Called by generators in test_sliding_extrema"""
+
+        extrema = SlidingExtrema(window_size)
+
+        for num in range(0, np.size(signal)):
+            extrema.push(signal[num])
+            window = signal[max(0, num - window_size + 1):num + 1]
+            assert_equal(extrema.get_min(), np.min(window))
+            assert_equal(extrema.get_max(), np.max(window))
+
+    def test_streaming_normalizer(self):
+        """The normalized buffer should be identical to the normalization of the whole window"""
+
+        ring_buffer = RingBuffer(50)
+        normalizer = StreamingNormalizer()
+
+        for value in np.random.rand(120) - 0.2:
+            ring_buffer.append(value)
+            window = ring_buffer.get()
+            reference = (window - np.min(np.abs(window))) / (np.max(np.abs(window)) - np.min(np.abs(window)))
+            assert_true(np.array_equal(normalizer.normalize(ring_buffer), reference))
+
+    def test_streaming_normalizer_shared_result(self):
+        """The result is only computed once per new value"""
+
+        ring_buffer = RingBuffer(50)
+        normalizer = StreamingNormalizer()
+        ring_buffer.append(1)
+
+        ret_1 = normalizer.normalize(ring_buffer)
+        ret_2 = normalizer.normalize(ring_buffer)
+        assert_true(ret_1 is ret_2)
+
+        ring_buffer.append(2)
+        assert_true(normalizer.normalize(ring_buffer) is not ret_1)
+
+    def test_streaming_normalizer_zeros(self):
+        """A buffer containing zeros only is not modified"""
+        assert_equal(np.count_nonzero(StreamingNormalizer().normalize(RingBuffer(10))), 0)
+
+    def test_sliding_dft_bank(self):
+        """The spectrum of the sliding DFT should match the band spectrum of the plan"""
+
+        for zero_padding in (False, True):
+            for resolution in (None, 0.05):
+                yield self.sliding_dft_bank, SpectralPlan(100, 25.0, zero_padding, 0.5, 3, resolution)
+
+    def sliding_dft_bank(self, plan):
+        """Called by generators in test_sliding_dft_bank"""
+
+        ring_buffer = RingBuffer(100)
+        normalizer = StreamingNormalizer()
+        bank = SlidingDFTBank(plan, resync_interval=70)
+
+        for value in np.random.rand(250):
+            ring_buffer.append(value)
+            min_val, max_val = normalizer.get_extrema(ring_buffer)
+            reference = plan.band_spectrum(normalizer.normalize(ring_buffer))
+            assert_true(np.allclose(bank.band_spectrum(ring_buffer, min_val, max_val), reference))
+
+    def test_sliding_dft_bank_without_resync(self):
+        """The recursion stays accurate for many samples"""
+
+        plan = SpectralPlan(100, 25.0, True, 0.5, 3)
+        bank = SlidingDFTBank(plan, resync_interval=np.inf)
+        signal = np.random.rand(5000)
+
+        for value in signal:
+            bank.push(value)
+
+        assert_true(np.allclose(bank.band_spectrum(), plan.band_spectrum(signal[-100:])))
+
+
+if __name__ == '__main__':
+    nose.main()
@@ -6,14 +6,22 @@
 import sys
 sys.path.insert(0, '/usr/lib/pyshared/python2.7')
 
+import cv2
 import nose
 import threading
 import numpy as np
+import os
+import shutil
+import tempfile
+import time
+import clock
 import video
 import settings
 
 from defines import *
-from nose.tools import assert_is_instance, assert_false, assert_equal, assert_true
+from frame_archive import ARCHIVE_EXTENSION, convert_image_folder
+from test_frame_loader import write_video_file
+from nose.tools import assert_is_instance, assert_false, assert_equal, assert_true, assert_almost_equal
 
 
 class Test(object):
@@ -69,6 +77,145 @@ class Test(object):
         # Restore old FPS
         settings.change_settings(IDX_FPS, self.fps_backup)
 
+    def test_read_frames_from_video_file(self):
+        # Store old FPS
+        self.curr_settings, _ = settings.get_parameters()
+        self.fps_backup = self.curr_settings[IDX_FPS]
+
+        # Adjust to FPS of test video
+        settings.change_settings(IDX_FPS, 25)
+
+        # Write video file and store it in video thread, start at the 11th frame
+        directory = tempfile.mkdtemp()
+        file_name = os.path.join(directory, 'video.avi')
+        frames_directory = os.path.join(os.path.dirname(os.path.realpath(__file__)), "test_frames")
+        write_video_file(file_name, [os.path.join(frames_directory, str(num) + ".jpg") for num in range(1, 51)])
+        self.videoThread.store_video_file(file_name, start_frame=10)
+
+        try:
+            # Activate video thread
+            self.videoThread.eventUserPressedStart.set()
+
+            # Wait until thread has finished
+            self.videoThread.join()
+
+        finally:
+            # Restore old FPS
+            settings.change_settings(IDX_FPS, self.fps_backup)
+            shutil.rmtree(directory)
+
+        # Compare number of stored frames and timestamp of last frame
+        assert_equal(self.videoThread.frameCounter, 40)
+        assert_equal(self.videoThread.get_frame_timestamp(), 49 * 40.0)
+
+    def test_read_frames_from_frame_archive(self):
+        # Store old FPS
+        self.curr_settings, _ = settings.get_parameters()
+        self.fps_backup = self.curr_settings[IDX_FPS]
+
+        # Adjust to FPS of test video
+        settings.change_settings(IDX_FPS, 25)
+
+        # Write archive with 20 frames and store it in video thread
+        directory = tempfile.mkdtemp()
+        frames_directory = os.path.join(os.path.dirname(os.path.realpath(__file__)), "test_frames")
+        for num in range(1, 21):
+            shutil.copy(os.path.join(frames_directory, str(num) + ".jpg"), directory)
+        file_name = os.path.join(directory, 'frames' + ARCHIVE_EXTENSION)
+        convert_image_folder(directory, file_name, 25)
+        self.videoThread.store_video_file(file_name)
+
+        try:
+            # Activate video thread
+            self.videoThread.eventUserPressedStart.set()
+
+            # Wait until thread has finished
+            self.videoThread.join()
+
+        finally:
+            # Restore old FPS
+            settings.change_settings(IDX_FPS, self.fps_backup)
+            shutil.rmtree(directory)
+
+        # Compare number of stored frames and timestamp of last frame
+        assert_equal(self.videoThread.frameCounter, 20)
+        assert_equal(self.videoThread.get_frame_timestamp(), 19 * 40.0)
+
+        # Last frame was captured at the time stored in the archive
+        ret, frame, capture_time, sequence_number = self.videoThread.get_timestamped_frame()
+        assert_true(ret)
+        assert_almost_equal(capture_time, 19 * 0.04)
+        assert_equal(sequence_number, 20)
+
+    def helper_damaged_video_file(self, file_name):
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, file_name)
+        with open(path, 'wb') as f:
+            f.write(b'damaged')
+        self.videoThread.store_video_file(path)
+
+        try:
+            self.videoThread.eventUserPressedStart.set()
+            time.sleep(0.5)
+
+            # Thread is still running and waits for the user again
+            assert_true(self.videoThread.is_alive())
+            assert_false(self.videoThread.get_event_camera_ready().is_set())
+            assert_false(self.videoThread.eventUserPressedStart.is_set())
+            assert_equal(self.videoThread.videoFile, None)
+
+        finally:
+            shutil.rmtree(directory)
+
+    def test_damaged_video_file(self):
+        """A video file or archive that can not be opened does not end the thread"""
+        for file_name in ('video.avi', 'frames' + ARCHIVE_EXTENSION):
+            yield self.helper_damaged_video_file, file_name
+
+    def test_free_running_replay(self):
+        # Store old FPS
+        self.curr_settings, _ = settings.get_parameters()
+        self.fps_backup = self.curr_settings[IDX_FPS]
+
+        # Adjust to FPS of test video
+        settings.change_settings(IDX_FPS, 25)
+
+        # Replay 100 frames using the virtual clock
+        clock.use_virtual_clock()
+        self.videoThread.store_frames_from_disk(os.path.join(os.path.dirname(os.path.realpath(__file__)), "test_frames"),
+                                                [str(num) + ".jpg" for num in range(1, 101)])
+
+        try:
+            # Activate video thread
+            start_time = time.time()
+            self.videoThread.eventUserPressedStart.set()
+
+            # Process every frame once, as the signal processing thread does
+            frame_numbers = []
+            frame_times = []
+            capture_times = []
+            while self.videoThread.wait_for_frame(5):
+                frame_numbers.append(self.videoThread.frameCounter)
+                frame_times.append(clock.now())
+                capture_times.append(self.videoThread.get_timestamped_frame()[2])
+                duration = time.time() - start_time
+                self.videoThread.release_frame()
+
+            # Wait until thread has finished
+            self.videoThread.join()
+
+        finally:
+            # Restore old FPS and clock
+            settings.change_settings(IDX_FPS, self.fps_backup)
+            clock.use_real_time_clock()
+
+        # Every frame has been passed once, the virtual clock advances by 1/FPS per frame and replay is faster than
+        # real time (4 seconds). Images of a folder are captured 1/FPS apart.
+        assert_equal(frame_numbers, range(1, 101))
+        assert_true(np.allclose(frame_times, np.arange(100) / 25.0))
+        assert_true(np.allclose(capture_times, np.arange(100) / 25.0))
+        assert_true(duration < 4)
+
     # Test simple getter
 
     def test_get_event_camera_ready(self):
@@ -82,6 +229,224 @@ class Test(object):
         assert_false(ret_1)
         assert_is_instance(ret_2, np.ndarray)
 
+    def test_get_timestamped_frame(self):
+        ret_1, ret_2, ret_3, ret_4 = self.videoThread.get_timestamped_frame()
+        assert_false(ret_1)
+        assert_is_instance(ret_2, np.ndarray)
+        assert_equal(ret_3, None)
+        assert_equal(ret_4, 0)
+
+    def test_frames_are_converted_once(self):
+        # Thread that is not started, frames are published by the test
+        video_thread = video.VideoThread()
+        video_thread.eventVideoReady.set()
+        frame = np.random.randint(0, 256, (48, 64, 3)).astype(np.uint8)
+        video_thread._VideoThread__publish_frame(frame, 1.0)
+
+        # All consumers get the same read-only RGB frame
+        _, frame_1 = video_thread.get_frame()
+        _, frame_2, capture_time, sequence_number = video_thread.get_timestamped_frame()
+        assert_true(frame_1 is frame_2)
+        assert_false(frame_1.flags.writeable)
+        assert_true(np.array_equal(frame_1, frame[:, :, ::-1]))
+        assert_equal((capture_time, sequence_number), (1.0, 1))
+        assert_equal(video_thread.numberOfConversions, 1)
+
+        # A new frame is converted again
+        video_thread._VideoThread__publish_frame(frame, 2.0)
+        _, frame_3 = video_thread.get_frame()
+        assert_false(frame_1 is frame_3)
+        assert_equal(video_thread.numberOfConversions, 2)
+
+    def test_wait_for_new_frame(self):
+        # Thread that is not started, frames are published by the test
+        video_thread = video.VideoThread()
+        frame = np.zeros((48, 64, 3), np.uint8)
+
+        # No new frame
+        assert_false(video_thread.wait_for_new_frame(0, 0.1))
+
+        # New frame is published while waiting
+        timer = threading.Timer(0.1, video_thread._VideoThread__publish_frame, (frame, 1.0))
+        timer.start()
+        assert_true(video_thread.wait_for_new_frame(0, 5))
+        assert_equal(video_thread.sequenceNumber, 1)
+        assert_false(video_thread.wait_for_new_frame(1, 0.1))
+
+    def test_crop_to_roi(self):
+        # Thread that is not started, frames are published by the test
+        video_thread = video.VideoThread()
+        video_thread.eventVideoReady.set()
+        video_thread.cropToROI = True
+        frame = np.random.randint(0, 256, (48, 64, 3)).astype(np.uint8)
+
+        # No ROI: Frame is not cropped
+        video_thread._VideoThread__publish_frame(frame, 1.0)
+        assert_true(video_thread.currentFrame is frame)
+        assert_equal(video_thread.get_crop_offset(), (0, 0))
+
+        # ROI with margin of half its size on each side, the cropped frame is a view of the captured frame
+        video_thread.set_roi(20, 30, 20, 40)
+        video_thread._VideoThread__publish_frame(frame, 2.0)
+        assert_equal(video_thread.get_crop_offset(), (15, 10))
+        assert_true(np.shares_memory(video_thread.currentFrame, frame))
+        _, cropped_frame = video_thread.get_frame()
+        assert_true(np.array_equal(cropped_frame, frame[15:35, 10:50, ::-1]))
+
+        # Margin is restricted to the frame
+        video_thread.set_roi(0, 40, 10, 64)
+        video_thread._VideoThread__publish_frame(frame, 3.0)
+        assert_equal(video_thread.get_crop_offset(), (0, 0))
+        assert_equal(video_thread.currentFrame.shape, (48, 64, 3))
+
+        # Cropping disabled
+        video_thread.cropToROI = False
+        video_thread.set_roi(20, 30, 20, 40)
+        video_thread._VideoThread__publish_frame(frame, 4.0)
+        assert_true(video_thread.currentFrame is frame)
+
+    def test_camera_frames_are_read_into_pool(self):
+        # Store old FPS
+        self.curr_settings, _ = settings.get_parameters()
+        self.fps_backup = self.curr_settings[IDX_FPS]
+        settings.change_settings(IDX_FPS, 50)
+
+        # Video file is used as camera
+        directory = tempfile.mkdtemp()
+        file_name = os.path.join(directory, 'video.avi')
+        frames_directory = os.path.join(os.path.dirname(os.path.realpath(__file__)), "test_frames")
+        write_video_file(file_name, [os.path.join(frames_directory, str(num) + ".jpg") for num in range(1, 21)])
+        expected_frames = []
+        capture = cv2.VideoCapture(file_name)
+        for num in range(20):
+            expected_frames.append(capture.read()[1][:, :, ::-1])
+
+        def open_video_file():
+            video_thread.videoStream = cv2.VideoCapture(file_name)
+
+        video_thread = video.VideoThread()
+        video_thread._VideoThread__open_camera = open_video_file
+
+        try:
+            video_thread.start()
+            video_thread.eventUserPressedStart.set()
+
+            # Consume every frame, frames of the pool are not overwritten while they are in use
+            sequence_number = 0
+            frames = []
+            while video_thread.wait_for_new_frame(sequence_number, 2):
+                _, frame, _, sequence_number = video_thread.get_timestamped_frame()
+                frames.append((sequence_number, frame))
+                if sequence_number == 20:
+                    break
+
+        finally:
+            video_thread.close_camera_thread()
+            settings.change_settings(IDX_FPS, self.fps_backup)
+            shutil.rmtree(directory)
+
+        last_sequence_number, last_frame = frames[-1]
+        assert_equal(last_sequence_number, 20)
+        assert_true(np.array_equal(last_frame, expected_frames[19]))
+
+        # All frames except the first one have been read into at most three buffers
+        statistics = video_thread.get_frame_pool_statistics()
+        assert_true(statistics['capture']['acquisitions'] >= 19)
+        assert_true(statistics['capture']['allocations'] <= 3)
+        assert_equal(statistics['capture']['exhaustions'], 0)
+        assert_true(statistics['conversion']['allocations'] <= 4)
+        assert_equal(statistics['conversion']['exhaustions'], 0)
+
+    def test_frame_buffers_are_released_by_consumers(self):
+        # Thread that is not started, frames are published by the test
+        video_thread = video.VideoThread()
+        video_thread.eventVideoReady.set()
+        frame = np.random.randint(0, 256, (48, 64, 3)).astype(np.uint8)
+
+        # Frame of another thread is kept while the main thread gets new frames
+        video_thread._VideoThread__publish_frame(frame, 1.0)
+        frames_of_thread = []
+        event_finished = threading.Event()
+
+        def consume():
+            frames_of_thread.append(video_thread.get_frame()[1])
+            event_finished.wait(5)
+
+        consumer = threading.Thread(target=consume)
+        consumer.start()
+        while not frames_of_thread:
+            time.sleep(0.01)
+        for num in range(5):
+            video_thread._VideoThread__publish_frame(frame, 2.0 + num)
+            video_thread.get_frame()
+        assert_true(video_thread.conversionPool.is_in_use(frames_of_thread[0]))
+
+        # Frame of the finished thread is released at the next conversion and its buffer is reused
+        event_finished.set()
+        consumer.join()
+        video_thread._VideoThread__publish_frame(frame, 10.0)
+        _, converted_frame = video_thread.get_frame()
+        assert_true(converted_frame is frames_of_thread[0])
+
+        # Buffers were only allocated for the frames in use at the same time
+        video_thread.release_frame_buffer()
+        statistics = video_thread.get_frame_pool_statistics()['conversion']
+        assert_equal(statistics['acquisitions'], 7)
+        assert_equal(statistics['allocations'], 3)
+        assert_equal(statistics['in_use'], 1)
+
+    def test_get_timestamped_roi(self):
+        # Thread that is not started, frames are published by the test
+        video_thread = video.VideoThread()
+        assert_false(video_thread.get_timestamped_roi()[0])
+        video_thread.eventVideoReady.set()
+        frame = np.random.randint(0, 256, (48, 64, 3)).astype(np.uint8)
+        video_thread._VideoThread__publish_frame(frame, 1.0)
+
+        # No ROI: Whole frame
+        ret, roi_frame, capture_time, sequence_number = video_thread.get_timestamped_roi()
+        assert_true(ret)
+        assert_equal(roi_frame.shape, (48, 64, 3))
+        assert_equal((capture_time, sequence_number), (1.0, 1))
+
+        # ROI is a view of the shared RGB frame
+        video_thread.set_roi(10, 20, 5, 45)
+        assert_equal(video_thread.get_roi(), (10, 20, 5, 45))
+        _, roi_frame, _, _ = video_thread.get_timestamped_roi()
+        _, rgb_frame = video_thread.get_frame()
+        assert_true(np.shares_memory(roi_frame, rgb_frame))
+        assert_true(np.array_equal(roi_frame, frame[10:20, 5:45, ::-1]))
+
+        # Frames cropped at capture: ROI is moved by the offset of the frame
+        video_thread.cropToROI = True
+        video_thread._VideoThread__publish_frame(frame, 2.0)
+        _, roi_frame, _, _ = video_thread.get_timestamped_roi()
+        assert_equal(video_thread.get_crop_offset(), (5, 0))
+        assert_true(np.array_equal(roi_frame, frame[10:20, 5:45, ::-1]))
+
+        # ROI outside of frame: Whole frame
+        video_thread.cropToROI = False
+        video_thread.set_roi(100, 120, 5, 45)
+        video_thread._VideoThread__publish_frame(frame, 3.0)
+        _, roi_frame, _, _ = video_thread.get_timestamped_roi()
+        assert_equal(roi_frame.shape, (48, 64, 3))
+
+    def test_missing_settings_file(self):
+        """Settings are all zero while settings.ini is created, the thread is created nevertheless"""
+
+        settings_file = os.path.join(os.path.dirname(os.path.realpath(settings.__file__)), 'settings.ini')
+        os.rename(settings_file, settings_file + '.backup')
+
+        try:
+            video_thread = video.VideoThread()
+            assert_equal(video_thread.FPS, 0)
+            assert_equal(video_thread.get_pacing_statistics(), None)
+        finally:
+            os.rename(settings_file + '.backup', settings_file)
+
+    def test_get_capture_format(self):
+        assert_equal(self.videoThread.get_capture_format(), None)
+
     def test_get_number_of_cameras(self):
         assert_is_instance(self.videoThread.get_number_of_cameras(), int)
 
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding: ascii -*-
+"""benchmark_face_detection.py - frames per second of the video display with face detection off and on
+
+   Usage: cd src; python utilities/benchmark_face_detection.py [folder with frames]
+
+   For every frame, the work of WindowVideo is timed without the Tk display: a copy of the frame and the ROI
+   rectangle, plus the face detection if it is enabled. Face detection is done as before (cascade on the full grayscale
+   frame in every frame), with FaceTracker for several detection intervals and with FaceDetectionWorker. The test
+   frames do not contain a face, so the cascade reports a face in the center of the frame in addition to the faces it
+   finds. Thus the tracker has a face to follow and its cost is included. The worker process uses the cascade of the
+   repository only, the display does not wait for it: the number of frames it has processed is printed.
+"""
+
+import glob
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), os.pardir))
+
+from face_tracking import FaceTracker, CASCADE_SCALE_IMAGE
+from face_worker import FaceDetectionWorker
+
+NUMBER_OF_FRAMES = 200
+DATA_FOLDER = os.path.join(os.path.dirname(os.path.realpath(__file__)), os.pardir, 'data')
+TEST_FRAMES_FOLDER = os.path.join(os.path.dirname(os.path.realpath(__file__)), os.pardir, 'tests', 'test_frames')
+
+
+class CascadeWithFace(object):
+    """Runs the cascade and adds a face in the center of the frame"""
+
+    def __init__(self, cascade):
+        self.cascade = cascade
+
+    def detectMultiScale(self, frame, **kwargs):
+        faces = list(self.cascade.detectMultiScale(frame, **kwargs))
+        height, width = frame.shape[:2]
+        faces.append((width // 3, height // 3, width // 3, height // 3))
+        return np.array(faces)
+
+
+def load_frames(folder):
+    """Returns RGB frames of the folder"""
+    file_names = sorted(glob.glob(os.path.join(folder, '*.jpg')))[:NUMBER_OF_FRAMES]
+    return [cv2.cvtColor(cv2.imread(file_name), cv2.COLOR_BGR2RGB) for file_name in file_names]
+
+
+def display(frame, faces):
+    """Work of the display without face detection"""
+    frame = np.copy(frame)
+    for (x, y, w, h) in faces:
+        cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
+    return frame
+
+
+def measure(frames, find_faces):
+    """Returns frames per second"""
+    start_time = time.time()
+    for frame in frames:
+        display(frame, find_faces(frame))
+    return len(frames) / (time.time() - start_time)
+
+
+def main():
+    folder = TEST_FRAMES_FOLDER
+    if len(sys.argv) > 1:
+        folder = sys.argv[1]
+    frames = load_frames(folder)
+    cascade = CascadeWithFace(cv2.CascadeClassifier(os.path.join(DATA_FOLDER, 'haarcascade_frontalface_default.xml')))
+
+    def full_detection(frame):
+        frame_bw = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
+        return cascade.detectMultiScale(frame_bw, scaleFactor=1.1, minNeighbors=5, minSize=(30, 30),
+                                        flags=CASCADE_SCALE_IMAGE)
+
+    print("%d frames of %dx%d pixels" % (len(frames), np.size(frames[0], 1), np.size(frames[0], 0)))
+    print("%-42s | fps" % "face detection")
+    print("%-42s | %7.1f" % ("off", measure(frames, lambda frame: [(0, 0, 100, 100)])))
+    print("%-42s | %7.1f" % ("on, cascade on full frame in every frame", measure(frames, full_detection)))
+
+    for detection_interval in (1, 5, 10, 20):
+        face_tracker = FaceTracker(cascade, detection_interval=detection_interval)
+        fps = measure(frames, face_tracker.update)
+        statistics = face_tracker.get_statistics()
+        print("%-42s | %7.1f (%d detections)" % ("on, FaceTracker, detection every %d frames" % detection_interval,
+                                                 fps, statistics['detections']))
+
+    # Worker process: the frames are passed with their index as sequence number
+    worker = FaceDetectionWorker()
+    worker.submit(frames[0], -1)
+    while worker.get_faces()[1] != -1:
+        time.sleep(0.01)
+    indices = iter(range(len(frames)))
+
+    def find_faces_in_worker(frame):
+        worker.submit(frame, next(indices))
+        return worker.get_faces()[0]
+
+    fps = measure(frames, find_faces_in_worker)
+    print("%-42s | %7.1f (%d frames processed)" % ("on, FaceDetectionWorker", fps,
+                                                   worker.get_statistics()['results'] - 1))
+    worker.stop()
+
+
+if __name__ == '__main__':
+    main()
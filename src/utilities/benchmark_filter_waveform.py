@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+# -*- coding: ascii -*-
+"""benchmark_filter_waveform.py - compares the cost per sample of the slope computation in filter_waveform()
+
+   Usage: cd src; python utilities/benchmark_filter_waveform.py
+
+   The former implementation normalized and derived the whole history and called np.polyfit() for every new sample.
+   The SlidingSlopeEstimator only updates its running sums, so its cost should not grow with the history length.
+"""
+
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), os.pardir))
+
+from streaming import SlidingSlopeEstimator
+
+WINDOW_SIZE = 9
+REPETITIONS = 2000
+
+
+def batch_slope(signal):
+    """Former implementation: normalize, derive and fit the whole history"""
+    max_val = np.max(np.abs(signal))
+    min_val = np.min(np.abs(signal))
+    values_norm_diff = np.abs(np.diff((signal - min_val) / (max_val - min_val)))
+    return np.polyfit(np.linspace(0, 1, WINDOW_SIZE), values_norm_diff[-WINDOW_SIZE:], 1)[0]
+
+
+def main():
+    print("history length | np.polyfit on history [us/sample] | SlidingSlopeEstimator [us/sample]")
+
+    for history_length in (100, 400, 1600, 6400, 25600):
+        signal = np.random.rand(history_length)
+        estimator = SlidingSlopeEstimator(WINDOW_SIZE)
+        estimator.fill(signal)
+
+        time_batch = timeit.timeit(lambda: batch_slope(signal), number=REPETITIONS)
+        time_streaming = timeit.timeit(lambda: estimator.push(signal[-1]), number=REPETITIONS)
+
+        print("%14d | %33.2f | %33.2f" % (history_length, time_batch / REPETITIONS * 1e6,
+                                          time_streaming / REPETITIONS * 1e6))
+
+
+if __name__ == '__main__':
+    main()
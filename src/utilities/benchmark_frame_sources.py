@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding: ascii -*-
+"""benchmark_frame_sources.py - compares replay of the test frames from a folder, a video file and a frame archive
+
+   Usage: cd src; python utilities/benchmark_frame_sources.py
+
+   The frames of tests/test_frames are converted to a video file (Motion JPEG) and a frame archive in a temporary
+   folder. For every source, all frames are read as fast as possible (without pacing) and the time per frame is
+   printed. The mean value of every frame is computed, so that the pages of the archive are actually read.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import cv2
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), os.pardir))
+
+from frame_archive import convert_image_folder, sort_numbered_files
+from frame_loader import PrefetchingFrameLoader, VideoFileLoader, FrameArchiveLoader
+
+FPS = 25.0
+DIRECTORY = os.path.join(os.path.dirname(os.path.realpath(__file__)), os.pardir, 'tests', 'test_frames')
+
+
+def replay(frame_loader):
+    """Read all frames, returns number of frames and time per frame in ms"""
+
+    number_of_frames = 0
+    start_time = time.time()
+
+    try:
+        while True:
+            cv2.mean(frame_loader.get_frame())
+            number_of_frames += 1
+    except IndexError:
+        pass
+
+    duration = time.time() - start_time
+    frame_loader.close()
+
+    return number_of_frames, duration / max(1, number_of_frames) * 1000
+
+
+def main():
+    files = sort_numbered_files(os.listdir(DIRECTORY))
+    temporary_directory = tempfile.mkdtemp()
+
+    try:
+        # Create video file and archive
+        video_file = os.path.join(temporary_directory, 'video.avi')
+        height, width = cv2.imread(os.path.join(DIRECTORY, files[0])).shape[:2]
+        video_writer = cv2.VideoWriter(video_file, cv2.VideoWriter_fourcc(*'MJPG'), FPS, (width, height))
+        for file_name in files:
+            video_writer.write(cv2.imread(os.path.join(DIRECTORY, file_name)))
+        video_writer.release()
+
+        archive_file = os.path.join(temporary_directory, 'frames.vbcg')
+        convert_image_folder(DIRECTORY, archive_file, FPS)
+
+        print("source                    | frames | time per frame [ms]")
+
+        for name, create_frame_loader in (
+                ("folder (1 thread)", lambda: PrefetchingFrameLoader(DIRECTORY, files, number_of_threads=1)),
+                ("folder (prefetching)", lambda: PrefetchingFrameLoader(DIRECTORY, files)),
+                ("video file", lambda: VideoFileLoader(video_file)),
+                ("frame archive", lambda: FrameArchiveLoader(archive_file))):
+            number_of_frames, time_per_frame = replay(create_frame_loader())
+            print("%-25s | %6d | %19.3f" % (name, number_of_frames, time_per_frame))
+
+    finally:
+        shutil.rmtree(temporary_directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# -*- coding: ascii -*-
+"""benchmark_multi_subject.py - time per frame of MultiSubjectProcessor for different numbers of subjects
+
+   Usage: cd src; python utilities/benchmark_multi_subject.py
+
+   Subjects are placed on a 640x480 frame, every one with its own face box. For every number of subjects, the time of
+   update() (mean values of the faces) and compute() (spectra and HRs of all subjects with one batched FFT) per frame
+   is measured and compared to calling SignalProcessor.compute_heart_rate() once per subject. The cost should grow
+   linearly with the number of subjects, the batched spectra are cheaper than one call per subject.
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), os.pardir))
+
+from multi_subject import MultiSubjectProcessor
+from signal_processing import SignalProcessor
+
+FPS = 25.0
+SIGNAL_LENGTH = 400
+REPETITIONS = 50
+
+
+def create_faces(number_of_subjects):
+    """Boxes of 80x80 pixels on a grid over the frame"""
+    return [(10 + 100 * (num % 6), 10 + 110 * (num // 6), 80, 80) for num in range(number_of_subjects)]
+
+
+def measure(number_of_subjects, batched):
+    """Returns time per frame (in seconds) of update() and the computation of the HRs"""
+
+    processor = MultiSubjectProcessor(FPS, SIGNAL_LENGTH)
+    signal_processor = SignalProcessor(use_serial_interface=False)
+    faces = create_faces(number_of_subjects)
+    frames = [np.random.randint(0, 256, (480, 640, 3)).astype(np.uint8) for num in range(0, 2)]
+
+    def compute():
+        if batched:
+            processor.compute()
+        else:
+            for chain in processor.chains.values():
+                signal_processor.compute_heart_rate(np.copy(chain.values.get()), FPS)
+
+    # Fill signals before timing
+    for num in range(0, SIGNAL_LENGTH):
+        processor.update(frames[num % 2], faces, num / FPS, 1)
+    compute()
+
+    start_time = time.time()
+    for num in range(SIGNAL_LENGTH, SIGNAL_LENGTH + REPETITIONS):
+        processor.update(frames[num % 2], faces, num / FPS, 1)
+        compute()
+    return (time.time() - start_time) / REPETITIONS
+
+
+def main():
+    print("subjects | batched spectra [ms] | compute_heart_rate() per subject [ms]")
+
+    for number_of_subjects in (1, 2, 4, 8, 16):
+        print("%8d | %20.2f | %38.2f" % (number_of_subjects, measure(number_of_subjects, True) * 1000,
+                                         measure(number_of_subjects, False) * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding: ascii -*-
+"""benchmark_offline_analysis.py - compares compute_heart_rate_batch() with a loop over compute_heart_rate()
+
+   Usage: cd src; python utilities/benchmark_offline_analysis.py [duration in minutes]
+
+   A synthetic trace is analyzed with a hop size of one value, i.e. the HR of every frame is computed. The loop is
+   only evaluated for the first minute and extrapolated to the whole trace.
+"""
+
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), os.pardir))
+
+from offline_analysis import compute_heart_rate_batch
+from ring_buffer import RingBuffer
+from signal_processing import SignalProcessor
+
+FPS = 25.0
+SIGNAL_LENGTH = 400
+
+
+def compute_heart_rate_loop(signal_processor, trace):
+    """Per-frame computation as done by the GUI"""
+
+    ring_buffer = RingBuffer(SIGNAL_LENGTH)
+    heart_rates = []
+
+    for value in trace:
+        ring_buffer.append(value)
+        if ring_buffer.count >= SIGNAL_LENGTH:
+            heart_rates.append(signal_processor.compute_heart_rate(ring_buffer, FPS)[0])
+
+    return np.array(heart_rates)
+
+
+def main():
+    duration = float(sys.argv[1]) if len(sys.argv) > 1 else 60
+
+    # Synthetic trace with a slowly changing heart rate
+    t = np.arange(int(duration * 60 * FPS)) / FPS
+    trace = np.cos(2 * np.pi * np.cumsum(1.2 + 0.3 * np.sin(2 * np.pi * t / 300)) / FPS) + np.random.rand(np.size(t))
+
+    signal_processor = SignalProcessor()
+
+    try:
+        trace_loop = trace[:int(60 * FPS) + SIGNAL_LENGTH]
+        time_loop = timeit.timeit(lambda: compute_heart_rate_loop(signal_processor, trace_loop), number=1)
+        time_batch = timeit.timeit(lambda: compute_heart_rate_batch(trace, FPS, 1, SIGNAL_LENGTH), number=1)
+
+        # Compare results of first minute
+        same_results = np.array_equal(compute_heart_rate_loop(signal_processor, trace_loop),
+                                      compute_heart_rate_batch(trace_loop, FPS, 1, SIGNAL_LENGTH)[0])
+    finally:
+        signal_processor.clear()
+
+    number_of_windows = np.size(trace) - SIGNAL_LENGTH + 1
+    print("Trace: %.0f min (%d windows)" % (duration, number_of_windows))
+    print("Loop (extrapolated): %.1f s" % (time_loop / (np.size(trace_loop) - SIGNAL_LENGTH + 1) * number_of_windows))
+    print("Batch: %.1f s" % time_batch)
+    print("Same results: %s" % same_results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: ascii -*-
+"""benchmark_pacing.py - compares pacing of a loop with relative waiting and with DeadlineScheduler
+
+   Usage: cd src; python utilities/benchmark_pacing.py
+
+   A loop with a random amount of work per iteration is paced to 25, 60 and 120 FPS. The relative method is the one
+   VideoThread used before (sleep 1 / FPS minus the duration of the iteration, measured with datetime). For every
+   method, the achieved frame rate, the jitter of the intervals and the drift after all iterations are printed.
+"""
+
+import datetime
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), os.pardir))
+
+from clock import monotonic
+from scheduler import DeadlineScheduler
+
+DURATION = 3.0
+
+
+def do_work(period):
+    """Busy work of up to half a period"""
+    end_time = monotonic() + np.random.uniform(0, 0.5 * period)
+    while monotonic() < end_time:
+        pass
+
+
+def run_relative(fps, number_of_frames):
+    """Former pacing: wait the remainder of 1 / FPS after each iteration"""
+    wake_times = []
+    for num in range(number_of_frames):
+        start_time = datetime.datetime.now()
+        do_work(1.0 / fps)
+        wait_time = 1.0 / fps - (datetime.datetime.now() - start_time).total_seconds()
+        if wait_time > 0:
+            time.sleep(wait_time)
+        wake_times.append(monotonic())
+    return wake_times
+
+
+def run_scheduler(fps, number_of_frames):
+    """Pacing with absolute deadlines"""
+    wake_times = []
+    scheduler = DeadlineScheduler(fps)
+    scheduler.start()
+    for num in range(number_of_frames):
+        do_work(1.0 / fps)
+        scheduler.wait()
+        wake_times.append(monotonic())
+    return wake_times
+
+
+def main():
+    print("FPS | method    | achieved FPS | jitter [ms] | max. deviation [ms] | drift [ms]")
+
+    for fps in (25, 60, 120):
+        number_of_frames = int(DURATION * fps)
+
+        for name, method in (("relative", run_relative), ("scheduler", run_scheduler)):
+            start_time = monotonic()
+            wake_times = np.asarray(method(fps, number_of_frames))
+            intervals = np.diff(np.concatenate(([start_time], wake_times)))
+            drift = wake_times[-1] - (start_time + number_of_frames / float(fps))
+
+            print("%3d | %-9s | %12.2f | %11.3f | %19.3f | %10.1f" %
+                  (fps, name, 1.0 / np.mean(intervals), np.std(intervals) * 1000,
+                   np.max(np.abs(intervals - 1.0 / fps)) * 1000, drift * 1000))
+
+
+if __name__ == '__main__':
+    main()
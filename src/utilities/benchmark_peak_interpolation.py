@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# -*- coding: ascii -*-
+"""benchmark_peak_interpolation.py - compares accuracy and cost of peak interpolation and zero padding
+
+   Usage: cd src; python utilities/benchmark_peak_interpolation.py
+
+   Synthetic sinusoids with random frequency (48..162 bpm), phase and noise are analyzed as in compute_heart_rate().
+   For every method, the mean and maximum absolute error of the estimated HR and the time per analysis are printed.
+   The interpolation methods use the spectrum without zero padding. Frequencies are chosen with some distance to the
+   borders of the band, because maxima at the border can not be interpolated.
+"""
+
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), os.pardir))
+
+from spectrum import SpectralPlan, PEAK_INTERPOLATION_METHODS, interpolate_peak
+
+SIGNAL_LENGTH = 400
+HR_MIN = 0.5
+HR_MAX = 3
+NUMBER_OF_SIGNALS = 500
+NOISE_LEVEL = 0.2
+
+
+def estimate_heart_rate(plan, signal, method):
+    """Spectral analysis of compute_heart_rate() with given peak interpolation"""
+    signal_fft_band = plan.band_spectrum(signal)
+    max_val = np.argmax(abs(signal_fft_band))
+    return plan.band_frequency(max_val + interpolate_peak(signal_fft_band, max_val, method)) * 60
+
+
+def main():
+    print("fps | method          | zero padding | mean error [bpm] | max. error [bpm] | time [us]")
+
+    for fps in (25.0, 60.0):
+
+        # Synthetic signals
+        t = np.arange(SIGNAL_LENGTH) / fps
+        frequencies = np.random.uniform(0.8, 2.7, NUMBER_OF_SIGNALS)
+        phases = np.random.uniform(0, 2 * np.pi, NUMBER_OF_SIGNALS)
+        noise = NOISE_LEVEL * np.random.randn(NUMBER_OF_SIGNALS, SIGNAL_LENGTH)
+        signals = [np.cos(2 * np.pi * f * t + phase) + n for f, phase, n in zip(frequencies, phases, noise)]
+
+        # Zero padding without interpolation, then all interpolation methods without zero padding
+        configurations = [(True, None)] + [(False, method) for method in PEAK_INTERPOLATION_METHODS]
+
+        for zero_padding, method in configurations:
+            plan = SpectralPlan(SIGNAL_LENGTH, fps, zero_padding, HR_MIN, HR_MAX)
+
+            errors = np.abs([estimate_heart_rate(plan, signal, method) - f * 60
+                             for signal, f in zip(signals, frequencies)])
+
+            time = timeit.timeit(lambda: estimate_heart_rate(plan, signals[0], method), number=NUMBER_OF_SIGNALS)
+
+            print("%3d | %-15s | %12s | %16.3f | %16.3f | %9.1f" % (
+                fps, method, zero_padding, np.mean(errors), np.max(errors), time / NUMBER_OF_SIGNALS * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: ascii -*-
+"""benchmark_pulse_map.py - compares the pulse map with a loop over the blocks of the grid
+
+   Usage: cd src; python utilities/benchmark_pulse_map.py
+
+   For grids of 2x2 to 16x16 blocks over a ROI of 240x240 pixels, the time per frame is measured for the loop (cv2.mean
+   of every block and compute_heart_rate() for the signal of every block) and for PulseMap (block means in one pass,
+   spectra of all blocks with one FFT).
+"""
+
+import os
+import sys
+import timeit
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), os.pardir))
+
+from pulse_map import PulseMap
+from ring_buffer import RingBuffer
+from signal_processing import SignalProcessor
+
+FPS = 25.0
+SIGNAL_LENGTH = 400
+REPETITIONS = 20
+
+
+def loop_over_blocks(signal_processor, frame, buffers, rows, columns):
+    """One frame: mean and HR of every block separately"""
+
+    height, width = frame.shape[:2]
+    for row in range(0, rows):
+        for column in range(0, columns):
+            block = frame[row * height // rows:(row + 1) * height // rows,
+                          column * width // columns:(column + 1) * width // columns]
+            buffers[row * columns + column].append(cv2.mean(block)[1])
+
+    return [signal_processor.compute_heart_rate(ring_buffer, FPS)[0] for ring_buffer in buffers]
+
+
+def pulse_map_of_blocks(signal_processor, frame, pulse_map):
+    """One frame: means of all blocks at once and batched spectra"""
+    pulse_map.append(frame, 1)
+    return pulse_map.compute(signal_processor, FPS)
+
+
+def main():
+    signal_processor = SignalProcessor()
+    frame = np.random.randint(0, 256, (240, 240, 3)).astype(np.uint8)
+
+    print("grid  | loop [ms] | pulse map [ms] | speedup")
+
+    for size in (2, 4, 8, 16):
+        buffers = [RingBuffer(SIGNAL_LENGTH) for num in range(size * size)]
+        pulse_map = PulseMap(size, size, SIGNAL_LENGTH)
+
+        # Fill signals before timing
+        for num in range(0, SIGNAL_LENGTH):
+            pulse_map.append(frame, 1)
+            for ring_buffer in buffers:
+                ring_buffer.append(np.random.rand())
+
+        time_loop = timeit.timeit(lambda: loop_over_blocks(signal_processor, frame, buffers, size, size),
+                                  number=REPETITIONS) / REPETITIONS
+        time_map = timeit.timeit(lambda: pulse_map_of_blocks(signal_processor, frame, pulse_map),
+                                 number=REPETITIONS) / REPETITIONS
+
+        print("%2dx%-2d | %9.2f | %14.2f | %7.1f" % (size, size, time_loop * 1000, time_map * 1000,
+                                                     time_loop / time_map))
+
+    signal_processor.clear()
+
+
+if __name__ == '__main__':
+    main()
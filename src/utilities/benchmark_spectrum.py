@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: ascii -*-
+"""benchmark_spectrum.py - compares the spectral analysis of compute_heart_rate() with the former implementation
+
+   Usage: cd src; python utilities/benchmark_spectrum.py
+
+   The former implementation computed window, frequency axis and band limits and a full complex FFT of the zero-padded
+   signal for every frame. Now, a SpectralPlan holds the arrays and only evaluates the band of the spectrum, either by
+   a real FFT or a band-limited DFT. Both methods are timed, 'auto' is the method that SpectralPlan chooses.
+   The column 'sdft' is the time of a SlidingDFTBank to add one value to a RingBuffer and return the band spectrum.
+"""
+
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), os.pardir))
+
+from ring_buffer import RingBuffer
+from spectrum import SpectralPlan, nextpow2, compute_zero_padding_values
+from streaming import SlidingDFTBank
+
+SIGNAL_LENGTH = 400
+HR_MIN = 0.5
+HR_MAX = 3
+REPETITIONS = 2000
+
+
+def former_implementation(signal, fps, zero_padding):
+    """Spectral analysis as it was done in compute_heart_rate() for every frame"""
+
+    n = np.size(signal)
+
+    if zero_padding:
+        next_n = nextpow2(nextpow2(n))
+        number_before, number_after = compute_zero_padding_values(next_n - n)
+        signal = np.concatenate((np.zeros(int(number_before)), signal, np.zeros(int(number_after))), 0)
+        n = next_n
+
+    values_win = signal[0:n] * np.hamming(n)
+    signal_fft = np.fft.fft(values_win)
+
+    x = np.linspace(0, n / fps, n + 1)
+    freq_axis = np.fft.fftfreq(len(values_win), x[1] - x[0])
+
+    limits_bool = (HR_MIN < freq_axis) & (HR_MAX > freq_axis)
+    limits_idx = np.linspace(0, n - 1, n)
+    limits = limits_idx[limits_bool.nonzero()].astype(int)
+
+    max_val = limits[np.argmax(abs(signal_fft[limits]))]
+
+    return freq_axis[max_val], abs(signal_fft[limits]), freq_axis[limits], max_val - limits[0]
+
+
+def plan_implementation(plan, signal):
+    """Spectral analysis with precomputed plan"""
+    spectrum_band = abs(plan.band_spectrum(signal))
+    max_val = np.argmax(spectrum_band)
+    return plan.freq_axis_band[max_val], spectrum_band, plan.freq_axis_band, max_val
+
+
+def sliding_dft_implementation(bank, ring_buffer, value):
+    """Add value and return spectral analysis of sliding DFT"""
+    ring_buffer.append(value)
+    spectrum_band = abs(bank.band_spectrum(ring_buffer))
+    max_val = np.argmax(spectrum_band)
+    return bank.plan.freq_axis_band[max_val], spectrum_band, bank.plan.freq_axis_band, max_val
+
+
+def main():
+    print("fps | zero padding | bins | former [us] | rfft [us] | dft [us] | sdft [us] | auto | same peak | "
+          "max. deviation")
+
+    for fps in (25.0, 60.0, 120.0):
+        for zero_padding in (False, True):
+
+            # Signal with a heart rate of 72 bpm and noise
+            t = np.arange(SIGNAL_LENGTH) / fps
+            signal = np.cos(2 * np.pi * 1.2 * t) + np.random.rand(SIGNAL_LENGTH)
+
+            plan_rfft = SpectralPlan(SIGNAL_LENGTH, fps, zero_padding, HR_MIN, HR_MAX, method='rfft')
+            plan_dft = SpectralPlan(SIGNAL_LENGTH, fps, zero_padding, HR_MIN, HR_MAX, method='dft')
+            plan_auto = SpectralPlan(SIGNAL_LENGTH, fps, zero_padding, HR_MIN, HR_MAX)
+
+            time_former = timeit.timeit(lambda: former_implementation(signal, fps, zero_padding), number=REPETITIONS)
+            time_rfft = timeit.timeit(lambda: plan_implementation(plan_rfft, signal), number=REPETITIONS)
+            time_dft = timeit.timeit(lambda: plan_implementation(plan_dft, signal), number=REPETITIONS)
+
+            ring_buffer = RingBuffer(SIGNAL_LENGTH)
+            bank = SlidingDFTBank(plan_auto)
+            time_sdft = timeit.timeit(lambda: sliding_dft_implementation(bank, ring_buffer, np.random.rand()),
+                                      number=REPETITIONS)
+
+            # Compare results
+            reference = former_implementation(signal, fps, zero_padding)
+            same_peak = True
+            deviation = 0
+            for plan in (plan_rfft, plan_dft):
+                result = plan_implementation(plan, signal)
+                same_peak = same_peak and result[0] == reference[0] and result[3] == reference[3]
+                deviation = max(deviation, np.max(np.abs(result[1] - reference[1])))
+
+            print("%3d | %12s | %4d | %11.1f | %9.1f | %8.1f | %9.1f | %4s | %9s | %.1e" % (
+                fps, zero_padding, np.size(plan_auto.freq_axis_band), time_former / REPETITIONS * 1e6,
+                time_rfft / REPETITIONS * 1e6, time_dft / REPETITIONS * 1e6, time_sdft / REPETITIONS * 1e6,
+                plan_auto.method, same_peak, deviation))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+# -*- coding: ascii -*-
+"""benchmark_startup.py - measures how long the search for cameras delays the start of the program
+
+   Usage: cd src; python utilities/benchmark_startup.py
+
+   The search as it was done in VideoThread.__init__() (probing in the calling thread) is compared to the
+   CameraEnumerator without cache and with a recent cache. For the enumerator, the time until start() returns (i.e.
+   until the GUI can be shown) and the time until the list of cameras is final are printed.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), os.pardir))
+
+from camera_enumeration import CameraEnumerator, probe_camera
+from clock import monotonic
+
+NUMBER_OF_INDICES = 2
+
+
+def probe_in_calling_thread():
+    """Search for cameras that blocks the caller"""
+    for index in range(NUMBER_OF_INDICES):
+        if not probe_camera(index):
+            break
+
+
+def main():
+    temporary_directory = tempfile.mkdtemp()
+    cache_file = os.path.join(temporary_directory, 'cameras.json')
+
+    try:
+        print("method                      | until GUI [ms] | until list is final [ms]")
+
+        start_time = monotonic()
+        probe_in_calling_thread()
+        duration = (monotonic() - start_time) * 1000
+        print("%-27s | %14.1f | %24.1f" % ("probing in calling thread", duration, duration))
+
+        # First start without cache, second start with the cache written by the first one
+        for name in ("enumerator without cache", "enumerator with cache"):
+            start_time = monotonic()
+            camera_enumerator = CameraEnumerator(cache_file, NUMBER_OF_INDICES)
+            camera_enumerator.start()
+            duration_start = (monotonic() - start_time) * 1000
+            camera_enumerator.wait()
+            duration_final = (monotonic() - start_time) * 1000
+            print("%-27s | %14.1f | %24.1f" % (name, duration_start, duration_final))
+
+    finally:
+        shutil.rmtree(temporary_directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+# -*- coding: ascii -*-
+"""convert_frame_archive.py - converts a folder of numbered images or a recording of the GUI to a frame archive
+
+   Usage: cd src; python utilities/convert_frame_archive.py <folder> <archive.vbcg> [fps]
+
+   If no FPS is given, the folder is treated as a recording of the GUI (data/<date>/frame2.jpg, ...): the modification
+   times of the files are stored as timestamps and the FPS is estimated from them. If the modification times are not
+   strictly increasing, the timestamps are computed from the FPS. Frames that have been recorded with "Crop to ROI" are
+   padded with black pixels (bottom and right) to the size of the largest frame. Otherwise, the timestamps are computed
+   from the FPS and all images must have the same size.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), os.pardir))
+
+from frame_archive import FrameArchive, convert_image_folder, convert_recording
+
+
+def main():
+    if len(sys.argv) not in (3, 4):
+        print(__doc__)
+        sys.exit(1)
+
+    directory, file_name = sys.argv[1:3]
+
+    if len(sys.argv) == 4:
+        number_of_frames = convert_image_folder(directory, file_name, float(sys.argv[3]))
+    else:
+        number_of_frames = convert_recording(directory, file_name)
+
+    archive = FrameArchive(file_name)
+    height, width, channels = archive.shape
+    print("%d frames (%d x %d x %d, %.2f fps) written to %s" %
+          (number_of_frames, height, width, channels, archive.fps, file_name))
+    archive.close()
+
+
+if __name__ == '__main__':
+    main()
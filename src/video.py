@@ -3,15 +3,18 @@
 """video.py - tool for reading video from a OpenCV-compatible camera"""
 
 import cv2
+import clock
 import numpy as np
 import logging
 import threading
 import settings
-import time
-import datetime
-import os
 
 from defines import *
+from camera_enumeration import CameraEnumerator, DEFAULT_CACHE_FILE
+from frame_archive import ARCHIVE_EXTENSION
+from frame_loader import PrefetchingFrameLoader, VideoFileLoader, FrameArchiveLoader
+from frame_pool import FramePool
+from scheduler import DeadlineScheduler
 
 
 class VideoThread(threading.Thread):
@@ -31,11 +34,8 @@ class VideoThread(threading.Thread):
         # run() method of cameraThread waits for shutdown event
         while self.eventProgramEnd.is_set() is False:
 
-            # Timer for dynamic FPS adjustment
-            self.startTime = datetime.datetime.now()
-
-            # Check if the user wants to read frames from hard disk or from camera
-            if self.files is not None:
+            # Check if the user wants to read frames from hard disk (folder or video file) or from camera
+            if self.files is not None or self.videoFile is not None:
 
                 # Check if connection has been established
                 if connection_established is False:
@@ -47,9 +47,13 @@ class VideoThread(threading.Thread):
 
                         logging.info("User pressed start and wants to use frames from hard disk")
 
+                        if self.is_free_running():
+                            logging.info("Frames are processed as fast as possible using a virtual clock")
+
                         # Create variable to adjust thread sleeping time to desired FPS
                         self.currSettings, _ = settings.get_parameters()
                         self.FPS = self.currSettings[IDX_FPS]
+                        self.cropToROI = bool(self.currSettings[IDX_CROP])
 
                         # Set event for other threads
                         self.eventVideoReady.set()
@@ -57,19 +61,65 @@ class VideoThread(threading.Thread):
                         # Set bool variable, so that the thread can start to capture frames
                         connection_established = True
 
+                        # Deadlines for FPS adjustment start now
+                        self.__start_scheduler()
+
                 # Continuously capture frames until user ends program
                 if self.eventVideoReady.is_set():
 
+                    # Open video file or archive or start reading frames of folder ahead of time
+                    if self.frameLoader is None:
+                        try:
+                            if self.videoFile is not None and self.videoFile.endswith(ARCHIVE_EXTENSION):
+                                self.frameLoader = FrameArchiveLoader(self.videoFile)
+                            elif self.videoFile is not None:
+                                self.frameLoader = VideoFileLoader(self.videoFile)
+                            else:
+                                self.frameLoader = PrefetchingFrameLoader(self.filesDir, self.files)
+
+                        except IOError as error:
+                            # File has been moved or damaged since it was chosen: No frames, wait for the user again
+                            logging.error("Video file could not be opened: " + str(error))
+                            self.eventVideoReady.clear()
+                            self.eventUserPressedStart.clear()
+                            self.videoFile = None
+                            connection_established = False
+                            continue
+
+                    # Jump to frame of video file if requested
+                    if self.seekRequest is not None and self.videoFile is not None:
+                        try:
+                            self.frameLoader.seek(self.seekRequest)
+                        except IndexError:
+                            logging.error("Frame " + str(self.seekRequest) + " is not in video file.")
+                        self.seekRequest = None
+
                     try:
-                        # Construct file directory and name
-                        curr_file = self.filesDir + os.sep + self.files[self.frameCounter]
+                        # Get frame that has been read ahead or decoded from video file
+                        frame = self.frameLoader.get_frame()
 
-                        # Read frame
-                        self.currentFrame = cv2.imread(curr_file)
+                        # Store timestamp of frame in video file or archive
+                        self.frameTimestamp = self.frameLoader.get_timestamp()
 
                         # Increase counter
                         self.frameCounter += 1
 
+                        # Free-running replay: Advance virtual clock to time of frame
+                        if self.is_free_running() and self.frameCounter > 1:
+                            clock.advance(1.0 / self.FPS)
+
+                        # Provide frame, it was captured at the timestamp of the video file or archive if available.
+                        # Images of a folder have no timestamp, they are 1 / FPS apart.
+                        if self.frameTimestamp is not None:
+                            self.__publish_frame(frame, self.frameTimestamp / 1000.0)
+                        else:
+                            self.__publish_frame(frame, (self.frameCounter - 1) / float(self.FPS))
+
+                        # Free-running replay: Wait until frame is processed
+                        if self.is_free_running():
+                            self.eventFrameAvailable.set()
+                            self.__wait_until_frame_processed()
+
                     except IndexError:
                         # Print info to logging only once
                         if last_file_reached is False:
@@ -77,7 +127,8 @@ class VideoThread(threading.Thread):
                             last_file_reached = True
 
                     # Wait and start from beginning of thread
-                    self.__wait_to_adjust_fps(self.startTime, datetime.datetime.now())
+                    if not self.is_free_running():
+                        self.__wait_to_adjust_fps()
 
             # If the user did not choose frames from hard disk, use camera instead
             else:
@@ -92,9 +143,14 @@ class VideoThread(threading.Thread):
 
                         logging.info("User pressed start and wants to use the camera")
 
+                        # Frames of a camera arrive in real time, the virtual clock is only advanced during replay
+                        if clock.is_virtual():
+                            logging.warn("Free-running mode is only possible with frames from hard disk")
+
                         # Create variable to adjust thread sleeping time to desired FPS
                         self.currSettings, _ = settings.get_parameters()
                         self.FPS = self.currSettings[IDX_FPS]
+                        self.cropToROI = bool(self.currSettings[IDX_CROP])
 
                         # Open connection to camera
                         self.__open_camera()
@@ -105,28 +161,52 @@ class VideoThread(threading.Thread):
                         # Set bool variable, so that the thread can start to capture frames
                         connection_established = True
 
-                        # Timer for dynamic FPS adjustment
-                        self.startTime = datetime.datetime.now()
+                        # Deadlines for FPS adjustment start now
+                        self.__start_scheduler()
 
                 # Continuously capture frames until user ends program
                 if self.eventVideoReady.is_set():
 
-                    # Read frame
-                    ret, self.currentFrame = self.videoStream.read()
+                    # Read frame into a buffer of the pool (once the size of the frames is known) and store time of
+                    # capture
+                    buffer = None
+                    if self.captureShape is not None:
+                        buffer = self.capturePool.acquire(self.captureShape)
+                    ret, frame = self.videoStream.read(buffer)
+
+                    # Driver has allocated a new frame, e.g. because its size has changed
+                    if ret and frame is not buffer:
+                        self.capturePool.release(buffer)
+                        buffer = None
+                        self.captureShape = frame.shape
+
+                    if ret:
+                        if self.captureFormatVerified is False:
+                            self.__verify_capture_format(frame)
+                        self.__publish_frame(frame, clock.now(), buffer)
+                    else:
+                        self.capturePool.release(buffer)
 
-                # Wait and start from beginning of thread
-                self.__wait_to_adjust_fps(self.startTime, datetime.datetime.now())
+                    # Wait and start from beginning of thread
+                    self.__wait_to_adjust_fps()
 
             # Break if last file is reached
             if last_file_reached:
                 break
 
         # Shutdown reached: Close connection to camera if it was used
-        if self.files is None:
+        if self.files is None and self.videoFile is None:
             self.__close_camera()
 
+        # Stop reading frames from hard disk
+        if self.frameLoader is not None:
+            self.frameLoader.close()
+
     def __init__(self):
-        """ Initialization of class. The system is scanned for OpenCV compatible cameras and variables are set """
+        """ Initialization of class. The scan for OpenCV compatible cameras is started and variables are set """
+
+        # Measure duration of initialization
+        init_start_time = clock.monotonic()
 
         # Thread initialization
         threading.Thread.__init__(self)
@@ -148,39 +228,83 @@ class VideoThread(threading.Thread):
         self.FPS = self.currSettings[IDX_FPS]
 
         # Initialize variables
-        self.videoStream = self.startTime = None
+        self.videoStream = None
+
+        # Paces reading of frames to the FPS with absolute deadlines (see scheduler.py). It is created when the user
+        # presses start, the FPS in the settings may not be valid before (e.g. settings.ini has just been created).
+        self.scheduler = None
 
         # A black frame that is displayed until the user has started the program
         self.currentFrame = np.zeros((480, 640, 3), np.uint8)
 
+        # Current frame with capture time (in seconds, see clock.py) and sequence number, stored as one tuple so that
+        # they always belong together. The condition is notified when a new frame is available.
+        self.sequenceNumber = 0
+        self.currentFrameInfo = (self.currentFrame, None, 0)
+        self.frameCondition = threading.Condition()
+
+        # Sequence number and RGB version of the current frame that is shared by all consumers, i.e. every frame is
+        # converted at most once
+        self.convertedFrameInfo = None
+        self.numberOfConversions = 0
+
+        # Reusable buffers for frames of the camera and for RGB frames (see frame_pool.py), size of camera frames, pool
+        # buffer of current camera frame, and RGB frame that every consumer thread got last. A consumer holds a
+        # reference to its frame until it gets the next one or calls release_frame_buffer().
+        self.capturePool = FramePool(3)
+        self.conversionPool = FramePool(4)
+        self.captureShape = None
+        self.currentBuffer = None
+        self.consumerFrames = {}
+
+        # Capture format (width, height, FPS) that the camera actually delivers, and whether the size of the first
+        # frame has been compared with it
+        self.captureFormat = None
+        self.captureFormatVerified = False
+
+        # ROI set by the GUI (x: rows, y: columns of the full frame), stored as one tuple so that other threads always
+        # get a consistent snapshot
+        self.roi = None
+
+        # Crop frames to the ROI directly after capture: margin around the ROI (relative to its size) and offset (row,
+        # column) of the current frame in the full frame
+        self.cropToROI = bool(self.currSettings[IDX_CROP])
+        self.cropMargin = 0.5
+        self.cropOffset = (0, 0)
+
         # If the user wants to read frames from the hard disk, the directory and file names are stored here
         self.filesDir = None
         self.files = None
 
+        # If the user wants to read frames from a video file, the file name is stored here
+        self.videoFile = None
+
+        # Index of frame of video file that should be read next, None if the frames are read sequentially
+        self.seekRequest = None
+
+        # Timestamp of current frame in video file (in ms)
+        self.frameTimestamp = None
+
         # A counter of loaded frames, used for loading frames from hard disk
         self.frameCounter = 0
 
-        # During init, the cameras available are counted (idea from http://stackoverflow.com/a/30384945)
-        # apparently there is still no clean OpenCV-based solution (https://github.com/opencv/opencv/issues/4269)
-        self.numberOfCameras = 0
-
-        for i in range(2):
-            cap = None
-            try:
-                cap = cv2.VideoCapture(i)
-                ret, frame = cap.read()
-                cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                cap.release()
-                cv2.destroyAllWindows()
-                self.numberOfCameras += 1
-            except:
-                if cap is not None:
-                    cap.release()
-                    cv2.destroyAllWindows()
-                break
+        # Reads frames from hard disk ahead of time
+        self.frameLoader = None
 
-            tmp_str = "Found " + str(self.numberOfCameras) + " OpenCV-compatible cameras"
-            logging.info(tmp_str)
+        # Free-running replay: Events for passing every frame to the processing thread
+        self.eventFrameAvailable = threading.Event()
+        self.eventFrameProcessed = threading.Event()
+
+        # The cameras available are counted in the background, so that the GUI can start immediately. Until then,
+        # the cameras found at the last start are used. Tests do not use the cache.
+        if settings.determine_if_under_testing():
+            self.cameraEnumerator = CameraEnumerator(None)
+        else:
+            self.cameraEnumerator = CameraEnumerator(DEFAULT_CACHE_FILE)
+        self.cameraEnumerator.start()
+
+        self.initDuration = clock.monotonic() - init_start_time
+        logging.info("Video thread was initialized in %.1f ms" % (self.initDuration * 1000))
 
     def get_frame(self):
         """This function delivers frames from the camera or the hard disk for the GUI
@@ -193,11 +317,9 @@ class VideoThread(threading.Thread):
         # Waiting for the user to press the ''start'' button
         if self.eventVideoReady.is_set():
 
-                # Read current frame from thread
-                frame = self.currentFrame
-
-                # Convert color to RGB
-                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                # Read current frame from thread, converted to RGB (read-only and shared with other threads). The frame
+                # stays valid until this thread gets the next one or calls release_frame_buffer().
+                frame, _, _ = self.__get_converted_frame()
 
                 # Return status and frame
                 return True, frame
@@ -206,18 +328,218 @@ class VideoThread(threading.Thread):
             # Return false as status and black frame
             return False, np.zeros((480, 640, 3), np.uint8)
 
-    def __wait_to_adjust_fps(self, start_time, end_time):
-        # Compute difference to desired FPS
-        self.diffTime = (end_time - start_time).total_seconds()
-        self.waitTime = 1.0 / self.FPS - self.diffTime
-        # If thread was too fast, wait
-        if self.waitTime > 0:
-            time.sleep(self.waitTime)
+    def get_timestamped_frame(self):
+        """Like get_frame(), but also returns capture time (in seconds, see clock.py) and sequence number of the frame.
+           Sequence numbers increase by one per captured frame, so consumers can skip frames they have already seen and
+           gaps show frames they have missed.
+        """
+
+        if self.eventVideoReady.is_set():
+            frame, capture_time, sequence_number = self.__get_converted_frame()
+            return True, frame, capture_time, sequence_number
+
+        return False, np.zeros((480, 640, 3), np.uint8), None, 0
+
+    def get_timestamped_roi(self):
+        """Like get_timestamped_frame(), but the frame is restricted to the ROI (see set_roi()). The ROI is a view of the
+           frame, i.e. no pixels are copied and the cost of processing it depends on the size of the ROI only. The
+           whole frame is returned if no valid ROI has been set.
+        """
+
+        if not self.eventVideoReady.is_set():
+            return False, np.zeros((480, 640, 3), np.uint8), None, 0
+
+        # ROI and crop offset belong to the same frame
+        with self.frameCondition:
+            frame, capture_time, sequence_number = self.__get_converted_frame()
+            slices = self.__get_roi_slices(self.roi, self.cropOffset, frame.shape)
+
+        if slices is not None:
+            frame = frame[slices]
+
+        return True, frame, capture_time, sequence_number
+
+    def wait_for_new_frame(self, last_sequence_number, timeout):
+        """Wait until a frame with a sequence number other than last_sequence_number is available, returns False if
+           there is none after timeout seconds (of the monotonic clock, so jumps of the system time do not matter)
+        """
+
+        end_time = clock.monotonic() + timeout
+
+        with self.frameCondition:
+            while self.sequenceNumber == last_sequence_number:
+                remaining_time = end_time - clock.monotonic()
+                if remaining_time <= 0:
+                    return False
+                self.frameCondition.wait(remaining_time)
+
+        return True
+
+    def __publish_frame(self, frame, capture_time, buffer=None):
+        """Provide new frame to other threads. If the frame has been read into a buffer of the capture pool, the buffer
+           is released when the next frame is provided.
+        """
+
+        # Crop to ROI, the view avoids a copy and all following steps only handle the cropped frame
+        crop_offset = (0, 0)
+        if self.cropToROI:
+            frame, crop_offset = self.__crop_frame(frame)
+
+        with self.frameCondition:
+            self.capturePool.release(self.currentBuffer)
+            self.currentBuffer = buffer
+            self.cropOffset = crop_offset
+            self.sequenceNumber += 1
+            self.currentFrameInfo = (frame, capture_time, self.sequenceNumber)
+            self.currentFrame = frame
+            self.frameCondition.notify_all()
+
+    def __crop_frame(self, frame):
+        """Returns view of the frame that contains the ROI and a margin around it, and offset (row, column) of the view.
+           The frame is not cropped if no valid ROI has been set.
+        """
+
+        slices = self.__get_roi_slices(self.roi, (0, 0), frame.shape, self.cropMargin)
+        if slices is None:
+            return frame, (0, 0)
+
+        return frame[slices], (slices[0].start, slices[1].start)
+
+    def __get_roi_slices(self, roi, offset, shape, margin=0.0):
+        """Returns slices of rows and columns of a frame that contain the ROI and a margin around it (relative to the
+           size of the ROI), None if the ROI is not set or does not overlap with the frame
+
+           roi: ROI in coordinates of the full frame
+           offset: Position (row, column) of the frame in the full frame
+           shape: Shape of the frame
+        """
+
+        if roi is None:
+            return None
+
+        x_min, x_max, y_min, y_max = roi
+        margin_x = int(margin * (x_max - x_min))
+        margin_y = int(margin * (y_max - y_min))
+
+        # Coordinates of frame, restricted to frame
+        x_min = max(0, x_min - margin_x - offset[0])
+        x_max = min(shape[0], x_max + margin_x - offset[0])
+        y_min = max(0, y_min - margin_y - offset[1])
+        y_max = min(shape[1], y_max + margin_y - offset[1])
+
+        if x_min >= x_max or y_min >= y_max:
+            return None
+
+        return slice(x_min, x_max), slice(y_min, y_max)
+
+    def __get_converted_frame(self):
+        """Returns current frame converted to RGB, its capture time and its sequence number. The frame is converted
+           for the first consumer only, all consumers get the same read-only array. The calling thread holds a
+           reference to the frame until it gets the next one.
+        """
+
+        with self.frameCondition:
+            frame, capture_time, sequence_number = self.currentFrameInfo
+
+            if self.convertedFrameInfo is None or self.convertedFrameInfo[0] != sequence_number:
+
+                # The thread does not need the last converted frame anymore, consumers may still use it
+                if self.convertedFrameInfo is not None:
+                    self.conversionPool.release(self.convertedFrameInfo[1])
+                self.__release_frames_of_finished_consumers()
+
+                converted_frame = self.conversionPool.acquire(frame.shape)
+                cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=converted_frame)
+                converted_frame.flags.writeable = False
+                self.convertedFrameInfo = (sequence_number, converted_frame)
+                self.numberOfConversions += 1
+
+            # Replace the reference of the calling thread
+            converted_frame = self.convertedFrameInfo[1]
+            consumer = threading.current_thread()
+            last_frame = self.consumerFrames.get(consumer)
+            if last_frame is not converted_frame:
+                self.conversionPool.add_reference(converted_frame)
+                self.conversionPool.release(last_frame)
+                self.consumerFrames[consumer] = converted_frame
+
+            return converted_frame, capture_time, sequence_number
+
+    def __release_frames_of_finished_consumers(self):
+        """Release frames of consumer threads that have ended"""
+        for consumer in [consumer for consumer in self.consumerFrames if not consumer.is_alive()]:
+            self.conversionPool.release(self.consumerFrames.pop(consumer))
+
+    def release_frame_buffer(self):
+        """The calling thread does not use the frame it got last anymore, its buffer can be reused"""
+        with self.frameCondition:
+            self.conversionPool.release(self.consumerFrames.pop(threading.current_thread(), None))
+
+    def __start_scheduler(self):
+        """Create scheduler or change its FPS, the deadlines start now"""
+        if self.scheduler is None:
+            self.scheduler = DeadlineScheduler(self.FPS)
+        else:
+            self.scheduler.set_fps(self.FPS)
+        self.scheduler.start()
+
+    def __wait_to_adjust_fps(self):
+        """Wait until the next frame is due. Deadlines are absolute, so the time needed for reading frames and the
+           imprecision of sleeping do not accumulate.
+        """
+        self.scheduler.wait()
+
+    def __wait_until_frame_processed(self):
+        """Free-running replay: Wait until the processing thread has released the current frame"""
+        while self.eventProgramEnd.is_set() is False:
+            if self.eventFrameProcessed.wait(1):
+                break
+        self.eventFrameProcessed.clear()
 
     def __open_camera(self):
         """This function initializes the desired camera"""
         self.videoStream = cv2.VideoCapture(int(self.cameraIdx))
-        logging.info("The camera was initialized")
+
+        # Camera of cache is not available anymore: Search cameras again at next start
+        if not self.videoStream.isOpened():
+            logging.error("The camera could not be opened")
+            self.cameraEnumerator.invalidate()
+        else:
+            logging.info("The camera was initialized")
+            self.__negotiate_capture_format()
+
+    def __negotiate_capture_format(self):
+        """Request width, height and FPS of settings from the camera (a value of 0 keeps the default of the camera),
+           then log what the driver actually provides. Drivers silently choose the closest format they support.
+        """
+
+        requested_format = (self.currSettings[IDX_CAPTURE_WIDTH], self.currSettings[IDX_CAPTURE_HEIGHT], self.FPS)
+        properties = (cv2.CAP_PROP_FRAME_WIDTH, cv2.CAP_PROP_FRAME_HEIGHT, cv2.CAP_PROP_FPS)
+        names = ("width", "height", "FPS")
+
+        for prop, value in zip(properties, requested_format):
+            if value > 0:
+                self.videoStream.set(prop, value)
+
+        self.captureFormat = tuple(self.videoStream.get(prop) for prop in properties)
+        self.captureFormatVerified = False
+
+        for name, value, actual_value in zip(names, requested_format, self.captureFormat):
+            if value > 0 and abs(actual_value - value) > 0.5:
+                logging.warn("Camera does not support %s %g, it uses %g" % (name, value, actual_value))
+
+        logging.info("Camera delivers %dx%d pixels at %g FPS" % self.captureFormat)
+
+    def __verify_capture_format(self, frame):
+        """Compare size of the first frame with the format reported by the driver, some drivers report wrong values"""
+
+        self.captureFormatVerified = True
+
+        height, width = np.size(frame, 0), np.size(frame, 1)
+        if self.captureFormat is not None and (width, height) != self.captureFormat[:2]:
+            logging.warn("Camera reported %dx%d pixels, but delivers frames with %dx%d pixels" %
+                         (self.captureFormat[0], self.captureFormat[1], width, height))
+            self.captureFormat = (width, height, self.captureFormat[2])
 
     def __close_camera(self):
         """This function releases the current camera"""
@@ -235,14 +557,87 @@ class VideoThread(threading.Thread):
         self.filesDir = directory
         self.files = files
 
+    def store_video_file(self, file_name, start_frame=None):
+        """This function stores the file name if the user wants to use frames from a video file (e.g. AVI or MP4) or
+           from a frame archive (see frame_archive.py)
+        """
+        self.videoFile = file_name
+        self.seekRequest = start_frame
+
+    def seek_video_file(self, frame_index):
+        """Jump to a frame of the video file, the frame is read as next frame by the thread"""
+        self.seekRequest = frame_index
+
+    def is_free_running(self):
+        """Returns True if frames from hard disk are replayed as fast as possible, i.e. the virtual clock is used (see
+           clock.py). Then, every frame is passed to one processing thread with wait_for_frame() and release_frame().
+        """
+        return clock.is_virtual() and (self.files is not None or self.videoFile is not None)
+
+    def wait_for_frame(self, timeout):
+        """Free-running replay: Wait until a new frame is available, returns False if none is available in time"""
+        if self.eventFrameAvailable.wait(timeout):
+            self.eventFrameAvailable.clear()
+            return True
+        return False
+
+    def release_frame(self):
+        """Free-running replay: The current frame has been processed, the next one can be read"""
+        self.eventFrameProcessed.set()
+
+    def set_roi(self, x_min, x_max, y_min, y_max):
+        """Store ROI in coordinates of the full frame (x: rows, y: columns). It is used by get_timestamped_roi() and,
+           if cropping is enabled in the settings, the following frames only contain the ROI and a margin around it.
+        """
+        self.roi = (int(x_min), int(x_max), int(y_min), int(y_max))
+
+    def get_roi(self):
+        """Returns ROI (x_min, x_max, y_min, y_max) in coordinates of the full frame, None if it has not been set"""
+        return self.roi
+
+    def get_crop_offset(self):
+        """Returns position (row, column) of the current frame in the full frame, (0, 0) if frames are not cropped"""
+        return self.cropOffset
+
+    def get_capture_format(self):
+        """Returns width, height and FPS that the camera delivers, None if no camera has been opened"""
+        return self.captureFormat
+
+    def get_frame_timestamp(self):
+        """Returns the timestamp of the current frame in the video file (in ms), None if no video file is used"""
+        return self.frameTimestamp
+
     def set_camera_idx(self, camera_index):
         """ Store index of camera that user has chosen using the GUI"""
         self.cameraIdx = camera_index
         logging.info("Camera index was set because user pressed start button")
 
+    def get_frame_loader_statistics(self):
+        """Returns statistics of reading frames from hard disk (see PrefetchingFrameLoader), None if not used"""
+        if self.frameLoader is None:
+            return None
+        return self.frameLoader.get_statistics()
+
+    def get_frame_pool_statistics(self):
+        """Returns statistics of the buffers for camera frames and RGB frames, e.g. how often all were in use"""
+        return {'capture': self.capturePool.get_statistics(),
+                'conversion': self.conversionPool.get_statistics()}
+
+    def get_pacing_statistics(self):
+        """Returns statistics of the FPS adjustment, e.g. overruns and jitter (see DeadlineScheduler), None if no
+           frames have been read so far
+        """
+        if self.scheduler is None:
+            return None
+        return self.scheduler.get_statistics()
+
     def get_number_of_cameras(self):
-        """This function returns the number of available OpenCV cameras for the GUI"""
-        return self.numberOfCameras
+        """This function returns the number of available OpenCV cameras for the GUI (known so far)"""
+        return len(self.cameraEnumerator.get_cameras())
+
+    def is_camera_enumeration_finished(self):
+        """Returns True if the search for cameras has finished, i.e. get_number_of_cameras() is final"""
+        return self.cameraEnumerator.is_finished()
 
     def get_event_camera_ready(self):
         """ Getter for eventVideoReady"""